@@ -1,6 +1,7 @@
 
 from z3 import *
-from typing import Callable, Dict, Tuple
+from CvRDTs.Terms import And
+from typing import Callable, Dict, List, Tuple
 
 from CvRDTs.CvRDT import CvRDT
 from CvRDTs.Time.Time import Time
@@ -9,6 +10,7 @@ from CvRDTs.Registers.LWWRegister import LWWRegister
 from CvRDTs.Tables.PK import PK
 from CvRDTs.Tables.Element import Element
 from CvRDTs.Tables.Flags_DW import Flags_DW
+from CvRDTs.Tables.Table import Table
 from CvRDTs.Tables.Table_DW import Table_DW
 from CvRDTs.Tables.FK_System import FK_System
 
@@ -101,6 +103,7 @@ class AlbsTable(Table_DW):
 
 class Alb_FK_System(FK_System):
     '''A class to represent an Alb_FK_System. It has 2 attributes: albs_table and arts_table.
+        The 3 song FKs may reference 3 tables or the same one (ex: Alb_FK_System(albs, songs, songs, songs, arts), see FK_System.shared_ref_tables).
         Extends CvRDT, and CvRDT accepts a generic type T, which we here bind to Alb_FK_System.'''
     
     def __init__(self, albs_table: AlbsTable, songA_Tab: 'SongsTable', songB_Tab: 'SongsTable', songC_Tab: 'SongsTable', arts_fk_syst: Art_FK_System):
@@ -108,12 +111,19 @@ class Alb_FK_System(FK_System):
             - here passing to super as "main_table", [fk_tables], [fk_systems]
             - in the getArgs method to create this instances.'''
         super().__init__(albs_table, [songA_Tab, songB_Tab, songC_Tab], [arts_fk_syst])
-   
+
+    def referenced_tables(self) -> List[Table]:
+        '''the FK columns of Alb are artFK, songA, songB, songC (see FK_System.referenced_tables).'''
+        return [self.ref_FK_Systems[0].main_table, *self.ref_tables]
+
 
     @staticmethod
     def getArgs(extra_id: str, table_size: int, clock: Time):
-        '''return symbolic all different variables for 3 different instances of Alb_FK_System, and also list of those variables to be used by Z3.'''
-        return FK_System.getArgs("albFKsyst_" + extra_id, {"albTab_": AlbsTable, "songATab_":SongsTable, "songBTab_":SongsTable, "songCTab_":SongsTable, "artTab_": ArtsTable}, table_size, clock)
+        '''return symbolic all different variables for 3 different instances of Alb_FK_System, and also list of those variables to be used by Z3.
+            The 3 song FKs reference the same SongsTable (see FK_System.shared_ref_tables), so there is only one table of songs per instance.'''
+        syst1_args, syst2_args, syst3_args, vars1, vars2, vars3 = FK_System.getArgs("albFKsyst_" + extra_id, {"albTab_": AlbsTable, "songTab_":SongsTable, "artTab_": ArtsTable}, table_size, clock)
+        albs_args = [[albs_table, songs_table, songs_table, songs_table, arts] for albs_table, songs_table, arts in (syst1_args, syst2_args, syst3_args)]
+        return (*albs_args, vars1, vars2, vars3)
       
 
     @staticmethod
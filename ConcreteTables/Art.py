@@ -1,5 +1,6 @@
 from typing import Callable, Dict, Tuple
 from z3 import *
+from CvRDTs.Terms import And
 
 from ConcreteTables.Country import CountriesTable, CountryPK
 from ConcreteTables.Genre import GenrePK, GenreTable
@@ -1,5 +1,6 @@
 from typing import Callable, Dict, Tuple
 from z3 import *
+from CvRDTs.Terms import And
 
 from CvRDTs.CvRDT import CvRDT
 from CvRDTs.Time.Time import Time
@@ -1,5 +1,6 @@
 
 from z3 import *
+from CvRDTs.Terms import And
 from typing import Callable, Dict, Tuple
 
 from CvRDTs.CvRDT import CvRDT
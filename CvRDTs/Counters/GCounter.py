@@ -1,5 +1,6 @@
 
 from z3 import *
+from CvRDTs.Terms import And, Or, If, Max
 from typing import List
 
 from CvRDTs.CvRDT import CvRDT
@@ -38,6 +39,11 @@ class GCounter(CvRDT['GCounter']):
         # we use zip because we know self.compatible(that) and so we know each arg is in the right position of the list, and that the lists have the same length
         merged_entries = [If(e1 > e2, e1, e2) for e1, e2 in zip(self.entries, that.entries)]
         return GCounter(merged_entries)
+
+    def merge_all(self, states: List['GCounter']) -> 'GCounter':
+        '''@Pre: self.compatible(state) for every state'''
+        # the max of each column (the entries of the same replica in all states), without a GCounter for each merge
+        return GCounter([Max(column) for column in zip(self.entries, *[state.entries for state in states])])
         
     
     ############################################################################################################
@@ -53,15 +59,19 @@ class GCounter(CvRDT['GCounter']):
         return self.compute_value()
 
     def compute_value(self, sum=0, replica=0):
-        if 0 <= replica < len(self.entries):
-            return self.compute_value(sum + self.entries[replica], replica + 1)
-        else:
-            return sum
-
-    def increment(self, replica, value) -> None:
-        # TODO: need to check this
+        # a loop and not a recursion, so we don't reach the recursion limit of python with many replicas
+        for entry in self.entries[max(replica, 0):]:
+            sum = sum + entry
+        return sum
+
+    def increment(self, replica, value) -> 'GCounter':
+        '''increment the entry of the given replica, and return the delta: a GCounter with only that entry (the others are 0),
+            so we can send just the delta to the other replicas, which merge it as any GCounter.'''
         assert 0 <= replica < len(self.entries), "Replica index out of range"
         self.entries[replica] += value
+        delta_entries = [0] * len(self.entries)
+        delta_entries[replica] = self.entries[replica]
+        return GCounter(delta_entries)
         
     def value_of_entry(self, idx):
         assert 0 <= idx < len(self.entries), "GCounter - Entry index out of range"
@@ -0,0 +1,52 @@
+import numpy as np
+from z3 import *
+from typing import List
+
+from CvRDTs.Counters.GCounter import GCounter
+
+class GCounter_NP(GCounter):
+    '''GCounter with the entries in a numpy array, for the concrete backend (python values) with many replicas.
+        merge is a np.maximum of the entries, and the value (sum of the entries) is computed once and cached.
+        It is not used in the proofs: the symbolic GCounter proves the same merge.'''
+
+    def __init__(self, entries: List[int]):
+        super().__init__(np.asarray(entries, dtype=np.int64))
+        self._value = None # cached sum of the entries
+
+    ############################################################################################################
+    ##############################  CvRDT methods  #########################################################
+
+    def __eq__(self, that: 'GCounter_NP') -> bool:
+        return np.array_equal(self.entries, that.entries)
+
+    def __hash__(self) -> int:
+        return hash(self.entries.tobytes())
+
+    def merge(self, that: 'GCounter_NP') -> 'GCounter_NP':
+        '''@Pre: self.compatible(that)'''
+        return GCounter_NP(np.maximum(self.entries, that.entries))
+
+    def merge_all(self, states: List['GCounter_NP']) -> 'GCounter_NP':
+        '''@Pre: self.compatible(state) for every state'''
+        return GCounter_NP(np.maximum.reduce([self.entries, *[state.entries for state in states]]))
+
+    ############################################################################################################
+    ##############################  GCounter methods  #########################################################
+
+    def well_formed(self) -> bool:
+        return bool((self.entries >= 0).all())
+
+    def value(self) -> int:
+        if self._value is None:
+            self._value = int(self.entries.sum())
+        return self._value
+
+    def increment(self, replica: int, value: int) -> 'GCounter_NP':
+        '''increment the entry of the given replica, and return the delta (see GCounter.increment).'''
+        assert 0 <= replica < len(self.entries), "Replica index out of range"
+        self.entries[replica] += value
+        if self._value is not None:
+            self._value += value
+        delta_entries = np.zeros_like(self.entries)
+        delta_entries[replica] = self.entries[replica]
+        return GCounter_NP(delta_entries)
@@ -2,6 +2,7 @@
 from abc import ABC, abstractmethod
 from typing import Generic, List, Tuple, TypeVar
 from z3 import *
+from CvRDTs.Terms import And, Or
 
 T = TypeVar('T', bound='CvRDT')  
 '''Some methods of this CvRDT class, receive as argument, another CvRDT.
@@ -53,5 +54,14 @@ class CvRDT(ABC, Generic[T]):
         """Returns the least upper bound (LUB) of `self` and `that`."""
         pass
 
+    def merge_all(self, states: List[T]) -> T:
+        """Returns the LUB of `self` and all the given states (ex: all states received in one anti-entropy round).
+            By default merges them one by one; CvRDTs override it to merge all states in one pass.
+            @Pre: self.compatible(state) for every state"""
+        merged = self
+        for state in states:
+            merged = merged.merge(state)
+        return merged
+
     
 
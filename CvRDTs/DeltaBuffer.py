@@ -0,0 +1,29 @@
+
+from typing import Generic, Optional
+
+from CvRDTs.CvRDT import T
+
+
+class DeltaBuffer(Generic[T]):
+    '''DeltaBuffer joins the deltas returned by the mutators of a CvRDT (ex: GCounter.increment, Table_DW.insert)
+        until they are sent to the other replicas, so we send only what changed and not the full state.
+        The join of 2 deltas is their merge, so the buffer holds one delta (a delta group) that the other replicas merge as any state
+        (or with Table.apply_delta for tables).'''
+
+    def __init__(self):
+        self.delta: Optional[T] = None
+        self.number_of_deltas = 0 # number of deltas joined since the last take
+
+    def add(self, delta: T) -> None:
+        self.delta = delta if self.delta is None else self.delta.merge(delta)
+        self.number_of_deltas += 1
+
+    def is_empty(self) -> bool:
+        return self.delta is None
+
+    def take(self) -> Optional[T]:
+        '''return the joined delta (None if there are no deltas) and clear the buffer.'''
+        delta = self.delta
+        self.delta = None
+        self.number_of_deltas = 0
+        return delta
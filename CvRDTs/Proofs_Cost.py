@@ -0,0 +1,79 @@
+
+from math import exp, log
+from typing import Dict, List, Tuple
+from z3 import *
+
+
+CALIBRATION = {
+    # CvRDT class name -> [(number of nodes of the obligation, seconds to solve it), ...]
+    "GCounter": [(72, 0.0002), (657, 0.0006), (2607, 0.0021), (13007, 0.0109)],
+    "Flags_DW": [(182, 0.018), (1217, 0.425), (11567, 51.2)],
+    "CountriesTable": [(890, 0.079), (5222, 0.643), (48470, 18.5)],
+    "GenreTable": [(2168, 0.689), (4436, 1.43), (9296, 6.02)],
+    "SongsTable": [(3129, 1.63), (14181, 12.1), (84309, 168.3)],
+    "AlbsTable": [(2261, 0.856), (4571, 2.08), (9407, 7.45), (19943, 27.5)],
+    "ArtsTable": [(2322, 0.688), (4851, 1.74), (10557, 7.03)],
+    "Art_FK_System": [(4998, 2.18), (10419, 6.62), (22557, 31.7)],
+    "Alb_FK_System": [(7491, 5.27), (15402, 18.3), (32520, 62.1)],
+    # for the classes not measured yet we take a pessimistic curve (like the DW tables)
+    "default": [(1000, 0.1), (10000, 5.0), (100000, 200.0)],
+}
+'''Measured solve times of the merge_associative obligation (the biggest one) of each CvRDT, with VersionVector time
+    (GCounter with 5, 50, 200 and 1000 replicas). The time of a new obligation is interpolated from here (linear in log-log scale),
+    so re-measure it if the proofs or the solver change a lot.
+    There is one curve per CvRDT, used for all its obligations: the generic_referential_integrity obligation of an FK_System
+    is predicted with the merge_associative curve of that FK_System.'''
+
+
+class Proofs_Cost:
+    '''Proofs_Cost estimates, before running Z3, how expensive a proof obligation will be.'''
+
+    @staticmethod
+    def estimate(obligation: BoolRef) -> Dict[str, int]:
+        '''walk the obligation (as a DAG, so shared sub-terms are counted once) and return:
+            - nodes: number of different sub-terms
+            - if_depth: max number of nested If
+            - quantifier_arity: max number of variables bound by one quantifier
+            - variables: number of different symbolic variables (free, or bound by the quantifiers)'''
+        if_depth = {}  # ast id -> max If depth of that sub-term
+        variables = set()
+        quantifier_arity = 0
+        stack = [(obligation, False)]
+        while stack:
+            expr, children_done = stack.pop()
+            expr_id = expr.get_id()
+            if expr_id in if_depth:
+                continue
+            children = [expr.body()] if is_quantifier(expr) else (expr.children() if is_app(expr) else [])
+            if not children_done:
+                stack.append((expr, True))
+                stack.extend((child, False) for child in children if child.get_id() not in if_depth)
+                continue
+            if is_quantifier(expr):
+                quantifier_arity = max(quantifier_arity, expr.num_vars())
+                variables.update(expr.var_name(i) for i in range(expr.num_vars()))
+            elif is_const(expr) and expr.decl().kind() == Z3_OP_UNINTERPRETED:
+                variables.add(expr.decl().name())
+            depth = max((if_depth[child.get_id()] for child in children), default=0)
+            if_depth[expr_id] = depth + 1 if is_app_of(expr, Z3_OP_ITE) else depth
+        return {"nodes": len(if_depth),
+                "if_depth": if_depth[obligation.get_id()],
+                "quantifier_arity": quantifier_arity,
+                "variables": len(variables)}
+
+    @staticmethod
+    def predict_time(cost: Dict[str, int], cvrdt_name: str = "default", calibration: Dict[str, List[Tuple[int, float]]] = CALIBRATION) -> float:
+        '''return the expected seconds to solve an obligation of the given CvRDT with the given cost (see estimate), interpolated from the calibration table.
+            Every obligation of the CvRDT uses its merge_associative curve (see CALIBRATION), also the ref integrity ones of FK_Systems.'''
+        points = sorted(calibration.get(cvrdt_name, calibration["default"]))
+        nodes = max(cost["nodes"], 1)
+        # below or above the measured sizes, we extend the first or last segment
+        for (n1, t1), (n2, t2) in zip(points, points[1:]):
+            if nodes <= n2:
+                break
+        slope = (log(t2) - log(t1)) / (log(n2) - log(n1))
+        return exp(log(t1) + slope * (log(nodes) - log(n1)))
+
+    @staticmethod
+    def print_cost(obligation_name: str, cost: Dict[str, int], seconds: float):
+        print(f"{obligation_name}\t- nodes: {cost['nodes']}, If depth: {cost['if_depth']}, quantifier arity: {cost['quantifier_arity']}, variables: {cost['variables']}, expected time: {seconds:.2f}s")
@@ -1,5 +1,6 @@
 
 from z3 import *
+from CvRDTs.Terms import And, Or
 from typing import List
 
 from CvRDTs.CvRDT import T, CvRDT
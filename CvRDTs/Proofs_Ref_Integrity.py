@@ -1,6 +1,7 @@
 
 from typing import List
 from z3 import *
+from CvRDTs.Terms import And, Or
 
 from CvRDTs.Tables.FK_System import FK_System
 from CvRDTs.Tables.PK import PK
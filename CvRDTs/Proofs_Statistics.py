@@ -0,0 +1,57 @@
+
+import json
+import time
+from typing import Dict, List, Tuple
+from z3 import *
+
+
+MAIN_STATISTICS = ["conflicts", "decisions", "quant instantiations", "memory", "max memory"]
+'''Z3 statistics we always record (0 if Z3 did not report them for that proof), so runs can be compared.
+    All the other statistics that Z3 reports are also recorded.'''
+
+
+class Proofs_Statistics:
+    '''Proofs_Statistics keeps the statistics of the Z3 solver for each proof obligation we run,
+        labeled with the proof setup, so we can find which CvRDTs/clocks make the solver work harder.'''
+
+    @staticmethod
+    def check(solver: Solver) -> Tuple[CheckSatResult, float]:
+        '''return the result of solver.check() and the seconds it took.'''
+        start = time.perf_counter()
+        res = solver.check()
+        return res, time.perf_counter() - start
+
+    @staticmethod
+    def collect(solver: Solver, res: CheckSatResult, seconds: float, cvrdt_name: str, proof_name: str, table_size: int, vector_size: int, clock_name: str) -> Dict:
+        '''return the statistics of the last solver.check(), labeled with the proof setup.
+            @Pre: called before solver.reset(), which clears the statistics.'''
+        stats = solver.statistics()
+        record = {key: 0 for key in MAIN_STATISTICS}
+        record.update({key: stats.get_key_value(key) for key in stats.keys()})
+        # our labels last, so they are not replaced by Z3 statistics with the same name (ex: "time")
+        record.update({"cvrdt": cvrdt_name, "proof": proof_name, "table_size": table_size, "vector_size": vector_size,
+                       "clock": clock_name, "result": str(res), "time": seconds, "date": time.strftime("%Y-%m-%d %H:%M:%S")})
+        return record
+
+    @staticmethod
+    def save(record: Dict, file_name: str):
+        '''append the record as one json line to the given file.'''
+        with open(file_name, "a") as file:
+            file.write(json.dumps(record) + "\n")
+
+    @staticmethod
+    def load(file_name: str) -> List[Dict]:
+        with open(file_name) as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    @staticmethod
+    def print_record(record: Dict):
+        print(f"\t\t  time: {record['time']:.3f}s, conflicts: {record['conflicts']}, decisions: {record['decisions']}, quant instantiations: {record['quant instantiations']}, memory: {record['max memory']}MB")
+
+    @staticmethod
+    def print_summary(file_name: str, statistic: str = "quant instantiations", top: int = 10):
+        '''print the (CvRDT, clock, proof) setups with the biggest value of the given statistic, of all the saved records.'''
+        records = sorted(Proofs_Statistics.load(file_name), key=lambda record: record.get(statistic, 0), reverse=True)
+        print(f"\nTop {top} proofs by {statistic}:")
+        for record in records[:top]:
+            print(f"\t{record.get(statistic, 0)}\t{record['cvrdt']} with {record['clock']}: {record['proof']} (table size {record['table_size']}, vector size {record['vector_size']})")
@@ -1,6 +1,7 @@
 
 from z3 import *
-from typing import TypeVar, Generic
+from CvRDTs.Terms import And, Or, If, Implies
+from typing import Tuple, TypeVar, Generic
 
 from CvRDTs.CvRDT import CvRDT
 from CvRDTs.Time.LamportClock import LamportClock
@@ -29,6 +30,14 @@ class LWWRegister(Generic[V], CvRDT['LWWRegister[V]']):
         ''' Implement the (==) operator of z3 - compare all fields of the object and guarantee that the object is the same.
             @Pre: self.compatible(that)'''
         return And(self.value == that.value, self.stamp == that.stamp) # we can use == operator because we implemented __eq__ in LamportClock
+
+    def __hash__(self) -> int:
+        '''because we implement __eq__, we must implement __hash__.'''
+        return hash(self.digest())
+
+    def digest(self) -> Tuple:
+        '''return the values of this register in a tuple (concrete backend), to compare rows of tables without calling __eq__ (see Table.row_digest).'''
+        return (self.value, self.stamp.digest())
     
     # equals is as defined in CvRDT
 
@@ -48,6 +57,7 @@ class LWWRegister(Generic[V], CvRDT['LWWRegister[V]']):
         return self.value
 
     def assign(self, value: V, timestamp: 'LamportClock') -> 'LWWRegister[V]':
+        '''return the new register, which is also the delta to send to the other replicas (the full state of a register is as small as a delta).'''
         return LWWRegister(value, timestamp)
 
 
@@ -58,6 +68,10 @@ class LWWRegister(Generic[V], CvRDT['LWWRegister[V]']):
         merged_stamp = self.stamp.merge_with_version(that.stamp, this_version, that_version)
         return LWWRegister(merged_value, merged_stamp)
 
+    def choose(self, cond: BoolRef, that: 'LWWRegister[V]') -> 'LWWRegister[V]':
+        '''return a register equal to `self` if `cond` holds, else to `that`. (the If of Z3 for registers)'''
+        return LWWRegister(If(cond, self.value, that.value), self.stamp.choose(cond, that.stamp))
+
     ########################################################################
     ################       Proofs Helper Method       ######################
 
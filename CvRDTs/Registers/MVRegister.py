@@ -3,6 +3,7 @@ from z3 import *
 from typing import Tuple, Set, Callable, TypeVar
 
 from z3 import BoolRef
+from CvRDTs.Terms import And, Or
 
 from CvRDTs.CvRDT import CvRDT
 from CvRDTs.Time.RealTime import RealTime
@@ -0,0 +1,106 @@
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, List, Set
+
+from CvRDTs.Tables.Flags import Status
+from CvRDTs.Tables.PK import PK
+from CvRDTs.Tables.Table import Table
+
+MISSING = object()
+'''the value of a row that is not indexed (a deleted row, or no row).'''
+
+
+class AttributeIndex:
+    '''AttributeIndex is a secondary index of a concrete table on an attribute of its Element with a LWWRegister (ex: Alb.year):
+        value -> PKs of the visible rows with that value, so queries like "albums with year in 1990-2000" do not scan the whole table.
+            - a hash index answers equal(value)
+            - a sorted index (ordered=True) also keeps the distinct values in order, and answers between(low, high)
+        Deleted rows are not indexed (a query does not return them).
+        The index observes its table (see Table.set_row), so every row change (insert, update, delete, apply_delta, load) updates it,
+        and it is declared in the table (see Table.add_index), so the table returned by merge has it too, updated only with the rows
+        that the merge changed (see Table.keep_indexes). A row change that keeps the winning value of the register
+        (ex: the merge with an older stamp, see LWWRegister.merge) does not change the index.'''
+
+    def __init__(self, attribute: str, ordered: bool = False):
+        self.attribute = attribute # name of the attribute of the Element (ex: "year")
+        self.ordered = ordered
+        self.rows: Dict[Any, Set[PK]] = {} # value -> PKs of the visible rows with that value
+        self.values: Dict[PK, Any] = {} # PK of an indexed row -> its value, to remove it from the index when the row changes
+        self.keys: List[Any] = [] # the values of self.rows in order (only for sorted indexes)
+        self.own: Set[Any] = set() # values whose set of PKs is only of this index, the others may be shared with a copy (see copy)
+
+    @staticmethod
+    def build(table: Table, attribute: str, ordered: bool = False) -> 'AttributeIndex':
+        '''return the index of all rows of the given table on the given attribute, declared in the table (see Table.add_index).'''
+        index = AttributeIndex(attribute, ordered)
+        for pk in table.elements:
+            index.row_changed(table, pk)
+        table.add_index(index)
+        return index
+
+    def copy(self) -> 'AttributeIndex':
+        '''return an index with the same entries, for a table with the same rows (see Table.keep_indexes).
+            The sets of PKs are shared until one of the indexes changes them (copy on write), so the copy costs only the copy of the dicts.'''
+        index = AttributeIndex(self.attribute, self.ordered)
+        index.rows, index.values, index.keys = dict(self.rows), dict(self.values), list(self.keys)
+        self.own.clear()
+        return index
+
+    ###############################################################
+    ###################  Updates of the index  ####################
+
+    def row_changed(self, table: Table, pk: PK):
+        '''update the value of the row of the given PK (called by Table.set_row), in O(1) (or O(log n) with the new values of a sorted index).'''
+        row = table.elements.get(pk)
+        value = getattr(row[1], self.attribute).value if row is not None and row[0].DI_flag == Status.VISIBLE else MISSING
+        old_value = self.values.get(pk, MISSING)
+        if value is old_value or (value is not MISSING and old_value is not MISSING and value == old_value):
+            return
+        if old_value is not MISSING:
+            self.remove(pk, old_value)
+        if value is not MISSING:
+            self.add(pk, value)
+
+    def add(self, pk: PK, value: Any):
+        self.values[pk] = value
+        rows = self.rows.get(value)
+        if rows is None:
+            self.rows[value] = {pk}
+            self.own.add(value)
+            if self.ordered:
+                insort(self.keys, value)
+        else:
+            self.owned_rows(value, rows).add(pk)
+
+    def remove(self, pk: PK, value: Any):
+        del self.values[pk]
+        rows = self.owned_rows(value, self.rows[value])
+        rows.discard(pk)
+        if not rows:
+            del self.rows[value]
+            self.own.discard(value)
+            if self.ordered:
+                del self.keys[bisect_left(self.keys, value)]
+
+    def owned_rows(self, value: Any, rows: Set[PK]) -> Set[PK]:
+        '''return the set of PKs of the given value, copied first if it may be shared with a copy of this index.'''
+        if value not in self.own:
+            rows = self.rows[value] = set(rows)
+            self.own.add(value)
+        return rows
+
+    ###############################################################
+    ##########################  Queries  ##########################
+
+    def equal(self, value: Any) -> Set[PK]:
+        '''return the PKs of the visible rows with the given value (do not change the returned set).'''
+        return self.rows.get(value, set())
+
+    def between(self, low: Any = None, high: Any = None) -> Set[PK]:
+        '''return the PKs of the visible rows with a value in [low, high] (None for no bound), ex: between(1990, 2000) or between(301, None) for "> 300".
+            @Pre: sorted index'''
+        if not self.ordered:
+            raise TypeError(f"the index of {self.attribute} is a hash index, and between needs a sorted one (ordered=True)")
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_right(self.keys, high)
+        return set().union(*[self.rows[value] for value in self.keys[start:end]])
@@ -1,8 +1,9 @@
 
 from abc import abstractmethod
 from z3 import *
+from CvRDTs.Terms import And, Or
 
-from typing import Dict, List, TypeVar
+from typing import Dict, List, Tuple, TypeVar
 
 from CvRDTs.Tables.PK import PK
 
@@ -37,6 +38,14 @@ class Element:
             # we use zip to enforce that each arg is in the same position in both elements
         return And(*[thisArg.__eq__(thatArg) for thisArg, thatArg in zip (self.elem_args, other.elem_args)])
     
+    def __hash__(self) -> int:
+        '''because we implement __eq__, we must implement __hash__.'''
+        return hash(self.digest())
+
+    def digest(self) -> Tuple:
+        '''return the values of all attributes in a tuple (concrete backend), to compare rows of tables without calling __eq__ (see Table.row_digest).'''
+        return tuple(arg.digest() for arg in self.elem_args)
+
     def equals(self, other: 'Element') -> BoolRef:
         ''' return the equality of the given Element with the current Element.
             @Pre: self.compatible(other)'''
@@ -73,11 +82,28 @@ class Element:
         return self.__class__(*merged_args)
 
 
+    def choose(self, cond: BoolRef, other: 'Element') -> 'Element':
+        '''return an Element equal to `self` if `cond` holds, else to `other`. (the If of Z3 for Elements)
+            @Pre: self.compatible(other)'''
+        chosen_args = []
+        for thisArg, thatArg in zip(self.elem_args, other.elem_args):
+            if isinstance(thisArg, PK): # PKs and FKs must be equal so we just take the first one
+                chosen_args.append(thisArg)
+            else:
+                chosen_args.append(thisArg.choose(cond, thatArg))
+        return self.__class__(*chosen_args)
+
+
     def getPK(self):
         '''return the Primary Key of the Element.
             @Pre: the first attribute of the Element must be the Primary Key.'''
         return self.elem_args[0]
 
+    def getFKs(self) -> List[PK]:
+        '''return the Foreign Keys of the Element, in the order of its attributes (the FK columns, ex: [artFK, songA, songB, songC] of Alb).
+            @Pre: the first attribute of the Element must be the Primary Key.'''
+        return [arg for arg in self.elem_args[1:] if isinstance(arg, PK)]
+
 
     @staticmethod
     def getArgs(extra_id: str, args: Dict[str, T]):
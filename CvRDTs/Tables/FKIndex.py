@@ -0,0 +1,69 @@
+
+from typing import Dict, List, Set, Tuple
+
+from CvRDTs.Tables.PK import PK
+from CvRDTs.Tables.Table import Table
+
+
+class FKIndex:
+    '''FKIndex is the reverse index of the FKs of a concrete table: for each FK column (see Element.getFKs),
+        referenced PK -> PKs of the rows of the table that reference it (ex: ArtPK -> the AlbPKs of the albums of that artist).
+        With it, a delete of a referenced row finds the rows that reference it in O(referencing rows), instead of a scan of the whole table.
+        The index observes its table (see Table.set_row), so every row change (insert, update, delete, apply_delta) updates it.
+        All rows are indexed, also the deleted ones (they keep their FKs).'''
+
+    def __init__(self, number_of_FKs: int):
+        self.columns: List[Dict[PK, Set[PK]]] = [{} for _ in range(number_of_FKs)] # FK column -> {referenced PK -> PKs of the rows that reference it}
+        self.fks: Dict[PK, Tuple[PK, ...]] = {} # PK of an indexed row -> its FKs, to remove them from the index when the row changes
+
+    @staticmethod
+    def build(table: Table) -> 'FKIndex':
+        '''return the index of all rows of the given table, which will be updated on every row change of the table.'''
+        index = FKIndex(table.getNumFKs())
+        for pk in table.elements:
+            index.row_changed(table, pk)
+        table.add_observer(index)
+        return index
+
+    def row_changed(self, table: Table, pk: PK):
+        '''update the FKs of the row of the given PK (called by Table.set_row).
+            The FKs of a row do not change (they are part of its identity, see Element.merge), so this is O(1) for updates.'''
+        row = table.elements.get(pk)
+        new_fks = tuple(row[1].getFKs()) if row is not None else ()
+        old_fks = self.fks.get(pk, ())
+        if new_fks == old_fks:
+            return
+        for column, fk in enumerate(old_fks):
+            referencing = self.columns[column].get(fk)
+            referencing.discard(pk)
+            if not referencing:
+                del self.columns[column][fk]
+        for column, fk in enumerate(new_fks):
+            self.columns[column].setdefault(fk, set()).add(pk)
+        if new_fks:
+            self.fks[pk] = new_fks
+        else:
+            self.fks.pop(pk, None)
+
+    def rows_loaded(self, table: Table, pks: List[PK]):
+        '''index the rows of the given PKs, loaded in bulk (called by Table.load_columns, instead of row_changed for each row).
+            The rows are grouped by FK object first (the loaded rows share the FK objects, see Table.load_columns),
+            so each referenced PK is looked up once in the index, and not once per row.'''
+        groups = [{} for _ in self.columns] # FK column -> {id of a FK object -> (FK, PKs of the loaded rows that reference it)}
+        for pk in pks:
+            if pk in self.fks: # a row merged into an existing one (or loaded twice): its FKs are already indexed
+                self.row_changed(table, pk)
+                continue
+            row_fks = self.fks[pk] = tuple(table.elements[pk][1].getFKs())
+            for column_groups, fk in zip(groups, row_fks):
+                group = column_groups.get(id(fk))
+                if group is None:
+                    group = column_groups[id(fk)] = (fk, [])
+                group[1].append(pk)
+        for column, column_groups in zip(self.columns, groups):
+            for fk, referencing in column_groups.values():
+                column.setdefault(fk, set()).update(referencing)
+
+    def referencing(self, column: int, fk: PK) -> Set[PK]:
+        '''return the PKs of the rows that reference the given PK in the given FK column (do not change the returned set).'''
+        return self.columns[column].get(fk, set())
@@ -1,11 +1,14 @@
 
 
+import weakref
 from z3 import *
-from typing import List, Tuple
+from CvRDTs.Terms import And, Or, is_true
+from typing import Callable, Dict, List, Tuple
 
 from CvRDTs.CvRDT import CvRDT
 from CvRDTs.Tables.PK import PK
-from CvRDTs.Tables.Flags import Status
+from CvRDTs.Tables.FKIndex import FKIndex
+from CvRDTs.Tables.Flags import Status, Version
 from CvRDTs.Tables.Flags_DW import Flags_DW
 from CvRDTs.Tables.Table import Table
 from CvRDTs.Time.Time import Time
@@ -18,13 +21,17 @@ class FK_System(CvRDT['FK_System']):
         self.main_table = main_table # the main table of this system, for example AlbunsTable, in a Albuns_FK_System
         self.ref_tables = ref_tables # the simple tables to which the element references; example Album has a FK to ArtistTable
         self.ref_FK_Systems = ref_FK_Systems # the FK_Systems to which the element references; example Album has a FK to Country_FK_System, and that country has a FK to Continent_FK_System
+        self.fk_index: FKIndex = None # reverse index of the FKs of the main table (see fk_references), built when first needed
+        self.visibility: Dict[PK, Tuple[bool, Tuple[int, ...]]] = None # visibility cache (see fks_visible), None until it is first needed
+        self.fk_columns: List[Tuple[Table, 'FK_System']] = None # referenced table and FK_System (or None) of each FK column, see watch
+        self.dependents: List[weakref.ref] = [] # weak references to the FK_Systems with rows that reference rows of this one, told when their visibility may change
     
     def compatible(self, that: 'FK_System') -> BoolRef:
 
-        # we use zip to iterate over the list for us to make sure that each table are in the same position in the list
+        # we iterate by position to make sure that each table are in the same position in the list (and tables shared by several FK columns only once)
         return And(
             self.main_table.compatible(that.main_table),
-            And(*[ref_table.compatible(that.ref_table) for ref_table, that.ref_table in zip(self.ref_tables, that.ref_tables)]),
+            And(*[self.ref_tables[i].compatible(that.ref_tables[i]) for i in self.unique_ref_tables([that])]),
             And(*[ref_FK_System.compatible(that.ref_FK_System) for ref_FK_System, that.ref_FK_System in zip(self.ref_FK_Systems, that.ref_FK_Systems)])
         )
     
@@ -32,45 +39,85 @@ class FK_System(CvRDT['FK_System']):
     def reachable(self) -> BoolRef:
         return And(
             self.main_table.reachable(),
-            And(*[ref_table.reachable() for ref_table in self.ref_tables]),
+            And(*[self.ref_tables[i].reachable() for i in self.unique_ref_tables()]),
             And(*[ref_FK_System.reachable() for ref_FK_System in self.ref_FK_Systems])
         )
 
 
     def __eq__(self, other: 'FK_System') -> BoolRef:
         '''Implement the (==) operator of z3 - compare all fields of the object and guarantee that the object is the same.'''
+        if self.is_concrete() and other.is_concrete() and not self.converged(other):
+            return False
         return And(
             self.same_number_of_tables(other), # we need to check if sizes are the same, so then when iterating with zip, we don't leave tables unchecked
             self.main_table == other.main_table,
-            And(*[self_ref_table == other_ref_table for self_ref_table, other_ref_table in zip(self.ref_tables, other.ref_tables)]),
+            And(*[self.ref_tables[i] == other.ref_tables[i] for i in self.unique_ref_tables([other])]),
             And(*[self_ref_FK_System == other_ref_FK_System for self_ref_FK_System, other_ref_FK_System in zip(self.ref_FK_Systems, other.ref_FK_Systems)])
         )
 
     def equals(self, other: 'FK_System') -> BoolRef:
+        if self.is_concrete() and other.is_concrete() and not self.converged(other):
+            return False
         return And(
             self.same_number_of_tables(other), # we need to check if sizes are the same, so then when iterating with zip, we don't leave tables unchecked
             self.main_table.equals(other.main_table),
-            And(*[self_ref_table.equals(other_ref_table) for self_ref_table, other_ref_table in zip(self.ref_tables, other.ref_tables)]),
+            And(*[self.ref_tables[i].equals(other.ref_tables[i]) for i in self.unique_ref_tables([other])]),
             And(*[self_ref_FK_System.equals(other_ref_FK_System) for self_ref_FK_System, other_ref_FK_System in zip(self.ref_FK_Systems, other.ref_FK_Systems)])
         )
     
 
+    def is_concrete(self) -> bool:
+        return (self.main_table.is_concrete() and all(ref_table.is_concrete() for ref_table in self.ref_tables)
+                and all(ref_FK_System.is_concrete() for ref_FK_System in self.ref_FK_Systems))
+
+    def state_digest(self) -> int:
+        '''return the hash of the state digests of all tables (see Table.state_digest), in O(number of tables).
+            @Pre: concrete system'''
+        return hash((self.main_table.state_digest(),
+                     tuple(ref_table.state_digest() for ref_table in self.ref_tables),
+                     tuple(ref_FK_System.state_digest() for ref_FK_System in self.ref_FK_Systems)))
+
+    def includes(self, other: 'FK_System') -> bool:
+        '''True if each concrete table of this system already has all rows of the same table of the other (see Table.includes),
+            so their merge is this system: in O(number of tables), whatever the size of the tables.'''
+        return (self.same_number_of_tables(other) and self.main_table.includes(other.main_table)
+                and all(self.ref_tables[i].includes(other.ref_tables[i]) for i in self.unique_ref_tables([other]))
+                and all(ref_FK_System.includes(other_ref_FK_System) for ref_FK_System, other_ref_FK_System in zip(self.ref_FK_Systems, other.ref_FK_Systems)))
+
+    def converged(self, other: 'FK_System') -> bool:
+        '''O(1) check (for a given schema) if this concrete system has the same rows as the other, by the state digests
+            (see Table.converged: equals is the exact check, and it only compares all rows when the digests are the same).'''
+        return self.same_number_of_tables(other) and self.state_digest() == other.state_digest()
+
     def compare(self, other: 'FK_System') -> BoolRef:
         return And(
             self.same_number_of_tables(other), # we need to check if sizes are the same, so then when iterating with zip, we don't leave tables unchecked
             self.main_table.compare(other.main_table),
-            And(*[self_ref_table.compare(other_ref_table) for self_ref_table, other_ref_table in zip(self.ref_tables, other.ref_tables)]),
+            And(*[self.ref_tables[i].compare(other.ref_tables[i]) for i in self.unique_ref_tables([other])]),
             And(*[self_ref_FK_System.compare(other_ref_FK_System) for self_ref_FK_System, other_ref_FK_System in zip(self.ref_FK_Systems, other.ref_FK_Systems)])
         )
     
 
     def merge(self, other: 'FK_System') -> 'FK_System':
+        '''merge table by table (a table shared by several FK columns in both systems is merged once, and stays shared, see shared_ref_tables).
+            Concrete tables that already have all rows of the other table are not merged (see Table.includes), 
+            and if that holds for all tables of this system, the merge is this system itself.'''
+        if self.is_concrete() and other.is_concrete() and self.includes(other):
+            return self
         return self.__class__(
             self.main_table.merge(other.main_table),
-            *[ref_table.merge(other_ref_table) for ref_table, other_ref_table in zip(self.ref_tables, other.ref_tables)],
+            *self.merge_ref_tables([other], lambda i: self.ref_tables[i].merge(other.ref_tables[i])),
             *[ref_FK_System.merge(other_ref_FK_System) for ref_FK_System, other_ref_FK_System in zip(self.ref_FK_Systems, other.ref_FK_Systems)]
         )
 
+    def merge_all(self, states: List['FK_System']) -> 'FK_System':
+        '''merge all the given systems at once, table by table (see Table.merge_all).'''
+        return self.__class__(
+            self.main_table.merge_all([state.main_table for state in states]),
+            *self.merge_ref_tables(states, lambda i: self.ref_tables[i].merge_all([state.ref_tables[i] for state in states])),
+            *[ref_FK_System.merge_all([state.ref_FK_Systems[i] for state in states]) for i, ref_FK_System in enumerate(self.ref_FK_Systems)]
+        )
+
     
     def ref_integrity_holds_elem(self, pk: PK) -> BoolRef:
         elem = self.main_table.elements.get(pk)
@@ -79,6 +126,64 @@ class FK_System(CvRDT['FK_System']):
         # TODO: dp implementar tb UW e fazer aqui um if a distinguir entre DW e UW
         return self.has_visible_fks_versions(elem)
 
+    def ref_integrity_holds_all(self) -> Dict[PK, bool]:
+        '''ref_integrity_holds_elem of all rows of the main table at once (concrete backend), without going down the FKs of each row:
+            the systems are resolved in topological order (see topological_order, ex: Art_FK_System and then Alb_FK_System), each one in one pass over its rows,
+            with the versions of the rows of its referenced tables computed before (once per table, and for the ref_FK_Systems in their own pass),
+            in dicts by PK digest (comparing tuples is faster than PK.__eq__).
+            The results also fill the visibility cache of each system (see fks_visible), and the rows are not set as DELETED (see amortize_path).'''
+        versions: Dict[int, Dict[Tuple, int]] = {} # id of a table -> PK digest -> version of the row (ERROR_VERSION if it is not visible or its FKs are not visible)
+        for system in self.topological_order():
+            system.watch()
+            columns = []
+            for table, _ in system.fk_columns:
+                if id(table) not in versions: # a ref_table (the main tables of the ref_FK_Systems were resolved before)
+                    versions[id(table)] = {pk.digest(): table.getVersion(pk) for pk in table.elements}
+                columns.append(versions[id(table)])
+            main_versions = versions[id(system.main_table)] = {}
+            for pk, row in system.main_table.elements.items():
+                fk_versions = tuple(column.get(fk.digest(), Version.ERROR_VERSION) for column, fk in zip(columns, row[1].getFKs()))
+                visible = all(system.version_matches(row, column, version) for column, version in enumerate(fk_versions))
+                system.visibility[pk] = (visible, fk_versions)
+                main_versions[pk.digest()] = system.main_table.getVersion(pk) if visible else Version.ERROR_VERSION
+        return {pk: entry[0] for pk, entry in self.visibility.items()}
+
+    def topological_order(self) -> List['FK_System']:
+        '''return this system and all FK_Systems it references (directly or not), each one once, 
+            and each one after the FK_Systems it references (ex: [Art_FK_System, Alb_FK_System]).'''
+        order, visited = [], set()
+        def visit(system: 'FK_System'):
+            if id(system) in visited:
+                return
+            visited.add(id(system))
+            for ref_FK_System in system.ref_FK_Systems:
+                visit(ref_FK_System)
+            order.append(system)
+        visit(self)
+        return order
+
+    def shared_ref_tables(self, others: List['FK_System'] = []) -> List[int]:
+        '''return, for each position of ref_tables, the first position with the same table instance in this system and in all the given ones
+            (ex: [0, 0, 0] for an Alb_FK_System with one SongsTable for its 3 song FKs, see Workload.initial_system),
+            so a table shared by several FK columns is merged, checked and compared once.'''
+        systems = [self, *others]
+        if any(len(system.ref_tables) != len(self.ref_tables) for system in others):
+            return list(range(len(self.ref_tables)))
+        return [next(j for j in range(i + 1) if all(system.ref_tables[j] is system.ref_tables[i] for system in systems))
+                for i in range(len(self.ref_tables))]
+
+    def unique_ref_tables(self, others: List['FK_System'] = []) -> List[int]:
+        '''return the positions of ref_tables that are not shared with a previous position (see shared_ref_tables), and that all given systems have.'''
+        size = min([len(self.ref_tables)] + [len(other.ref_tables) for other in others])
+        return [i for i, first in enumerate(self.shared_ref_tables(others)) if first == i and i < size]
+
+    def merge_ref_tables(self, others: List['FK_System'], merge: Callable[[int], Table]) -> List[Table]:
+        '''return the merged ref_tables, with merge(i) for the first position of each table, and the same merged table for the positions that share it.'''
+        merged_tables = []
+        for i, first in enumerate(self.shared_ref_tables(others)):
+            merged_tables.append(merge(i) if first == i else merged_tables[first])
+        return merged_tables
+
     def same_number_of_tables(self, other: 'FK_System') -> BoolRef:
         return And(
             len(self.ref_tables) == len(other.ref_tables),
@@ -89,37 +194,165 @@ class FK_System(CvRDT['FK_System']):
     #######################################################
     ### HELPER METHODS FOR REFERENTIAL INTEGRITY PROOFS  ##
     
-    # --->> FOR DELETE-WINS MAIN TABLE 
     def has_visible_fks_versions(self, elem: Tuple[Flags_DW, PK]) -> BoolRef:
-        ''' return - false if some FK is not visible anymore (the version of the FK in this Album does not match the version of the FK in the original referenced table)
-                     (check one FK at a time, so if the first is not visible for example, we don't need to check the others)
+        ''' return - false if some FK is not visible anymore (the version of the FK in this row does not match the version of the referenced row,
+                       or the referenced row of a ref_FK_System does not have visible FKs, and so on down the FK_Systems), and set the row as DELETED (see amortize_path)
                      true if all FKs are still visible
-            @Pre: the album with the given PK exists.
-            @Pre: this method is only called if the main_table is a DELETE_WINS table.'''
-        if is_true(self.main_table.getVersion(elem[1].artFK) != elem[0].get_fk_version(0)):
-            self.amortize_path(elem[1].albPK)
-            return False
-        return True
+            The rows of concrete systems are checked with the visibility cache (see fks_visible).
+            @Pre: the row of the given element exists.'''
+        pk = elem[1].getPK()
+        if pk.is_concrete() and self.main_table.elements.get(pk) is elem:
+            visible = self.fks_visible(pk)
+        else:
+            visible = all(self.fk_visible(elem, column) for column in range(len(elem[1].getFKs())))
+        if not visible:
+            self.amortize_path(pk)
+        return visible
 
     def getVersion(self, pk: 'PK') -> int:
-        ''' To be called by other FK_Systems which have Albums as FKs
-            return the version of the album with the given PK
-            @Pre: the album with the given PK exists.
-            @Pre: this method is only called if the main_table is a DELETE_WINS table.'''
-        elem = self.main_table.elements.get(pk)
-        if is_true(elem[0].flag == Flags_DW.DELETED):
-            return 0
-        elif is_true(self.has_visible_fks_versions(elem)):
-            return elem[0].version
-        else:
-            return self.amortize_path(elem[1].alb_pk)
+        ''' To be called by other FK_Systems which have rows of this system as FKs
+            return the version of the row with the given PK, or ERROR_VERSION if it is deleted or its FKs are not visible anymore (then it is set as DELETED, see amortize_path)
+            @Pre: the row with the given PK exists.'''
+        version = self.visible_version(pk)
+        if version == Version.ERROR_VERSION and self.main_table.elements[pk][0].DI_flag == Status.VISIBLE:
+            return self.amortize_path(pk)
+        return version
         
     def amortize_path(self, pk: 'PK') -> Int:
         ''' To avoid future searches in all depth of the FKs Tree,
-            we set the flag of this album as DELETED
-            return 0 to denote that the FKs are not visible anymore.'''
-        self.albs_table.setFlag(pk, Status.DELETED)
-        return 0
+            we set the flag of this row as DELETED
+            return ERROR_VERSION to denote that the FKs are not visible anymore.'''
+        self.main_table.setFlag(pk, Status.DELETED)
+        return Version.ERROR_VERSION
+
+    #######################################################
+    ######  REVERSE FK INDEX (concrete backend)  ##########
+
+    def referenced_tables(self) -> List[Table]:
+        '''return the table referenced by each FK column of the main table (in the order of Element.getFKs):
+            by default the ref_tables and then the main tables of the ref_FK_Systems, override it if the FKs of the element have another order.'''
+        return self.ref_tables + [ref_FK_System.main_table for ref_FK_System in self.ref_FK_Systems]
+
+    def referenced_systems(self) -> List['FK_System']:
+        '''return the FK_System of the table referenced by each FK column (see referenced_tables), or None for the ref_tables.'''
+        systems = {id(ref_FK_System.main_table): ref_FK_System for ref_FK_System in self.ref_FK_Systems}
+        return [systems.get(id(table)) for table in self.referenced_tables()]
+
+    def fk_references(self, column: int, fk: PK) -> List[PK]:
+        '''return the PKs of the rows of the main table that reference the given PK in the given FK column,
+            in O(referencing rows) with the reverse index of the main table (see FKIndex), which is built on the first call
+            and then follows the changes in place of the main table (the systems returned by merge build their own).'''
+        if self.fk_index is None:
+            self.fk_index = FKIndex.build(self.main_table)
+        return list(self.fk_index.referencing(column, fk))
+
+    def fk_visible(self, row: Tuple[Flags_DW, 'Element'], column: int) -> bool:
+        '''True if the row referenced by the given FK column of the given row is visible, with the version this row references
+            (and, for the rows of ref_FK_Systems, with visible FKs too).'''
+        table, system = self.referenced_tables()[column], self.referenced_systems()[column]
+        fk = row[1].getFKs()[column]
+        return self.version_matches(row, column, table.getVersion(fk) if system is None else system.visible_version(fk))
+
+    @staticmethod
+    def version_matches(row: Tuple[Flags_DW, 'Element'], column: int, version: int) -> bool:
+        '''True if the given version of the row referenced by the given FK column is the one the given row references.'''
+        if isinstance(row[0], Flags_DW):
+            return is_true(version == row[0].get_fk_version(column))
+        return is_true(version != Version.ERROR_VERSION) # UW rows do not keep the versions of their FKs
+
+    def propagate_delete(self, table: Table, fk: PK) -> List[PK]:
+        '''after the row of the given PK of a referenced table was deleted (or got a new version), set as DELETED the visible rows
+            of the main table that reference it and lost that FK (see amortize_path), and return their PKs
+            (so FK_Systems that reference this one can propagate them too). O(referencing rows) with the reverse FK index.'''
+        deleted = []
+        for column, referenced_table in enumerate(self.referenced_tables()):
+            if referenced_table is not table:
+                continue
+            for pk in self.fk_references(column, fk):
+                row = self.main_table.elements[pk]
+                if row[0].DI_flag == Status.VISIBLE and not self.fk_visible(row, column):
+                    self.amortize_path(pk)
+                    deleted.append(pk)
+        return deleted
+
+    #######################################################
+    #####  FK VISIBILITY CACHE (concrete backend)  ########
+
+    def watch(self):
+        '''start the visibility cache: observe the main table and the ref_tables (see Table.add_observer), 
+            and be told by the ref_FK_Systems when the visibility of their rows may change (see invalidate).
+            Tables and ref_FK_Systems shared with other FK_Systems (ex: kept by merge, see Table.includes) hold only weak references to this one,
+            so an FK_System replaced by its merge stops being told of their changes when it is dropped.'''
+        if self.visibility is not None:
+            return
+        self.visibility = {}
+        self.fk_columns = list(zip(self.referenced_tables(), self.referenced_systems()))
+        self.main_table.add_observer(self)
+        observed = {id(self.main_table)}
+        for table, system in self.fk_columns:
+            if system is not None:
+                system.watch()
+                system.dependents.append(weakref.ref(self))
+            elif id(table) not in observed: # a table referenced by several FK columns is observed once
+                observed.add(id(table))
+                table.add_observer(self)
+
+    def fks_visible(self, pk: PK) -> bool:
+        '''True if all FKs of the row of the given PK reference visible rows with the versions this row references, and so on down the FK_Systems.
+            Amortized O(1): the result is cached with the versions of the referenced rows it saw, until the row or one of them changes.
+            @Pre: the row of the given PK exists, concrete system.'''
+        self.watch()
+        entry = self.visibility.get(pk)
+        if entry is None:
+            row = self.main_table.elements[pk]
+            versions = tuple(self.referenced_version(column, fk) for column, fk in enumerate(row[1].getFKs()))
+            entry = self.visibility[pk] = (all(self.version_matches(row, column, version) for column, version in enumerate(versions)), versions)
+        return entry[0]
+
+    def visible_version(self, pk: PK) -> int:
+        '''return the version of the row of the given PK (see Table.getVersion) if it is visible and has visible FKs, else ERROR_VERSION.'''
+        version = self.main_table.getVersion(pk)
+        if version == Version.ERROR_VERSION or not self.fks_visible(pk):
+            return Version.ERROR_VERSION
+        return version
+
+    def referenced_version(self, column: int, fk: PK) -> int:
+        '''return the version of the row referenced by the given FK column, ERROR_VERSION if it is not visible.'''
+        table, system = self.fk_columns[column]
+        return table.getVersion(fk) if system is None else system.visible_version(fk)
+
+    def row_changed(self, table: Table, pk: PK):
+        '''called by the observed tables (see watch) after every change of a row.'''
+        if table is self.main_table:
+            self.invalidate(pk)
+        else:
+            self.referenced_row_changed(table, pk)
+
+    def invalidate(self, pk: PK):
+        '''forget the visibility of the row of the given PK, and tell the FK_Systems that reference this one.'''
+        self.visibility.pop(pk, None)
+        for dependent in self.live_dependents():
+            dependent.referenced_row_changed(self.main_table, pk)
+
+    def live_dependents(self) -> List['FK_System']:
+        '''return the dependents (see watch) that are still alive, and forget the others.'''
+        dependents = [dependent() for dependent in self.dependents]
+        if any(dependent is None for dependent in dependents):
+            self.dependents = [ref for ref, dependent in zip(self.dependents, dependents) if dependent is not None]
+            dependents = [dependent for dependent in dependents if dependent is not None]
+        return dependents
+
+    def referenced_row_changed(self, table: Table, fk: PK):
+        '''forget the visibility of the rows that reference the given row of a referenced table, only if they saw another version of it
+            (ex: an update of the age of an artist does not change the visibility of its albums). O(referencing rows), see fk_references.'''
+        for column, (referenced_table, _) in enumerate(self.fk_columns):
+            if referenced_table is not table:
+                continue
+            version = self.referenced_version(column, fk)
+            for pk in self.fk_references(column, fk):
+                entry = self.visibility.get(pk)
+                if entry is not None and entry[1][column] != version:
+                    self.invalidate(pk)
 
     #######################################################
     ##########      HELPER METHODS FOR PROOFS  ############
@@ -38,4 +38,9 @@ class Flags(CvRDT['Flags']):
         ''' we override equals from CvRDT so this is not used'''
         return False
 
+    @abstractmethod
+    def choose(self, cond: BoolRef, that: 'Flags') -> 'Flags':
+        '''return flags equal to `self` if `cond` holds, else to `that`. (the If of Z3 for Flags)'''
+        pass
+
 
@@ -1,6 +1,7 @@
 
 from z3 import *
-from typing import List
+from CvRDTs.Terms import And, Or, If
+from typing import List, Tuple
 
 from CvRDTs.Tables.Flags import Flags, Status, Version
 
@@ -29,6 +30,14 @@ class Flags_DW(Flags):
             And(*[fk1 == fk2 for fk1, fk2 in zip(self.fk_versions, that.fk_versions)])
         )
 
+    def __hash__(self) -> int:
+        '''because we implement __eq__, we must implement __hash__.'''
+        return hash(self.digest())
+
+    def digest(self) -> Tuple:
+        '''return the values of these flags in a tuple (concrete backend), to compare rows of tables without calling __eq__ (see Table.row_digest).'''
+        return (self.version, self.DI_flag, tuple(self.fk_versions))
+
     def equals(self, that: 'Flags_DW') -> BoolRef:
         ''' override equals from CvRDT:
                 - for better efficiency: we check if this == that, instead of checking if this <= that and that <= this.
@@ -54,6 +63,11 @@ class Flags_DW(Flags):
 
         return Flags_DW(merged_version, merged_flag, merged_fk_versions)
         
+    def choose(self, cond: BoolRef, that: 'Flags_DW') -> 'Flags_DW':
+        '''@Pre: self.compatible(that)'''
+        return Flags_DW(If(cond, self.version, that.version),
+                        If(cond, self.DI_flag, that.DI_flag),
+                        [If(cond, fk1, fk2) for fk1, fk2 in zip(self.fk_versions, that.fk_versions)])
     
 
 
@@ -1,6 +1,7 @@
 
 from z3 import *
-from typing import List
+from CvRDTs.Terms import And, Or, If
+from typing import List, Tuple
 
 from CvRDTs.Tables.Flags import Flags, Status, Version
 from CvRDTs.Time.Time import Time
@@ -29,6 +30,14 @@ class Flags_UW(Flags):
                     self.time == that.time
                 )            
 
+    def __hash__(self) -> int:
+        '''because we implement __eq__, we must implement __hash__.'''
+        return hash(self.digest())
+
+    def digest(self) -> Tuple:
+        '''return the values of these flags in a tuple (concrete backend), to compare rows of tables without calling __eq__ (see Table.row_digest).'''
+        return (self.DI_flag, self.touch, self.time.digest())
+
     def equals(self, that: 'Flags_UW') -> BoolRef:
         ''' override equals from CvRDT:
                 - for better efficiency: we check if this == that, instead of checking if this <= that and that <= this.
@@ -49,6 +58,20 @@ class Flags_UW(Flags):
                                 If(Or(self.touch == Status.TOUCHED, that.touch == Status.TOUCHED), Status.TOUCHED, Status.NOT_TOUCHED)))
         return Flags_UW(merged_DI_flag, merged_touch, merged_time)                          
 
+    def choose(self, cond: BoolRef, that: 'Flags_UW') -> 'Flags_UW':
+        '''@Pre: self.compatible(that)'''
+        return Flags_UW(If(cond, self.DI_flag, that.DI_flag),
+                        If(cond, self.touch, that.touch),
+                        self.time.choose(cond, that.time))
+
+
+    ############################################################################################################
+    #      Helper methods to be called by FK_System
+    ############################################################################################################
+
+    def set_flag(self, new_flag: Int) -> 'Flags_UW':
+        return Flags_UW(new_flag, self.touch, self.time)
+
 
 
     ############################################################################################################
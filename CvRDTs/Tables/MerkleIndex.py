@@ -0,0 +1,99 @@
+
+from typing import Dict, List, Tuple
+
+from CvRDTs.Tables.PK import PK
+from CvRDTs.Tables.Table import MASK, Table
+
+
+class MerkleIndex:
+    '''MerkleIndex is a Merkle tree over the rows of a concrete table, to find which rows differ between 2 replicas
+        without sending the whole table (anti-entropy).
+            - each PK goes to a leaf bucket (by the hash of its PK), and the hash of a leaf is the sum of the hashes of its rows (see Table.row_hash),
+              so it is updated in O(1) when a row changes
+            - each inner node is the hash of its `fanout` children, recomputed (only for the changed paths) when the root is asked
+        2 replicas compare their roots and go down only into the nodes that differ (see diff), and then exchange only the rows
+        of those leaf buckets (see delta): O(diff x log n) instead of O(n).
+        The index observes its table (see Table.set_row), so every row change (insert, update, delete, apply_delta) updates it.
+        Hashes are of python ints, which are the same in every process.'''
+
+    def __init__(self, depth: int = 3, fanout: int = 16):
+        self.depth = depth
+        self.fanout = fanout
+        self.number_of_buckets = fanout ** depth
+        self.buckets: List[Dict[PK, int]] = [{} for _ in range(self.number_of_buckets)] # leaf bucket -> {PK -> hash of the row}
+        self.levels: List[List[int]] = [[0] * (fanout ** level) for level in range(depth + 1)] # levels[0] is the root, levels[depth] the leaves
+        self.dirty: List[set] = [set() for _ in range(depth)] # inner nodes to recompute, per level
+
+    @staticmethod
+    def build(table: Table, depth: int = 3, fanout: int = 16) -> 'MerkleIndex':
+        '''return the index of all rows of the given table, which will be updated on every row change of the table.'''
+        index = MerkleIndex(depth, fanout)
+        for pk in table.elements:
+            index.row_changed(table, pk)
+        table.add_observer(index)
+        return index
+
+    @staticmethod
+    def depth_for(table_size: int, fanout: int = 16) -> int:
+        '''return the smallest depth with at least one leaf bucket per row, so a different row sends only a few other rows with it.
+            (the replicas must agree on the depth, so use the expected size of the table, and not the current size of each replica)'''
+        depth = 1
+        while fanout ** depth < table_size:
+            depth += 1
+        return depth
+
+    ###############################################################
+    ###################  Updates of the index  ####################
+
+    def bucket(self, pk: PK) -> int:
+        return hash(pk.digest()) % self.number_of_buckets
+
+    def row_changed(self, table: Table, pk: PK):
+        '''update the hash of the row of the given PK (called by Table.set_row).'''
+        bucket = self.bucket(pk)
+        rows = self.buckets[bucket]
+        old_hash = rows.pop(pk, 0)
+        new_hash = table.row_hash(pk) if pk in table.elements else 0
+        if new_hash:
+            rows[pk] = new_hash
+        if old_hash != new_hash:
+            self.levels[self.depth][bucket] = (self.levels[self.depth][bucket] - old_hash + new_hash) & MASK
+            for level in range(self.depth - 1, -1, -1):
+                bucket //= self.fanout
+                self.dirty[level].add(bucket)
+
+    def node(self, level: int, i: int) -> int:
+        '''return the hash of the node i of the given level (0 is the root).'''
+        self.refresh()
+        return self.levels[level][i]
+
+    def root(self) -> int:
+        return self.node(0, 0)
+
+    def refresh(self):
+        '''recompute the inner nodes of the changed paths, from the leaves to the root.'''
+        for level in range(self.depth - 1, -1, -1):
+            children = self.levels[level + 1]
+            for i in self.dirty[level]:
+                self.levels[level][i] = hash(tuple(children[i * self.fanout:(i + 1) * self.fanout]))
+            self.dirty[level].clear()
+
+    ###############################################################
+    ####################  Anti-entropy  ###########################
+
+    def diff(self, other: 'MerkleIndex') -> Tuple[List[int], int]:
+        '''return the leaf buckets that differ between this index and the other, and the number of nodes compared.
+            @Pre: both indexes have the same depth and fanout.'''
+        self.refresh()
+        other.refresh()
+        different_nodes = [0] if self.levels[0][0] != other.levels[0][0] else []
+        compared = 1
+        for level in range(1, self.depth + 1):
+            children = [child for node in different_nodes for child in range(node * self.fanout, (node + 1) * self.fanout)]
+            compared += len(children)
+            different_nodes = [child for child in children if self.levels[level][child] != other.levels[level][child]]
+        return different_nodes, compared
+
+    def delta(self, table: Table, buckets: List[int]) -> Table:
+        '''return a table (a delta, see Table.apply_delta) with the rows of the given leaf buckets.'''
+        return table.copy({pk: table.elements[pk] for bucket in buckets for pk in self.buckets[bucket]})
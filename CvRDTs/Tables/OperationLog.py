@@ -0,0 +1,180 @@
+import os
+import struct
+import threading
+import zlib
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+
+from CvRDTs.Tables.FK_System import FK_System
+from CvRDTs.Tables.Snapshot import Snapshot
+from CvRDTs.Tables.Table import Table
+from CvRDTs.Time.Time import Time
+
+
+RECORD = struct.Struct("<QII") # lsn, size of the payload, crc32 of the payload
+SNAPSHOT_FILE = "snapshot"
+SEGMENT_SUFFIX = ".log"
+
+
+class OperationLog:
+    '''Write-ahead log of the deltas of a replica (of a concrete table or FK_System), so it recovers its state after a crash.
+        The directory has the latest Snapshot (with the lsn of the last record it includes) and the segments of the log
+        ("<first lsn>.log"), where each record is (lsn, size, crc32) + the deltas, as a Snapshot of the changed tables (see Snapshot.encode).
+            - append: log the delta of an operation (ex: Table_DW.insert) or a received delta, before (or while) applying it
+            - sync: group commit - write all appended records with one fsync; appends that wait for it (durable=True) are
+              synced together by whoever holds the fsync, so the fsyncs per second do not limit the operations per second
+            - recover: load the snapshot and apply the deltas of the records after it (see replay)
+            - compact: fold the closed segments into a new snapshot (see Compactor to run it in the background),
+              so the recovery time depends on how often we take snapshots and not on the age of the replica.
+        A crash in the middle of a record (or of a compaction) loses only the records that were not synced.'''
+
+    def __init__(self, directory: str, group_size: int = 64):
+        '''open the log of the given directory (see create), appending after its last record.'''
+        self.directory = directory
+        self.group_size = group_size # records appended before an automatic sync
+        self.lock = threading.Lock() # for the pending records, the lsn and the current segment
+        self.sync_lock = threading.Lock() # one sync (write + fsync) at a time
+        self.compact_lock = threading.Lock()
+        self.pending: List[bytes] = []
+        self.lsn = max([Snapshot.read_lsn(self.snapshot_path())] + [lsn for lsn, _ in OperationLog.read(self.segments())])
+        self.durable_lsn = self.lsn
+        self.file = open(self.segment_path(self.lsn + 1), "wb") # if it exists, it has no complete record (else self.lsn would be bigger)
+
+    @staticmethod
+    def create(directory: str, state: Union[Table, FK_System], group_size: int = 64) -> 'OperationLog':
+        '''return a new log of the given (initial) state of a replica, in the given directory.'''
+        os.makedirs(directory, exist_ok=True)
+        Snapshot.save(os.path.join(directory, SNAPSHOT_FILE), state)
+        return OperationLog(directory, group_size)
+
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    def segment_path(self, first_lsn: int) -> str:
+        return os.path.join(self.directory, f"{first_lsn:020d}{SEGMENT_SUFFIX}")
+
+    def segments(self) -> List[str]:
+        '''return the paths of all segments, in order.'''
+        return [os.path.join(self.directory, name) for name in sorted(os.listdir(self.directory)) if name.endswith(SEGMENT_SUFFIX)]
+
+    ###############################################################
+    ####################  Append and sync  ########################
+
+    def append(self, deltas: Union[Table, FK_System, Dict[str, Table]], durable: bool = False) -> int:
+        '''log the given delta (of the table, or of the FK_System, or of the tables named as in Snapshot.tables_of), and return its lsn.
+            The record is synced with the next group (or now, if durable).'''
+        if not isinstance(deltas, dict):
+            deltas = Snapshot.tables_of(deltas)
+        payload = Snapshot.encode(deltas)
+        with self.lock:
+            self.lsn += 1
+            lsn = self.lsn
+            self.pending.append(RECORD.pack(lsn, len(payload), zlib.crc32(payload)) + payload)
+            full = len(self.pending) >= self.group_size
+        if full or durable:
+            self.sync(lsn)
+        return lsn
+
+    def sync(self, lsn: int = None):
+        '''write and fsync all appended records (or return if the given lsn is already synced).
+            Appends that arrive during the fsync wait for the next one, which syncs all of them at once.'''
+        with self.sync_lock:
+            if lsn is not None and lsn <= self.durable_lsn:
+                return
+            with self.lock:
+                records, self.pending = self.pending, []
+                last_lsn = self.lsn
+            if records:
+                self.file.write(b"".join(records))
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            self.durable_lsn = last_lsn
+
+    def rotate(self) -> List[str]:
+        '''sync and close the current segment, and start a new one; return the paths of the closed segments.
+            Without records since the last rotate, the new segment is the current one (the same first lsn), so it is not closed.'''
+        with self.sync_lock:
+            with self.lock:
+                records, self.pending = self.pending, []
+                last_lsn = self.lsn
+                self.file.write(b"".join(records))
+                self.file.flush()
+                os.fsync(self.file.fileno())
+                self.file.close()
+                new_segment = self.segment_path(last_lsn + 1)
+                closed = [path for path in self.segments() if path != new_segment]
+                self.file = open(new_segment, "ab")
+            self.durable_lsn = last_lsn
+        return closed
+
+    def close(self):
+        self.sync()
+        self.file.close()
+
+    ###############################################################
+    ####################  Recovery and compaction  ################
+
+    @staticmethod
+    def read(segments: List[str], after_lsn: int = 0) -> Iterator[Tuple[int, bytes]]:
+        '''return the (lsn, payload) of the records of the given segments with a bigger lsn, stopping each segment at the first broken record.'''
+        for path in segments:
+            with open(path, "rb") as file:
+                data = file.read()
+            position = 0
+            while position + RECORD.size <= len(data):
+                lsn, size, crc = RECORD.unpack_from(data, position)
+                payload = data[position + RECORD.size:position + RECORD.size + size]
+                if len(payload) != size or zlib.crc32(payload) != crc: # the end of a record that was not synced
+                    break
+                if lsn > after_lsn:
+                    yield lsn, payload
+                position += RECORD.size + size
+
+    @staticmethod
+    def replay(directory: str, before: Callable[[Time, Time], bool], segments: List[str]) -> Tuple[Union[Table, FK_System], int]:
+        '''return the state of the snapshot of the given directory with the deltas of the given segments applied, and the last lsn applied.'''
+        with Snapshot.open(os.path.join(directory, SNAPSHOT_FILE)) as snapshot:
+            state = snapshot.state(before) # tables of python objects, which do not use the file
+        tables = Snapshot.tables_of(state)
+        last_lsn = snapshot.lsn
+        for lsn, payload in OperationLog.read(segments, snapshot.lsn):
+            for name, delta in Snapshot(payload).tables(before).items():
+                tables[name].apply_delta(delta)
+            last_lsn = lsn
+        return state, last_lsn
+
+    def recover(self, before: Callable[[Time, Time], bool]) -> Union[Table, FK_System]:
+        '''return the state of the replica: the snapshot with all synced records of the log.'''
+        self.sync()
+        return OperationLog.replay(self.directory, before, self.segments())[0]
+
+    def compact(self, before: Callable[[Time, Time], bool]) -> int:
+        '''fold the closed segments into a new snapshot, and return its lsn. Appends go to the new segment meanwhile.'''
+        with self.compact_lock:
+            closed = self.rotate()
+            state, lsn = OperationLog.replay(self.directory, before, closed)
+            Snapshot.save(self.snapshot_path(), state, lsn)
+            for path in closed: # only after the new snapshot replaced the old one
+                os.remove(path)
+            return lsn
+
+
+class Compactor(threading.Thread):
+    '''background thread that compacts the given log every `interval` seconds, if it has more than `min_records` new records.'''
+
+    def __init__(self, log: OperationLog, before: Callable[[Time, Time], bool], interval: float = 60.0, min_records: int = 10000):
+        super().__init__(daemon=True)
+        self.log = log
+        self.before = before
+        self.interval = interval
+        self.min_records = min_records
+        self.stopped = threading.Event()
+        self.compacted_lsn = Snapshot.read_lsn(log.snapshot_path())
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            if self.log.lsn - self.compacted_lsn >= self.min_records:
+                self.compacted_lsn = self.log.compact(self.before)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
@@ -1,11 +1,17 @@
 
 from z3 import *
+from CvRDTs.Terms import And, Or
 
-from typing import List
+from typing import List, Tuple
 
 class PK:
     ''' generic class for Primary Keys to extend.
         For better efficiency in Z3, we implement all attributes of the PK as Ints.'''
+
+    slot = None
+    ''' index of the symbolic row this PK was created for (see Table.getArgs). None for concrete PKs.
+        Symbolic PKs of different instances with the same slot may alias (be the same PK, if PK.equals holds),
+        while PKs with different slots are assumed to be different.'''
     
     def __init__(self, pk_args: List[Int]):
         self.pk_args = pk_args
@@ -22,12 +28,28 @@ class PK:
     def equals(self, other: 'PK') -> BoolRef:
         '''return the equality of the given PK with the current PK.'''
         if isinstance(other, self.__class__) and hasattr(other, 'pk_args'):
+            if self.slot is None and other.slot is None and self.is_concrete() and other.is_concrete(): # python values (ex: the PKs of a dict lookup)
+                return self.pk_args == other.pk_args
             # we use zip to enforce that each arg is in the same position in both elements
             return And(len(self.pk_args) == len(other.pk_args), 
                 *[thisArg == thatArg for thisArg, thatArg in zip(self.pk_args, other.pk_args)])
         return False
 
-    
+    def digest(self) -> Tuple:
+        '''return the values of this PK in a tuple (concrete backend), to compare rows of tables without calling __eq__ (see Table.row_digest).'''
+        return tuple(self.pk_args)
+
+    def is_concrete(self) -> bool:
+        '''True if all args of this PK are python values (the concrete backend), and not Z3 terms.'''
+        return not any(isinstance(arg, ExprRef) for arg in self.pk_args)
+
+    def canonical_key(self) -> Tuple:
+        ''' return a key to sort PKs in a stable order (independent of the hash order of python sets),
+            so the same tables always generate the same Z3 formulas.
+            Concrete python values sort before symbolic Z3 values, which sort by their name/expression.'''
+        return tuple((0, arg) if isinstance(arg, int) else (1, str(arg)) for arg in self.pk_args)
+
+
     # TODO: if we want to accept multiple data types we can receive a dict: attrib_name -> attrib_type, similar to Element Class
     @staticmethod
     def getArgs(extra_id: str, pk_args: List[str]):
@@ -0,0 +1,266 @@
+import importlib
+import io
+import json
+import mmap
+import os
+import struct
+import numpy as np
+from typing import Callable, Dict, List, Tuple, Union
+
+from CvRDTs.Tables.Element import Element
+from CvRDTs.Tables.FK_System import FK_System
+from CvRDTs.Tables.Flags_UW import Flags_UW
+from CvRDTs.Tables.Table import Table
+from CvRDTs.Tables.Table_DW import Table_DW
+from CvRDTs.Tables.Table_DW_Columnar import Table_DW_Columnar
+from CvRDTs.Tables.Table_UW import Table_UW
+from CvRDTs.Time.LamportClock import LamportClock
+from CvRDTs.Time.Time import Time
+
+
+MAGIC = b"CRDTSNAP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQ") # magic, format version, reserved (0), size of the strings section
+ALIGNMENT = 64 # of the start of each column, so the numpy views are aligned
+
+
+class Snapshot:
+    '''Binary snapshot of concrete tables (Table_DW, Table_UW, Table_DW_Columnar) or of a whole FK_System, to persist a replica.
+        The file has:
+            - a fixed header: MAGIC, FORMAT_VERSION and the size of the strings section
+            - the strings section (utf-8 json): for each table its classes (module.name), schema and number of rows,
+              and the name, dtype, shape and offset of each column (and the layout of the tables in the FK_System)
+            - the columns, each one starting at a multiple of ALIGNMENT (or of the alignment in the strings), with fixed-width rows sorted by PK (the column "0" is the dictionary of PKs):
+              the columns of Table_DW_Columnar for DW tables, and "DI_flag", "touch", "time.replica", "time.counter" for the flags of UW tables
+        Opening a snapshot maps the file (mmap) and the columns are numpy views of it, so nothing is read or created per row
+        until a table is converted to python objects (see table): columnar(name) of a DW table costs the same for any number of rows.
+        Close the snapshot when done (close, or open it in a with statement): the tables of python objects do not use the file,
+        but the columnar tables and the columns do, so their mapping is released only when they are dropped.
+        The times (flags of UW tables and LWWRegisters) must be LamportClocks, and `before` is given when loading (it is a function).
+        A snapshot also keeps the number (lsn) of the last operation of the OperationLog it includes.'''
+
+    def __init__(self, buffer):
+        '''read the snapshot in the given buffer (an mmap, see open, or bytes, see encode).'''
+        self.buffer = buffer
+        magic, version, _, strings_size = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("not a snapshot")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"snapshot format version {version}, and we only read up to version {FORMAT_VERSION}")
+        self.strings = json.loads(bytes(self.buffer[HEADER.size:HEADER.size + strings_size]).decode("utf-8"))
+        self.alignment: int = self.strings.get("alignment", ALIGNMENT)
+        self.columns_start = aligned(HEADER.size + strings_size, self.alignment)
+        self.lsn: int = self.strings.get("lsn", 0)
+
+    @staticmethod
+    def open(path: str) -> 'Snapshot':
+        '''map the snapshot of the given file (see close).'''
+        with open(path, "rb") as file:
+            return Snapshot(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    def read_lsn(path: str) -> int:
+        '''return the lsn of the snapshot of the given file, reading only its header and strings (not the columns).'''
+        with open(path, "rb") as file:
+            magic, _, _, strings_size = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError("not a snapshot")
+            return json.loads(file.read(strings_size).decode("utf-8")).get("lsn", 0)
+
+    def close(self):
+        '''unmap the file of this snapshot (opened with open). If columns of it are still used (ex: by a columnar table),
+            the mapping is released when they are dropped.'''
+        if isinstance(self.buffer, mmap.mmap):
+            try:
+                self.buffer.close()
+            except BufferError: # numpy views of the columns still use it
+                pass
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def table_names(self) -> List[str]:
+        return list(self.strings["tables"])
+
+    def columns(self, name: str) -> Dict[str, np.ndarray]:
+        '''return the columns of the given table, as read-only numpy views of the file (zero-copy).'''
+        return {column: np.frombuffer(self.buffer, dtype=np.dtype(info["dtype"]), count=int(np.prod(info["shape"])), offset=self.columns_start + info["offset"]).reshape(info["shape"])
+                for column, info in self.strings["tables"][name]["columns"].items()}
+
+    def columnar(self, name: str, before: Callable[[Time, Time], bool]) -> Table_DW_Columnar:
+        '''return the given DW table as a Table_DW_Columnar over the columns of the file (zero-copy).'''
+        info = self.strings["tables"][name]
+        if info["policy"] != "DW":
+            raise TypeError(f"the table {name} of the snapshot is not a DW table")
+        return Table_DW_Columnar(class_of(info["table_class"]), class_of(info["elem_class"]), [class_of(c) for c in info["schema"]],
+                                 self.columns(name), before)
+
+    def table(self, name: str, before: Callable[[Time, Time], bool]) -> Table:
+        '''return the given table as a concrete table of python objects (its original class).'''
+        info = self.strings["tables"][name]
+        if info["policy"] == "DW":
+            return self.columnar(name, before).to_table()
+        columns = {column: values.tolist() for column, values in self.columns(name).items()}
+        elems = Table_DW_Columnar.elements_of(class_of(info["elem_class"]), [class_of(c) for c in info["schema"]], columns, info["rows"])
+        elements = {elem.getPK(): (Flags_UW(columns["DI_flag"][row], columns["touch"][row], LamportClock(columns["time.replica"][row], columns["time.counter"][row])), elem)
+                    for row, elem in enumerate(elems)}
+        return class_of(info["table_class"])(elements, before)
+
+    def system(self, before: Callable[[Time, Time], bool]) -> FK_System:
+        '''return the FK_System saved with save_system, with concrete tables of python objects (the tables shared by several FK columns are shared again).'''
+        tables: Dict[str, Table] = {}
+        def table(name: str) -> Table:
+            if name not in tables:
+                tables[name] = self.table(name, before)
+            return tables[name]
+        def build(layout: Dict) -> FK_System:
+            return class_of(layout["system_class"])(
+                table(layout["main_table"]),
+                *[table(name) for name in layout["ref_tables"]],
+                *[build(ref_layout) for ref_layout in layout["ref_FK_Systems"]])
+        return build(self.strings["system"])
+
+    def state(self, before: Callable[[Time, Time], bool]) -> Union[Table, FK_System]:
+        '''return what was saved with save: the FK_System, or the table "main_table".'''
+        return self.system(before) if self.strings["system"] else self.table("main_table", before)
+
+    def tables(self, before: Callable[[Time, Time], bool]) -> Dict[str, Table]:
+        '''return all tables of this snapshot (ex: the deltas of an OperationLog record).'''
+        return {name: self.table(name, before) for name in self.strings["tables"]}
+
+    ###############################################################
+    ########################  Writing  ############################
+
+    @staticmethod
+    def save(path: str, state: Union[Table, FK_System], lsn: int = 0):
+        '''save the given table or FK_System (see save_table and save_system).'''
+        if isinstance(state, FK_System):
+            Snapshot.save_system(path, state, lsn)
+        else:
+            Snapshot.save_table(path, state, lsn)
+
+    @staticmethod
+    def save_table(path: str, table: Table, lsn: int = 0):
+        '''save the given concrete table (Table_DW, Table_UW or Table_DW_Columnar) as the table "main_table" of a new snapshot.'''
+        Snapshot.write(path, {"main_table": table}, lsn=lsn)
+
+    @staticmethod
+    def save_system(path: str, system: FK_System, lsn: int = 0):
+        '''save all tables of the given concrete FK_System, named by their place in the system (see tables_of).'''
+        Snapshot.write(path, Snapshot.tables_of(system), Snapshot.layout_of(system), lsn)
+
+    @staticmethod
+    def tables_of(state: Union[Table, FK_System], prefix: str = "") -> Dict[str, Table]:
+        '''return the tables of the given FK_System by their place in the system (ex: "ref_FK_Systems.0.main_table"), or {"main_table": table}.
+            A table shared by several FK columns (see FK_System.shared_ref_tables) is named by its first place only.'''
+        if not isinstance(state, FK_System):
+            return {prefix + "main_table": state}
+        tables = {prefix + "main_table": state.main_table}
+        for i in state.unique_ref_tables():
+            tables[f"{prefix}ref_tables.{i}"] = state.ref_tables[i]
+        for i, ref_FK_System in enumerate(state.ref_FK_Systems):
+            tables.update(Snapshot.tables_of(ref_FK_System, f"{prefix}ref_FK_Systems.{i}."))
+        return tables
+
+    @staticmethod
+    def layout_of(system: FK_System, prefix: str = "") -> Dict:
+        '''return the class of the given FK_System and the names of its tables (see tables_of), to build it again (see system).'''
+        return {"system_class": name_of(type(system)),
+                "main_table": prefix + "main_table",
+                "ref_tables": [f"{prefix}ref_tables.{first}" for first in system.shared_ref_tables()],
+                "ref_FK_Systems": [Snapshot.layout_of(ref_FK_System, f"{prefix}ref_FK_Systems.{i}.") for i, ref_FK_System in enumerate(system.ref_FK_Systems)]}
+
+    @staticmethod
+    def write(path: str, tables: Dict[str, Table], system_layout: Dict = None, lsn: int = 0):
+        '''write the snapshot to a temporary file and then replace the given path, so a crash never leaves half a snapshot.'''
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as file:
+            Snapshot.write_to(file, tables, system_layout, lsn)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def encode(tables: Dict[str, Table]) -> bytes:
+        '''return the snapshot of the given tables in memory (read it with Snapshot(bytes)), without aligning the columns (for small tables, ex: deltas).'''
+        file = io.BytesIO()
+        Snapshot.write_to(file, tables, alignment=1)
+        return file.getvalue()
+
+    @staticmethod
+    def write_to(file, tables: Dict[str, Table], system_layout: Dict = None, lsn: int = 0, alignment: int = ALIGNMENT):
+        '''write the snapshot at the start of the given binary file.'''
+        strings = {"tables": {}, "system": system_layout, "lsn": lsn, "alignment": alignment}
+        all_columns = []
+        offset = 0 # from the start of the columns
+        for name, table in tables.items():
+            info, columns = Snapshot.table_columns(table)
+            info["columns"] = {}
+            for column, values in columns.items():
+                values = np.ascontiguousarray(values)
+                info["columns"][column] = {"dtype": values.dtype.str, "shape": list(values.shape), "offset": offset}
+                all_columns.append((offset, values))
+                offset = aligned(offset + values.nbytes, alignment)
+            strings["tables"][name] = info
+
+        encoded_strings = json.dumps(strings).encode("utf-8")
+        start = aligned(HEADER.size + len(encoded_strings), alignment)
+
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(encoded_strings)))
+        file.write(encoded_strings)
+        for column_offset, values in all_columns:
+            file.write(b"\0" * (start + column_offset - file.tell()))
+            if values.size:
+                file.write(memoryview(values).cast("B"))
+
+    @staticmethod
+    def table_columns(table: Table) -> Tuple[Dict, Dict[str, np.ndarray]]:
+        '''return the strings (classes, schema, ...) and the columns of the given concrete table.'''
+        if isinstance(table, Table_DW_Columnar):
+            return ({"policy": "DW", "table_class": name_of(table.table_class), "elem_class": name_of(table.elem_class),
+                     "schema": [name_of(c) for c in table.schema], "rows": len(table)}, table.columns)
+        rows = list(table.elements.values())
+        elem_class = type(rows[0][1]) if rows else Element
+        if isinstance(table, Table_DW):
+            columnar = Table_DW_Columnar.from_table(table, elem_class)
+            return Snapshot.table_columns(columnar)
+        if not isinstance(table, Table_UW):
+            raise TypeError(f"snapshots do not support tables of type {type(table).__name__}")
+        if any(not isinstance(flags.time, LamportClock) for flags, _ in rows):
+            raise TypeError("snapshots only support UW tables with LamportClocks")
+        columns = {
+            "DI_flag": np.fromiter((flags.DI_flag for flags, _ in rows), dtype=np.int8, count=len(rows)),
+            "touch": np.fromiter((flags.touch for flags, _ in rows), dtype=np.int8, count=len(rows)),
+            "time.replica": np.fromiter((flags.time.replica for flags, _ in rows), dtype=np.int64, count=len(rows)),
+            "time.counter": np.fromiter((flags.time.counter for flags, _ in rows), dtype=np.int64, count=len(rows)),
+        }
+        schema, elem_columns = Table_DW_Columnar.element_columns([elem for _, elem in rows])
+        columns.update(elem_columns)
+        return ({"policy": "UW", "table_class": name_of(type(table)), "elem_class": name_of(elem_class),
+                 "schema": [name_of(c) for c in schema], "rows": len(rows)}, Table_DW_Columnar.sorted_by_pk(columns))
+
+
+def aligned(offset: int, alignment: int = ALIGNMENT) -> int:
+    return -(-offset // alignment) * alignment
+
+
+def name_of(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+SNAPSHOT_PACKAGES = ("CvRDTs.", "ConcreteTables.")
+'''the packages of the classes a snapshot can name (see class_of).'''
+
+
+def class_of(name: str) -> type:
+    '''return the class of the given name (see name_of). Only classes of SNAPSHOT_PACKAGES, so a snapshot cannot import any other module.'''
+    module, _, cls = name.rpartition(".")
+    if not module.startswith(SNAPSHOT_PACKAGES):
+        raise ValueError(f"the snapshot names the class {name}, which is not in the packages {', '.join(SNAPSHOT_PACKAGES)}")
+    found = getattr(importlib.import_module(module), cls)
+    if not isinstance(found, type):
+        raise ValueError(f"the snapshot names {name}, which is not a class")
+    return found
@@ -1,22 +1,42 @@
 
+import itertools
+import numpy as np
+import weakref
 from abc import abstractmethod
-from typing import Callable, Dict, Tuple
+from typing import Callable, Dict, Iterable, List, Tuple, Type
 from z3 import *
+from CvRDTs.Terms import And, Or, Implies, Not, is_true
 
 from CvRDTs.CvRDT import CvRDT
 from CvRDTs.Tables.Flags import Flags, Status
 from CvRDTs.Tables.Flags_DW import Flags_DW
 from CvRDTs.Tables.Element import Element
 from CvRDTs.Tables.PK import PK
+from CvRDTs.Registers.LWWRegister import LWWRegister
+from CvRDTs.Time.LamportClock import LamportClock
 from CvRDTs.Time.Time import Time
 
+MASK = (1 << 64) - 1
+'''the hashes of rows and tables are ints of 64 bits (sums of hashes are taken modulo 2^64).'''
+
+MERGED_FROM_LIMIT = 64
+'''max number of tables a table remembers it was merged with (see Table.merged_from), the oldest are forgotten first.'''
 
 class Table(CvRDT['Table']): 
     ''' generic class for Delete Wins or Update Wins Tables to extend.'''
 
+    uids = itertools.count() # to give each table object a different uid
+
     def __init__(self, elements: Dict[PK, Tuple[Flags_DW, Element]], before: Callable[[Time, Time], bool]): 
         self.elements = elements  # elements is a dict with PK as key and (DWFlags, V) as value
         self.before = before  # before is a function (Time, Time) => Bool
+        self.digests: Dict[PK, Tuple] = {} # cache of the digests of the rows (see row_digest), only for concrete tables
+        self.observers: List[weakref.ref] = [] # weak references to the indexes notified of every row change of this table (see set_row), ex: MerkleIndex
+        self.indexes: Dict[str, 'AttributeIndex'] = {} # attribute -> secondary index of this table on it, also kept by merge (see add_index)
+        self.state_hash: int = None # sum of the hashes of all rows (see state_digest), None until it is first asked
+        self.uid = next(Table.uids) # the uid and epoch of a table identify its rows at some moment (see includes)
+        self.epoch = 0 # number of changes in place of the rows of this table (see set_row)
+        self.merged_from: Dict[int, int] = {} # uid -> epoch of the tables whose rows this table already has (see includes)
 
 
     @abstractmethod
@@ -24,12 +44,17 @@ class Table(CvRDT['Table']):
         pass
 
     def compatible(self, other: 'Table') -> BoolRef:
-        '''for all elements in zip (this values(), that values()), check if they are compatible.
+        '''for all pairs of rows that may be the same row (same PK, or symbolic PKs of the same slot that alias), check if they are compatible.
             (and to reduce search space for z3, we add some assumptions before)'''
+        other_slots = other.slot_index()
         return And(
             self.before == other.before,
-            # we use zip which iterate over the map without any order and without matching keys, but it's enough to check if the elements are compatible, they don't need to be the same one. And also if one table is bigger than the other, we don't need to check the rest of the elements.
-            And(*[And(e1[0].compatible(e2[0]), e1[1].compatible(e2[1])) for (e1, e2) in zip(self.elements.values(), other.elements.values())])
+            # rows in the same slot are only the same row if their PKs alias, so only then they must be compatible
+            And(*[Implies(aliased, And(e1[0].compatible(e2[0]), e1[1].compatible(e2[1]))) 
+                    for pk, e1 in self.sorted_items() for e2, aliased in self.aliases(pk, other, other_slots)]),
+            # symbolic PKs of different slots never alias
+            And(*[Not(pk1.equals(pk2)) for pk1 in self.sorted_pks() if pk1.slot is not None
+                    for pk2 in other.sorted_pks() if pk2.slot is not None and pk2.slot != pk1.slot])
         )
     
     
@@ -43,18 +68,23 @@ class Table(CvRDT['Table']):
                             self.reachable_complement(elem[0]),
                             # check values
                             elem[1].reachable()
-                        ) for pk, elem in self.elements.items()
-                    ])
+                        ) for pk, elem in self.sorted_items()
+                    ],
+                    # after a merge, the same slot may have rows of different instances: if their PKs alias they are the same row, so they must be equal
+                    *[Implies(pk1.equals(pk2), And(self.elements[pk1][0].equals(self.elements[pk2][0]), self.elements[pk1][1].equals(self.elements[pk2][1])))
+                        for slot_pks in self.slot_index().values() for i, pk1 in enumerate(slot_pks) for pk2 in slot_pks[i+1:]])
 
     def __eq__(self, other: 'Table') -> BoolRef:
         ''' Implement the (==) operator of z3 - compare all fields of the object and guarantee that the object is the same.
             @Pre: self.compatible(other)'''
+        if self.is_concrete() and other.is_concrete():
+            return self.same_rows(other)
         booleans = []
         union_keys = set(self.elements.keys()).union(other.elements.keys())
         intersection_keys = set(self.elements.keys()).intersection(other.elements.keys())
         if len(union_keys) != len(intersection_keys):
             return False
-        for pk in intersection_keys:
+        for pk in self.sorted_pks(intersection_keys):
             e1 = self.elements[pk]
             e2 = other.elements[pk]
             booleans.append(And(e1[0] == e2[0], e1[1] == e2[1]))
@@ -63,23 +93,360 @@ class Table(CvRDT['Table']):
     def equals(self, other: 'Table') -> BoolRef:
         ''' for all elements in zip (this values(), that values()), check if they are equal
             @Pre: self.compatible(other)'''
+        if self.is_concrete() and other.is_concrete():
+            return self.same_rows(other)
         union_keys = set(self.elements.keys()).union(other.elements.keys())
         intersection_keys = set(self.elements.keys()).intersection(other.elements.keys())
         if len(union_keys) != len(intersection_keys):
             return False
         booleans = []
-        for pk in intersection_keys:
+        for pk in self.sorted_pks(intersection_keys):
             e1 = self.elements[pk]
             e2 = other.elements[pk]
             booleans.append(And(e1[0].equals(e2[0]), e1[1].equals(e2[1])))
         return And(And(*booleans), self.before == other.before)
         
+    def same_rows(self, other: 'Table') -> bool:
+        '''equality of concrete tables: different state digests mean different tables (in O(1)),
+            else we compare the digests of all rows, to be sure they are not different tables with the same state digest.'''
+        if self.state_digest() != other.state_digest() or len(self.elements) != len(other.elements) or self.before != other.before:
+            return False
+        return all(pk in other.elements and self.row_digest(pk) == other.row_digest(pk) for pk in self.elements)
+
+    def converged(self, other: 'Table') -> bool:
+        '''O(1) check if this concrete table has the same rows as the other: they have the same state digest.
+            The digests are sums of 64 bit hashes, so different tables with the same digest are very unlikely but possible: equals is the exact check.'''
+        return self.state_digest() == other.state_digest()
+
+    def state_digest(self) -> int:
+        '''return the sum (mod 2^64) of the hashes of all rows (see row_hash), which does not depend on the order of the rows.
+            It is computed once, and then updated on every change of a row (set_row) and by merge_join.
+            @Pre: concrete table'''
+        if self.state_hash is None:
+            self.state_hash = sum(self.row_hash(pk) for pk in self.elements) & MASK
+        return self.state_hash
+
     def compare(self, other: 'Table') -> BoolRef:
         ''' Returns True if `self`<=`that`.
             for all elements in zip (this values(), that values()), check if they are comparable'''
         # TODO: same as equals but with method compare
         return False
     
+    def merge(self, other: 'Table') -> 'Table':
+        '''for each PK in maps, merge the rows with the same PK (with merge_row of the DW or UW Table), or if that PK is present only in one map, so keep it.
+            Symbolic rows of different instances in the same slot may alias, so those rows are merged only if their PKs are equal.
+            Concrete tables are merged with merge_join, unless this table already has all rows of the other (see includes): then the merge is this table itself.
+            (not the other one when it has all rows of this one: the caller may change the merged table in place, and the other table may be of another replica)'''
+        if self.is_concrete() and other.is_concrete():
+            if self.includes(other):
+                return self
+            return self.merge_join(other)
+        # we can't use a simple zip because we need to merge elements with the same PK, and not the same index in the list. So we iterate over the keys of both maps, and look for the rows of the other map that may be the same row. (always in canonical PK order, so the merged dict and the Z3 formulas built from it are stable)
+        merged_elems = {}
+        self_slots, other_slots = self.slot_index(), other.slot_index()
+        for pk, row in self.sorted_items():
+            merged_elems[pk] = self.merge_aliases(row, self.aliases(pk, other, other_slots))
+        for pk, row in other.sorted_items():
+            if pk not in merged_elems:
+                merged_elems[pk] = self.merge_aliases(row, other.aliases(pk, self, self_slots))
+        return self.copy(merged_elems)
+
+    def merge_all(self, states: List['Table']) -> 'Table':
+        '''merge all the given tables in one pass over their rows: each row is merged into the row with the same PK, without a merged table for each state.
+            Symbolic tables are merged one by one, because their rows may alias (see merge).'''
+        tables = [self, *states]
+        if any(pk.slot is not None for table in tables for pk in table.elements):
+            return super().merge_all(states)
+        kept = [] # skip the tables that others already have (see includes)
+        for table in tables:
+            if not any(kept_table.includes(table) for kept_table in kept):
+                kept = [kept_table for kept_table in kept if not table.includes(kept_table)] + [table]
+        if kept == [self]:
+            return self
+        tables = kept
+        merged_elems = {}
+        for table in tables:
+            for pk, row in table.elements.items():
+                merged_row = merged_elems.get(pk)
+                merged_elems[pk] = row if merged_row is None else self.merge_row(merged_row, row)
+        merged = self.copy(merged_elems)
+        merged.record_merge(tables)
+        if self.indexes:
+            merged.keep_indexes(self, [pk for pk, row in merged_elems.items() if self.elements.get(pk) is not row])
+        return merged
+
+    def merge_join(self, other: 'Table') -> 'Table':
+        '''merge of concrete tables: go through the rows of the smaller table, looking for the same PK in the dict of the bigger one,
+            and skip the rows that are the same in both tables (the same object, or the same digest), without building sets of keys.'''
+        small, large = (self, other) if len(self.elements) <= len(other.elements) else (other, self)
+        merged_elems = dict(large.elements)
+        added, changed = [], []
+        for pk, row in small.elements.items():
+            large_row = merged_elems.get(pk)
+            if large_row is None:
+                merged_elems[pk] = row
+                added.append(pk)
+            elif large_row is not row and small.row_digest(pk) != large.row_digest(pk):
+                # keep the order of the rows as in merge: (row of self, row of other)
+                merged_elems[pk] = self.merge_row(row, large_row) if small is self else self.merge_row(large_row, row)
+                changed.append(pk)
+        merged = self.copy(merged_elems)
+        merged.digests = dict(large.digests)
+        for pk in changed:
+            merged.digests.pop(pk, None)
+        for pk in added:
+            if pk in small.digests:
+                merged.digests[pk] = small.digests[pk]
+        if large.state_hash is not None: # update the state digest only with the rows that changed
+            state_hash = large.state_hash
+            for pk in changed:
+                state_hash += merged.row_hash(pk) - large.row_hash(pk)
+            for pk in added:
+                state_hash += small.row_hash(pk)
+            merged.state_hash = state_hash & MASK
+        merged.record_merge([self, other])
+        if self.indexes: # the rows that are not the rows of self: the changed ones, and the ones only in other (in small, or in large if merged has more rows than self)
+            if small is other:
+                merged.keep_indexes(self, added + changed)
+            elif len(merged_elems) > len(self.elements):
+                merged.keep_indexes(self, changed + [pk for pk in large.elements if pk not in self.elements])
+            else:
+                merged.keep_indexes(self, changed)
+        return merged
+
+    def includes(self, other: 'Table') -> bool:
+        '''True if this concrete table already has all rows of the other (so their merge is this table): it is the same table,
+            or this table was merged with the other (or with a table that was) after the last change of the other (see record_merge),
+            ex: syncs with a replica whose table did not change since the last sync.
+            The changes in place of the rows (see set_row) are joins (inserts, updates and deletes are inflations), so a table never loses what it had.'''
+        return other is self or self.merged_from.get(other.uid, -1) >= other.epoch
+
+    def record_merge(self, tables: List['Table']):
+        '''remember that this table has the rows of the given tables, at their current epochs, and of all tables they were merged with.'''
+        merged_from = self.merged_from
+        for table in tables:
+            for uid, epoch in [*table.merged_from.items(), (table.uid, table.epoch)]:
+                if merged_from.get(uid, -1) < epoch:
+                    merged_from[uid] = epoch
+        while len(merged_from) > MERGED_FROM_LIMIT: # forget the oldest (it only makes some merges longer)
+            del merged_from[next(iter(merged_from))]
+
+    def row_digest(self, pk: PK) -> Tuple:
+        '''return the digest of the row of the given PK: a tuple with all values of its flags and element, computed once per row.
+            2 rows are equal if and only if they have the same digest, and comparing digests is much faster than the __eq__ of the rows.
+            @Pre: concrete table'''
+        digest = self.digests.get(pk)
+        if digest is None:
+            flags, elem = self.elements[pk]
+            digest = self.digests[pk] = (flags.digest(), elem.digest())
+        return digest
+
+    def row_hash(self, pk: PK) -> int:
+        '''return the hash of the PK and the row digest of the given PK (of python ints, so the same in every process).
+            @Pre: concrete table'''
+        return hash((pk.digest(), self.row_digest(pk))) & MASK
+
+    def is_concrete(self) -> bool:
+        '''True if the PKs of this table have python values (the concrete backend), and not Z3 terms (the proofs).'''
+        for pk in self.elements:
+            return pk.is_concrete()
+        return True
+
+    @abstractmethod
+    def merge_row(self, e1: Tuple[Flags, Element], e2: Tuple[Flags, Element]) -> Tuple[Flags, Element]:
+        '''return the merge of 2 rows with the same PK, according to the policy of the table (DW or UW).'''
+        pass
+
+    def merge_aliases(self, row: Tuple[Flags, Element], aliases: List[Tuple[Tuple[Flags, Element], BoolRef]]) -> Tuple[Flags, Element]:
+        '''merge the given row with each of its aliases, keeping the row unchanged when the alias condition does not hold.'''
+        for alias_row, aliased in aliases:
+            merged = self.merge_row(row, alias_row)
+            if aliased is True:
+                row = merged
+            else:
+                row = (merged[0].choose(aliased, row[0]), merged[1].choose(aliased, row[1]))
+        return row
+
+    def aliases(self, pk: PK, other: 'Table', other_slots: Dict[int, List[PK]] = None) -> List[Tuple[Tuple[Flags, Element], BoolRef]]:
+        '''return the rows of `other` that may be the same row as the row of `pk` in this table, 
+            each one with the condition for that: True for the same PK, or PK.equals for a symbolic PK of the same slot.'''
+        if pk in other.elements:
+            return [(other.elements[pk], True)]
+        if pk.slot is None:
+            return []
+        other_slots = other.slot_index() if other_slots is None else other_slots
+        return [(other.elements[that_pk], pk.equals(that_pk)) for that_pk in other_slots.get(pk.slot, [])]
+
+    def slot_index(self) -> Dict[int, List[PK]]:
+        '''return the symbolic PKs of this table grouped by slot (in canonical order).'''
+        slots = {}
+        for pk in self.sorted_pks():
+            if pk.slot is not None:
+                slots.setdefault(pk.slot, []).append(pk)
+        return slots
+
+    def sorted_pks(self, pks: Iterable[PK] = None) -> List[PK]:
+        '''return the given PKs (by default all PKs of this table) in canonical order (see PK.canonical_key).
+            Iterating python sets or dicts of symbolic PKs depends on hash and insertion order, 
+            so we always iterate in this order to build the same Z3 formulas for the same tables.'''
+        return sorted(self.elements.keys() if pks is None else pks, key=PK.canonical_key)
+
+    def sorted_items(self) -> List[Tuple[PK, Tuple[Flags, Element]]]:
+        '''return the (PK, row) pairs of this table in canonical PK order.'''
+        return [(pk, self.elements[pk]) for pk in self.sorted_pks()]
+
+    def sorted_values(self) -> List[Tuple[Flags, Element]]:
+        '''return the rows of this table in canonical PK order.'''
+        return [self.elements[pk] for pk in self.sorted_pks()]
+
+    ###############################################################
+    ##############  Mutators (concrete backend)  ##################
+
+    def set_row(self, pk: PK, row: Tuple[Flags, Element]) -> 'Table':
+        '''set the row of the given PK in this table, and return the delta: a table with only that row.
+            This is the only method that changes the rows of a table, so every mutation goes through here.'''
+        if self.state_hash is not None and pk in self.elements:
+            self.state_hash -= self.row_hash(pk)
+        self.elements[pk] = row
+        self.digests.pop(pk, None)
+        self.epoch += 1
+        if self.state_hash is not None:
+            self.state_hash = (self.state_hash + self.row_hash(pk)) & MASK
+        for observer in self.live_observers():
+            observer.row_changed(self, pk)
+        return self.copy({pk: row})
+
+    def add_observer(self, observer):
+        '''the observer (ex: MerkleIndex) is notified with observer.row_changed(table, pk) after every change of a row of this table.
+            Tables returned by merge (unless it returns one of the tables, see includes) or copy are new tables, without observers: 
+            to keep the indexes of a replica, change it in place (ex: apply_delta), or declare them as secondary indexes (see add_index).
+            The table keeps only a weak reference to the observer: an observer that nobody else references (ex: the FK_System replaced by its merge,
+            see FK_System.watch) is dropped, and its index is not updated anymore.'''
+        self.observers.append(weakref.ref(observer))
+
+    def live_observers(self) -> list:
+        '''return the observers of this table that are still alive (see add_observer), and forget the others.'''
+        observers = [observer() for observer in self.observers]
+        if any(observer is None for observer in observers):
+            self.observers = [ref for ref, observer in zip(self.observers, observers) if observer is not None]
+            observers = [observer for observer in observers if observer is not None]
+        return observers
+
+    def add_index(self, index: 'AttributeIndex'):
+        '''declare the given secondary index (see AttributeIndex) of this table: it observes the rows of this table (see add_observer),
+            and the tables returned by merge get a copy of it (see keep_indexes), so the indexes are there also when a replica replaces its table by a merge.'''
+        self.indexes[index.attribute] = index
+        self.add_observer(index)
+
+    def keep_indexes(self, table: 'Table', pks: Iterable[PK]):
+        '''declare in this table (a merge of the given table) copies of the secondary indexes of the given table,
+            updated only with the rows of the given PKs: the rows that are not the same in both tables.'''
+        for index in table.indexes.values():
+            index = index.copy()
+            for pk in pks:
+                index.row_changed(self, pk)
+            self.add_index(index)
+
+    def apply_delta(self, delta: 'Table') -> 'Table':
+        '''merge the rows of the given delta (or group of deltas) into this table, in place, and return this table.
+            The same as self.merge(delta), but it only goes through the rows of the delta, and skips the rows we already have
+            (all of them if this table already has the delta, see includes).'''
+        if self.includes(delta):
+            return self
+        for pk, row in delta.elements.items():
+            own_row = self.elements.get(pk)
+            if own_row is None:
+                self.set_row(pk, row)
+            elif own_row is not row and self.row_digest(pk) != delta.row_digest(pk):
+                self.set_row(pk, self.merge_row(own_row, row))
+        self.record_merge([delta])
+        return self
+
+    def load_columns(self, elem_class: Type[Element], schema: List[type], columns: Dict[str, Iterable], flags: Flags, stamp: Time = None) -> 'Table':
+        '''insert the rows of the given columns in one pass, all with the given flags, and return this table (see load of Table_DW and Table_UW).
+            The columns are lists or numpy arrays, named as in Table_DW_Columnar: for each attribute i of the Element (of class schema[i]),
+            column "i" (rows x number of PK args, or just rows for PKs with one arg) if it is a PK/FK,
+            or "i.value" if it is a LWWRegister, with "i.replica" and "i.counter" for its stamps (else the given stamp is the stamp of all rows).
+            For big initial loads: the CHECK constraints of all rows are checked at once (see check_columns), the rows share the same flags and stamps
+            (they are never changed in place, and neither are the FKs, so the rows that reference the same PK share one FK object),
+            and there is no delta, digest or epoch per row (as in set_row).
+            A row with a PK that this table already has (or that an earlier row has) is merged into it.
+            The observers are notified of each row (row_changed), or of all loaded rows at once if they have a rows_loaded method (ex: FKIndex).
+            @Pre: concrete table'''
+        arrays = {name: np.asarray(column) for name, column in columns.items()}
+        number_of_rows = self.check_columns(elem_class, schema, arrays, stamp)
+        if not (is_true(flags.reachable()) and flags.DI_flag != Status.DELETED and self.reachable_complement(flags)):
+            raise ValueError(f"the flags of the rows to load of {elem_class.__name__} are not reachable")
+        if number_of_rows == 0:
+            return self
+
+        # the attributes of all rows, one list per attribute, with python values (like the rows built one by one)
+        attributes = []
+        for i, attribute_class in enumerate(schema):
+            if issubclass(attribute_class, PK) and i == 0:
+                attributes.append([attribute_class(*pk_args) for pk_args in arrays["0"].reshape(number_of_rows, -1).tolist()])
+            elif issubclass(attribute_class, PK): # one FK object per referenced PK, shared by the rows that reference it (PKs are never changed in place)
+                fks, rows = np.unique(arrays[str(i)].reshape(number_of_rows, -1), axis=0, return_inverse=True)
+                attributes.append(list(map([attribute_class(*pk_args) for pk_args in fks.tolist()].__getitem__, rows.ravel().tolist())))
+            elif f"{i}.replica" in arrays:
+                stamps = map(LamportClock, arrays[f"{i}.replica"].tolist(), arrays[f"{i}.counter"].tolist())
+                attributes.append(list(map(LWWRegister, arrays[f"{i}.value"].tolist(), stamps)))
+            else:
+                attributes.append([LWWRegister(value, stamp) for value in arrays[f"{i}.value"].tolist()])
+
+        elements, digests, pks = self.elements, self.digests, []
+        observers = self.live_observers()
+        row_observers = [observer for observer in observers if not hasattr(observer, "rows_loaded")]
+        for elem in map(elem_class, *attributes):
+            pk = elem.getPK()
+            own_row = elements.get(pk)
+            if own_row is None:
+                elements[pk] = (flags, elem)
+            else:
+                elements[pk] = self.merge_row(own_row, (flags, elem))
+                digests.pop(pk, None)
+            pks.append(pk)
+            for observer in row_observers:
+                observer.row_changed(self, pk)
+        for observer in observers:
+            if hasattr(observer, "rows_loaded"): # ex: FKIndex, which indexes all loaded rows at once
+                observer.rows_loaded(self, pks)
+        self.state_hash = None # computed again when it is asked (see state_digest)
+        self.epoch += 1
+        return self
+
+    @staticmethod
+    def check_columns(elem_class: Type[Element], schema: List[type], arrays: Dict[str, np.ndarray], stamp: Time = None) -> int:
+        '''check that the given columns (see load_columns) have the same number of rows, and all rows hold the CHECK constraints of the Element,
+            and return the number of rows. The constraints are checked for all rows at once: elem_class.reachable of one element
+            whose attributes have the columns as values, where the comparisons give numpy arrays (and And/Or of Terms accept them).
+            @raise ValueError: with the rows that do not hold the constraints.'''
+        args = []
+        for i, attribute_class in enumerate(schema):
+            if issubclass(attribute_class, PK):
+                pk_column = arrays[str(i)]
+                args.append(attribute_class(*(pk_column.T if pk_column.ndim > 1 else [pk_column])))
+            elif issubclass(attribute_class, LWWRegister):
+                if f"{i}.replica" in arrays:
+                    args.append(LWWRegister(arrays[f"{i}.value"], LamportClock(arrays[f"{i}.replica"], arrays[f"{i}.counter"])))
+                elif stamp is not None:
+                    args.append(LWWRegister(arrays[f"{i}.value"], stamp))
+                else:
+                    raise ValueError(f"no stamps for the attribute {i} of {elem_class.__name__}: give the columns {i}.replica and {i}.counter, or a stamp")
+            else:
+                raise TypeError(f"load_columns does not support attributes of type {attribute_class.__name__}")
+        lengths = {len(column) for column in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"the columns of {elem_class.__name__} have different numbers of rows: {sorted(lengths)}")
+        number_of_rows = lengths.pop() if lengths else 0
+        if number_of_rows == 0:
+            return 0
+        holds = np.broadcast_to(np.asarray(elem_class(*args).reachable(), dtype=bool), (number_of_rows,))
+        if not holds.all():
+            bad_rows = np.flatnonzero(~holds)
+            raise ValueError(f"{len(bad_rows)} rows do not hold the CHECK constraints of {elem_class.__name__}, ex: rows {bad_rows[:10].tolist()}")
+        return number_of_rows
+
     def copy (self, newElements: Dict[PK, Tuple[Flags, Element]]) -> 'Table':
         '''return a new DWTable with the given elements.'''
         return self.__class__(newElements, self.before)
@@ -99,6 +466,9 @@ class Table(CvRDT['Table']):
             args_for_flags = [str(i) + "_DWTab_" + extra_id, elem.number_of_FKs] if flags == Flags_DW else [str(i) + "_DWTab_" + extra_id, clock]
             flag1_args, flag2_args, flag3_args, flag_vars_for_instance1, flag_args_for_instance2, flag_args_for_instance3 = flags.getArgs(*args_for_flags)
             
+            # the 3 PKs of this row share the same slot, so they may alias in the proofs (see PK.slot)
+            elem1.getPK().slot = elem2.getPK().slot = elem3.getPK().slot = i
+
             elements1[elem1.getPK()] = (flags(*flag1_args), elem1)
             elements2[elem2.getPK()] = (flags(*flag2_args), elem2)
             elements3[elem3.getPK()] = (flags(*flag3_args), elem3)
@@ -107,14 +477,13 @@ class Table(CvRDT['Table']):
             vars_for_instance2 += elem_args_for_instance2 + flag_args_for_instance2
             vars_for_instance3 += elem_args_for_instance3 + flag_args_for_instance3
         
-        before_args1, before_args2, before_args3, before_args_for_instance1, before_args_for_instance2, before_args_for_instance3 = clock.getBeforeFunArgs("DWTab_"+extra_id)
+        before_args1, _, _, before_args_for_instance1, _, _ = clock.getBeforeFunArgs("DWTab_"+extra_id)
 
+        # replicas must have the same notion of time, so the 3 instances share the same symbolic "before" function (and its variables are only in those of instance 1)
         args1 = [elements1, *before_args1]
-        args2 = [elements2, *before_args2]
-        args3 = [elements3, *before_args3]
+        args2 = [elements2, *before_args1]
+        args3 = [elements3, *before_args1]
 
         vars_for_instance1 += before_args_for_instance1
-        vars_for_instance2 += before_args_for_instance2
-        vars_for_instance3 += before_args_for_instance3
         
         return args1, args2, args3, vars_for_instance1, vars_for_instance2, vars_for_instance3
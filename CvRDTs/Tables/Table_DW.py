@@ -1,6 +1,7 @@
 
 from z3 import *
-from typing import Callable, Dict, Tuple
+from CvRDTs.Terms import If, is_true
+from typing import Callable, Dict, Iterable, List, Tuple, Type
 
 from CvRDTs.Tables.PK import PK
 from CvRDTs.Tables.Element import Element
@@ -24,23 +25,11 @@ class Table_DW(Table):
         return len(flags.fk_versions) == self.getNumFKs()
 
 
-    def merge(self, other: 'Table_DW'):
-        '''for each PK in maps, choose the element with bigger version, else merge them, or if that PK is present only in one map, so keep it.'''
-        # we can't use a simple zip because we need to merge elements with the same PK, and not the same index in the list. So we need to iterate over the keys of the maps: intersection_keys we know are in both maps, and the rest of the keys are in only one map.
-        merged_elems = {}
-        intersection_keys = set(self.elements.keys()).intersection(other.elements.keys())
-        for pk in intersection_keys:
-            e1 = self.elements.get(pk)
-            e2 = other.elements.get(pk)
-            merged_elem = e1[1].merge_with_version(e2[1], e1[0].version, e2[0].version)
-            merged_flags = e1[0].merge(e2[0])
-            merged_elems[pk] = (merged_flags, merged_elem)
-        for pk in set(self.elements.keys()).union(other.elements.keys()).difference(intersection_keys):
-            if pk in self.elements:
-                merged_elems[pk] = self.elements[pk]
-            else:
-                merged_elems[pk] = other.elements[pk]       
-        return self.copy(self.elements)
+    def merge_row(self, e1: Tuple[Flags_DW, Element], e2: Tuple[Flags_DW, Element]) -> Tuple[Flags_DW, Element]:
+        '''choose the element with bigger version, else merge them.'''
+        merged_elem = e1[1].merge_with_version(e2[1], e1[0].version, e2[0].version)
+        merged_flags = e1[0].merge(e2[0])
+        return (merged_flags, merged_elem)
 
 
     def getVersion(self, pk: PK) -> Int:
@@ -50,11 +39,37 @@ class Table_DW(Table):
         return If(is_true(elem_flags.DI_flag == Status.VISIBLE), elem_flags.version, Version.ERROR_VERSION)   
     
 
+    def insert(self, elem: Element, fk_versions: List[int]) -> 'Table_DW':
+        '''insert the given element with the versions of its FKs (the versions of the referenced rows), and return the delta.
+            Inserting a PK that already exists (ex: after a delete) creates a new version, which wins over the old one in the merge.'''
+        pk = elem.getPK()
+        version = self.elements[pk][0].version + 1 if pk in self.elements else Version.INIT_VERSION
+        return self.set_row(pk, (Flags_DW(version, Status.VISIBLE, fk_versions), elem))
+
+    def load(self, elem_class: Type[Element], schema: List[type], columns: Dict[str, Iterable], fk_versions: List[int] = None, stamp: Time = None) -> 'Table_DW':
+        '''insert all rows of the given columns (see Table.load_columns) with the same given versions of their FKs (by default INIT_VERSION),
+            and return this table. A loaded row of a PK that this table already has is merged into it (it is not a new version, as in insert).'''
+        fk_versions = [Version.INIT_VERSION] * self.getNumFKs() if fk_versions is None else fk_versions
+        return self.load_columns(elem_class, schema, columns, Flags_DW(Version.INIT_VERSION, Status.VISIBLE, fk_versions), stamp)
+
+    def update(self, elem: Element) -> 'Table_DW':
+        '''merge the given element (with the new values and stamps of its registers) into the existing row, and return the delta.
+            @Pre: the row of elem.getPK() exists.'''
+        flags, old_elem = self.elements[elem.getPK()]
+        return self.set_row(elem.getPK(), (flags, old_elem.merge(elem)))
+
+    def delete(self, pk: PK) -> 'Table_DW':
+        '''mark the row of the given PK as deleted, and return the delta.
+            @Pre: the row of the given PK exists.'''
+        flags, elem = self.elements[pk]
+        return self.set_row(pk, (flags.set_flag(Status.DELETED), elem))
+
+
     def setFlag(self, pk: PK, flag: Int):
         if pk not in self.elements:
             return self.copy(self.elements)
         elem = self.elements[pk]
-        self.elements[pk] = (elem[0].set_flag(flag), elem[1])
+        self.set_row(pk, (elem[0].set_flag(flag), elem[1]))
         return self.copy(self.elements)
 
 
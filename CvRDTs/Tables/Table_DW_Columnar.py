@@ -0,0 +1,176 @@
+import numpy as np
+from z3 import *
+from typing import Callable, Dict, List, Tuple, Type
+
+from CvRDTs.CvRDT import CvRDT
+from CvRDTs.Registers.LWWRegister import LWWRegister
+from CvRDTs.Tables.Element import Element
+from CvRDTs.Tables.Flags import Status
+from CvRDTs.Tables.Flags_DW import Flags_DW
+from CvRDTs.Tables.PK import PK
+from CvRDTs.Tables.Table_DW import Table_DW
+from CvRDTs.Time.LamportClock import LamportClock
+from CvRDTs.Time.Time import Time
+
+
+class Table_DW_Columnar(CvRDT['Table_DW_Columnar']):
+    '''Columnar (struct of arrays) version of a concrete Table_DW, for the concrete backend with big tables.
+        Instead of a dict PK -> (Flags_DW, Element) with a dozen python objects per row, each field is a numpy column:
+            - "version", "DI_flag" and "fk_versions" (rows x number of FKs) for the flags
+            - for each attribute i of the Element: column "i" (rows x number of PK args) if it is a PK/FK,
+              or columns "i.value", "i.replica" and "i.counter" if it is a LWWRegister (with a LamportClock)
+        The rows are sorted by PK (attribute 0), and merge does the same as Table_DW.merge with vectorized selects over the aligned rows.
+        It is not used in the proofs: Table_DW proves the same merge.'''
+
+    def __init__(self, table_class: Type[Table_DW], elem_class: Type[Element], schema: List[type], columns: Dict[str, np.ndarray], before: Callable[[Time, Time], bool]):
+        self.table_class = table_class # to convert back to the original table (see to_table)
+        self.elem_class = elem_class
+        self.schema = schema # the class of each attribute of the Element (a PK class or LWWRegister)
+        self.columns = columns
+        self.before = before
+
+    def __len__(self) -> int:
+        return len(self.columns["version"])
+
+    def nbytes(self) -> int:
+        '''memory of all columns, in bytes.'''
+        return sum(column.nbytes for column in self.columns.values())
+
+    ###############################################################
+    #######################  CvRDT methods  #######################
+
+    def compatible(self, that: 'Table_DW_Columnar') -> bool:
+        return self.schema == that.schema and self.before == that.before
+
+    def __eq__(self, that: 'Table_DW_Columnar') -> bool:
+        return (len(self) == len(that) and self.columns.keys() == that.columns.keys()
+                and all(np.array_equal(column, that.columns[name]) for name, column in self.columns.items()))
+
+    def equals(self, that: 'Table_DW_Columnar') -> bool:
+        '''override equals from CvRDT, because, like in Table, we compare the rows and not with compare.'''
+        return self.__eq__(that)
+
+    def compare(self, that: 'Table_DW_Columnar') -> bool:
+        # the same as Table.compare
+        return False
+
+    def merge(self, that: 'Table_DW_Columnar') -> 'Table_DW_Columnar':
+        '''@Pre: self.compatible(that)'''
+        if len(self) == 0 or len(that) == 0:
+            return that if len(self) == 0 else self
+
+        # align the rows of both tables by PK: rows[i] is the position in the merged table of the row i of (self rows + that rows)
+        keys, rows = np.unique(np.concatenate([self.key_view(), that.key_view()]), return_inverse=True)
+        rows = rows.ravel()
+        self_rows, that_rows = rows[:len(self)], rows[len(self):]
+
+        # a_* has the row of self (or of that if self does not have it), b_* the row of that (or of self)
+        # so the rows of only one table are merged with themselves, which keeps them (merge is idempotent)
+        def align(name: str):
+            self_column, that_column = self.columns[name], that.columns[name]
+            a = np.empty((len(keys),) + self_column.shape[1:], dtype=self_column.dtype)
+            b = np.empty_like(a)
+            a[that_rows], a[self_rows] = that_column, self_column
+            b[self_rows], b[that_rows] = self_column, that_column
+            return a, b
+
+        # flags, as in Flags_DW.merge
+        a_version, b_version = align("version")
+        a_flag, b_flag = align("DI_flag")
+        a_fks, b_fks = align("fk_versions")
+        a_newer, b_newer = a_version > b_version, b_version > a_version
+        columns = {
+            "version": np.maximum(a_version, b_version),
+            "DI_flag": np.where(a_newer, a_flag,
+                       np.where(b_newer, b_flag,
+                       np.where((a_flag == b_flag) | (a_flag == Status.DELETED), a_flag, b_flag))),
+            "fk_versions": np.where(a_newer[:, None], a_fks, np.where(b_newer[:, None], b_fks, np.maximum(a_fks, b_fks))),
+        }
+
+        # attributes, as in Element.merge_with_version
+        for i, attribute_class in enumerate(self.schema):
+            if issubclass(attribute_class, PK): # PKs and FKs must be equal so we just take the first one
+                columns[str(i)] = align(str(i))[0]
+                continue
+            a_value, b_value = align(f"{i}.value")
+            a_replica, b_replica = align(f"{i}.replica")
+            a_counter, b_counter = align(f"{i}.counter")
+            # choose a if it has a bigger version, or the same version and a stamp after or equal (see LamportClock.before)
+            choose_a = a_newer | (~b_newer & ((a_counter > b_counter) | ((a_counter == b_counter) & (a_replica >= b_replica))))
+            columns[f"{i}.value"] = np.where(choose_a, a_value, b_value)
+            columns[f"{i}.replica"] = np.where(choose_a, a_replica, b_replica)
+            columns[f"{i}.counter"] = np.where(choose_a, a_counter, b_counter)
+
+        return Table_DW_Columnar(self.table_class, self.elem_class, self.schema, columns, self.before)
+
+    ###############################################################
+    ##################  Conversion from/to Table_DW  ##############
+
+    def key_view(self) -> np.ndarray:
+        '''return the PKs (column "0") as one value per row (the bytes of the PK args), to sort and align rows by PK.'''
+        return Table_DW_Columnar.keys_of(self.columns["0"])
+
+    @staticmethod
+    def keys_of(pk_column: np.ndarray) -> np.ndarray:
+        keys = np.ascontiguousarray(pk_column)
+        return keys.view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).ravel()
+
+    @staticmethod
+    def sorted_by_pk(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        '''return the given columns with the rows sorted by PK (column "0").'''
+        if "0" not in columns:
+            return columns
+        order = np.argsort(Table_DW_Columnar.keys_of(columns["0"]), kind="stable")
+        return {name: column[order] for name, column in columns.items()}
+
+    @staticmethod
+    def from_table(table: Table_DW, elem_class: Type[Element]) -> 'Table_DW_Columnar':
+        '''return the columnar version of the given concrete table, with rows of the given Element class.
+            @Pre: all attributes of the Element are PKs or LWWRegisters with a LamportClock, and all values are ints.'''
+        rows = list(table.elements.values())
+        columns = {
+            "version": np.fromiter((flags.version for flags, _ in rows), dtype=np.int64, count=len(rows)),
+            "DI_flag": np.fromiter((flags.DI_flag for flags, _ in rows), dtype=np.int8, count=len(rows)),
+            "fk_versions": np.array([flags.fk_versions for flags, _ in rows], dtype=np.int64).reshape(len(rows), table.getNumFKs()),
+        }
+        schema, elem_columns = Table_DW_Columnar.element_columns([elem for _, elem in rows])
+        columns.update(elem_columns)
+        return Table_DW_Columnar(type(table), elem_class, schema, Table_DW_Columnar.sorted_by_pk(columns), table.before)
+
+    @staticmethod
+    def element_columns(elems: List[Element]) -> Tuple[List[type], Dict[str, np.ndarray]]:
+        '''return the schema and the columns of the attributes of the given elements (column "i" or "i.value", "i.replica", "i.counter").'''
+        schema = [type(arg) for arg in elems[0].elem_args] if elems else []
+        columns = {}
+        for i, attribute_class in enumerate(schema):
+            if issubclass(attribute_class, PK):
+                columns[str(i)] = np.array([elem.elem_args[i].pk_args for elem in elems], dtype=np.int64)
+            elif issubclass(attribute_class, LWWRegister):
+                columns[f"{i}.value"] = np.fromiter((elem.elem_args[i].value for elem in elems), dtype=np.int64, count=len(elems))
+                columns[f"{i}.replica"] = np.fromiter((elem.elem_args[i].stamp.replica for elem in elems), dtype=np.int64, count=len(elems))
+                columns[f"{i}.counter"] = np.fromiter((elem.elem_args[i].stamp.counter for elem in elems), dtype=np.int64, count=len(elems))
+            else:
+                raise TypeError(f"Table_DW_Columnar does not support attributes of type {attribute_class.__name__}")
+        return schema, columns
+
+    def to_table(self) -> Table_DW:
+        '''return the concrete Table_DW (of the original class) with the same rows.'''
+        columns = {name: column.tolist() for name, column in self.columns.items()}
+        elems = Table_DW_Columnar.elements_of(self.elem_class, self.schema, columns, len(self))
+        elements = {elem.getPK(): (Flags_DW(columns["version"][row], columns["DI_flag"][row], columns["fk_versions"][row]), elem)
+                    for row, elem in enumerate(elems)}
+        return self.table_class(elements, self.before)
+
+    @staticmethod
+    def elements_of(elem_class: Type[Element], schema: List[type], columns: Dict[str, list], number_of_rows: int) -> List[Element]:
+        '''return the elements of the given columns (as lists, see element_columns).'''
+        elems = []
+        for row in range(number_of_rows):
+            args = []
+            for i, attribute_class in enumerate(schema):
+                if issubclass(attribute_class, PK):
+                    args.append(attribute_class(*columns[str(i)][row]))
+                else:
+                    args.append(LWWRegister(columns[f"{i}.value"][row], LamportClock(columns[f"{i}.replica"][row], columns[f"{i}.counter"][row])))
+            elems.append(elem_class(*args))
+        return elems
@@ -1,6 +1,7 @@
 
 from z3 import *
-from typing import Callable, Dict, Tuple
+from CvRDTs.Terms import If, is_true
+from typing import Callable, Dict, Iterable, List, Tuple, Type
 
 from CvRDTs.Tables.PK import PK
 from CvRDTs.Tables.Element import Element
@@ -22,39 +23,50 @@ class Table_UW(Table):
         '''reachable method implemented in Table, and here the complement for the Update Wins Table.'''
         return True
 
-    def merge(self, other: 'Table_UW'):
-        '''for each PK in maps, choose the element with bigger version, else merge them, or if that PK is present only in one map, so keep it.'''
-        # we can't use a simple zip because we need to merge elements with the same PK, and not the same index in the list. So we need to iterate over the keys of the maps: intersection_keys we know are in both maps, and the rest of the keys are in only one map.
-        merged_elems = {}
-        intersection_keys = set(self.elements.keys()).intersection(other.elements.keys())
-        for pk in intersection_keys:
-            e1 = self.elements.get(pk)
-            e2 = other.elements.get(pk)
-            # merged_elem = e1[1].merge_with_version(e2[1], e1[0].version, e2[0].version)
-            merged_elem = e1[1].merge(e2[1])
-
-            merged_flags = e1[0].merge(e2[0])
-            merged_elems[pk] = (merged_flags, merged_elem)
-        for pk in set(self.elements.keys()).union(other.elements.keys()).difference(intersection_keys):
-            if pk in self.elements:
-                merged_elems[pk] = self.elements[pk]
-            else:
-                merged_elems[pk] = other.elements[pk]       
-        return self.copy(self.elements)
+    def merge_row(self, e1: Tuple[Flags_UW, Element], e2: Tuple[Flags_UW, Element]) -> Tuple[Flags_UW, Element]:
+        '''merge the flags and the elements (each attribute is merged by its own clock).'''
+        # merged_elem = e1[1].merge_with_version(e2[1], e1[0].version, e2[0].version)
+        merged_elem = e1[1].merge(e2[1])
+        merged_flags = e1[0].merge(e2[0])
+        return (merged_flags, merged_elem)
 
 
     def getVersion(self, pk: PK) -> Int:
+        '''UW rows do not have versions: INIT_VERSION if the row is visible, else ERROR_VERSION.'''
         if pk not in self.elements:
             return Version.ERROR_VERSION
         elem_flags = self.elements[pk][0]
-        return If(is_true(elem_flags.DI_flag == Status.VISIBLE), elem_flags.version, Version.ERROR_VERSION)   
+        return If(is_true(elem_flags.DI_flag == Status.VISIBLE), Version.INIT_VERSION, Version.ERROR_VERSION)   
     
 
+    def insert(self, elem: Element, time: Time) -> 'Table_UW':
+        '''insert the given element at the given time, and return the delta.'''
+        return self.set_row(elem.getPK(), (Flags_UW(Status.VISIBLE, Status.TOUCHED, time), elem))
+
+    def load(self, elem_class: Type[Element], schema: List[type], columns: Dict[str, Iterable], time: Time, stamp: Time = None) -> 'Table_UW':
+        '''insert all rows of the given columns (see Table.load_columns) at the given time, and return this table.
+            Without stamp columns, the registers have the given stamp, or the given time.'''
+        return self.load_columns(elem_class, schema, columns, Flags_UW(Status.VISIBLE, Status.TOUCHED, time), time if stamp is None else stamp)
+
+    def update(self, elem: Element, time: Time) -> 'Table_UW':
+        '''merge the given element (with the new values and stamps of its registers) into the existing row at the given time, and return the delta.
+            The update touches the row, so it wins over a concurrent delete.
+            @Pre: the row of elem.getPK() exists.'''
+        old_elem = self.elements[elem.getPK()][1]
+        return self.set_row(elem.getPK(), (Flags_UW(Status.VISIBLE, Status.TOUCHED, time), old_elem.merge(elem)))
+
+    def delete(self, pk: PK, time: Time) -> 'Table_UW':
+        '''mark the row of the given PK as deleted at the given time, and return the delta.
+            @Pre: the row of the given PK exists.'''
+        return self.set_row(pk, (Flags_UW(Status.DELETED, Status.NOT_TOUCHED, time), self.elements[pk][1]))
+
+
     def setFlag(self, pk: PK, flag: Int):
         if pk not in self.elements:
             return self.copy(self.elements)
         elem = self.elements[pk]
-        self.elements[pk] = (elem[0].set_flag(flag), elem[1])
+        self.set_row(pk, (elem[0].set_flag(flag), elem[1]))
+        self.merged_from.clear() # a DELETED flag with the same time is not a join (see Flags_UW.merge), so this table may not have the rows of those tables anymore (see Table.includes)
         return self.copy(self.elements)
 
 
@@ -0,0 +1,166 @@
+
+'''Our CvRDTs build And(...) and Or(...) over hundreds of sub-terms (one per row of a table, per entry of a vector...),
+    and many times nested like And(And(...), And(...)).
+    z3py coerces and checks each argument, and creates a new nested term for each And.
+    So each module of CvRDTs imports And, Or and If from here (after "from z3 import *"),
+    which flatten nested And/Or and build the n-ary term with just one call to the Z3 C API
+    (and also If, when its arguments don't need to be coerced).
+
+    Python bools (ex: len(self.vector) == len(that.vector)) are accepted as in z3py,
+    and True/False arguments are simplified (ex: And(x, True) is x; And(x, False) is False).
+
+    Concrete backend: when no argument is a Z3 term (ex: a GCounter or a Table_DW built with python ints),
+    And, Or, If, Not, Implies, Max, is_true and is_false evaluate directly with python values, without building any Z3 term.
+    So the same CvRDT classes (and the same merge logic we prove with Z3) run as live data structures in the replicas.
+    And and Or also accept numpy arrays of bools, element-wise (ex: the CHECK constraints of all rows of a bulk load, see Table.load_columns).'''
+
+import functools
+import operator
+from z3 import *
+import z3
+
+
+FAST_TERMS = True
+'''If False, And/Or/If are the ones of z3py (to compare build times, see benchmarks/bench_terms.py).
+    The concrete backend (python values) is used in both cases.'''
+
+
+def And(*args) -> BoolRef:
+    '''n-ary And of Z3 (same arguments as z3.And).'''
+    if len(args) == 1 and isinstance(args[0], (list, tuple)): # z3py also accepts And([a, b, c])
+        args = args[0]
+    if not _has_z3_term(args):
+        return _all(args)
+    if not FAST_TERMS:
+        return z3.And(*args)
+    return _mk_flat_term(args, Z3_OP_AND, Z3_mk_and, True)
+
+
+def Or(*args) -> BoolRef:
+    '''n-ary Or of Z3 (same arguments as z3.Or).'''
+    if len(args) == 1 and isinstance(args[0], (list, tuple)):
+        args = args[0]
+    if not _has_z3_term(args):
+        return _any(args)
+    if not FAST_TERMS:
+        return z3.Or(*args)
+    return _mk_flat_term(args, Z3_OP_OR, Z3_mk_or, False)
+
+
+def If(cond, a, b, ctx=None) -> ExprRef:
+    '''If of Z3 (same arguments as z3.If). 
+        When the condition and both branches are already Z3 terms of the same sort, 
+        we build the term with one call to the Z3 C API, without the coercions of z3py.'''
+    if not isinstance(cond, ExprRef):
+        return a if cond else b
+    if FAST_TERMS and isinstance(cond, BoolRef) and isinstance(a, ExprRef) and isinstance(b, ExprRef) and a.ctx is b.ctx is cond.ctx:
+        try:
+            return a.__class__(Z3_mk_ite(a.ctx.ref(), cond.as_ast(), a.as_ast(), b.as_ast()), a.ctx)
+        except Z3Exception: # different sorts (ex: Int and Real), so z3py must coerce them
+            pass
+    return z3.If(cond, a, b, ctx)
+
+
+def Not(a, ctx=None) -> BoolRef:
+    if not isinstance(a, ExprRef):
+        return not a
+    return z3.Not(a, ctx)
+
+
+def Implies(a, b, ctx=None) -> BoolRef:
+    if not isinstance(a, ExprRef):
+        return b if a else True
+    return z3.Implies(a, b, ctx)
+
+
+def is_true(a) -> bool:
+    '''True if `a` is the Z3 constant True, or the python value True.'''
+    if not isinstance(a, ExprRef):
+        return bool(a)
+    return z3.is_true(a)
+
+
+def is_false(a) -> bool:
+    '''True if `a` is the Z3 constant False, or the python value False.'''
+    if not isinstance(a, ExprRef):
+        return not a
+    return z3.is_false(a)
+
+
+def Max(*args) -> ArithRef:
+    '''max of the args (also accepts a single list): the python max for python values,
+        else a chain of If, the same as merging the args one by one with If(a > b, a, b).'''
+    if len(args) == 1 and isinstance(args[0], (list, tuple)):
+        args = args[0]
+    if not _has_z3_term(args):
+        return max(args)
+    merged = args[0]
+    for arg in args[1:]:
+        merged = If(merged > arg, merged, arg)
+    return merged
+
+
+def _all(args) -> bool:
+    try:
+        return all(args)
+    except ValueError: # the truth value of a numpy array with more than one element is ambiguous, so we And them element-wise
+        return functools.reduce(operator.and_, args, True)
+
+
+def _any(args) -> bool:
+    try:
+        return any(args)
+    except ValueError:
+        return functools.reduce(operator.or_, args, False)
+
+
+def _has_z3_term(args) -> bool:
+    for arg in args:
+        if isinstance(arg, ExprRef):
+            return True
+    return False
+
+
+def _mk_flat_term(args, op_kind: int, mk_term, neutral: bool) -> BoolRef:
+    '''build the term `op_kind` (And or Or) of all args, flattening the args that are also `op_kind` terms.
+        `neutral` is the value that can be removed from the args (True for And, False for Or),
+        and its negation is the value that decides the term (False for And, True for Or).'''
+    ctx = next((arg.ctx for arg in args if isinstance(arg, ExprRef)), None) or main_ctx()
+    ctx_ref = ctx.ref()
+
+    asts = []
+    pending = list(reversed(args)) # stack with python objects or Z3 asts; reversed to keep the order of the args
+    while pending:
+        arg = pending.pop()
+        if type(arg) is BoolRef: # most args: a bool application (not a quantifier), so we can ask its kind directly
+            arg = arg.as_ast()
+        elif isinstance(arg, bool):
+            if arg == neutral:
+                continue
+            return BoolVal(not neutral, ctx)
+        elif isinstance(arg, QuantifierRef):
+            asts.append(arg.as_ast())
+            continue
+        elif isinstance(arg, Ast): # a sub-term of a flattened arg
+            if Z3_get_ast_kind(ctx_ref, arg) != Z3_APP_AST:
+                asts.append(arg)
+                continue
+        else:
+            return z3.And(*args) if op_kind == Z3_OP_AND else z3.Or(*args) # let z3py coerce or raise its own error
+        # from here arg is an ast of a bool application
+        arg_kind = Z3_get_decl_kind(ctx_ref, Z3_get_app_decl(ctx_ref, arg))
+        if arg_kind == op_kind: # flatten: And(And(a, b), c) -> And(a, b, c)
+            pending.extend(Z3_get_app_arg(ctx_ref, arg, i) for i in reversed(range(Z3_get_app_num_args(ctx_ref, arg))))
+        elif arg_kind == (Z3_OP_TRUE if neutral else Z3_OP_FALSE):
+            continue
+        elif arg_kind == (Z3_OP_FALSE if neutral else Z3_OP_TRUE):
+            return BoolVal(not neutral, ctx)
+        else:
+            asts.append(arg)
+
+    if len(asts) == 0:
+        return BoolVal(neutral, ctx)
+    if len(asts) == 1:
+        return BoolRef(asts[0], ctx)
+    # the asts of the flattened args are kept alive by the args (which hold a reference to their sub-terms) until the new term holds them
+    return BoolRef(mk_term(ctx_ref, len(asts), (Ast * len(asts))(*asts)), ctx)
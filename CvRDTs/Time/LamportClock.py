@@ -1,6 +1,8 @@
 
 from z3 import *
 from z3 import BoolRef
+from typing import Tuple
+from CvRDTs.Terms import And, Or, If
 
 from CvRDTs.Time.Time import Time
 
@@ -29,6 +31,9 @@ class LamportClock(Time):
     def __hash__(self) -> int:
         '''because we implement __eq__, we must implement __hash__ to be able to use LamportClock as a key in a dictionary.'''
         return hash((self.replica, self.counter))
+
+    def digest(self) -> Tuple[int, int]:
+        return (self.replica, self.counter)
     
 
     # equals is as defined in CvRDT
@@ -37,7 +42,9 @@ class LamportClock(Time):
         return self.before_or_equal(that)
     
     def merge(self, that: 'LamportClock') -> 'LamportClock':
-        return self.sync(that)
+        '''the later of both clocks in the total order of before (the join of that order, so the merge of the Flags with times is associative;
+            sync, the max replica and max counter, can be after both clocks, ex: (2,2) and (3,1) sync to (3,2)).'''
+        return self.get_after_or_equal_stamp(that)
 
     def merge_with_version(self, that: 'LamportClock', this_version: int, that_version: int) -> 'LamportClock':
         merged_replica = If(this_version > that_version, self.replica, 
@@ -65,6 +72,9 @@ class LamportClock(Time):
     def before(self, that: 'LamportClock') -> BoolRef: # impose a total order using the replica id
         return Or(And(self.counter == that.counter, self.replica < that.replica), self.counter < that.counter)
 
+    def choose(self, cond: BoolRef, that: 'LamportClock') -> 'LamportClock':
+        return LamportClock(If(cond, self.replica, that.replica), If(cond, self.counter, that.counter))
+
     ########################################################################
     ################    HelperMethods For Tables       #####################
     
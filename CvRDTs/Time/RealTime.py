@@ -1,5 +1,6 @@
 
 from z3 import *
+from typing import Tuple
 
 from CvRDTs.Time.Time import Time
 
@@ -24,6 +25,9 @@ class RealTime(Time):
     def __hash__(self) -> int:
         '''because we implement __eq__, we must implement __hash__ to be able to use RealTime as a key in a dictionary.'''
         return hash(self.value)
+
+    def digest(self) -> Tuple[int]:
+        return (self.value,)
     
     # equals defined in CvRDT
     
@@ -40,6 +44,9 @@ class RealTime(Time):
 
     def before(self, other: 'RealTime') -> bool:
         return self.value < other.value
+
+    def choose(self, cond: BoolRef, other: 'RealTime') -> 'RealTime':
+        return RealTime(If(cond, self.value, other.value))
     
     @staticmethod
     def getArgs(extra_id: str):
@@ -1,6 +1,7 @@
 
 from typing import Tuple
 from z3 import *
+from CvRDTs.Terms import And, Or, Not
 from abc import abstractmethod
 
 from CvRDTs.CvRDT import CvRDT
@@ -13,6 +14,16 @@ class Time(CvRDT['Time']):
     def before(self, other: 'Time') -> bool:
         pass
 
+    @abstractmethod
+    def choose(self, cond: BoolRef, other: 'Time') -> 'Time':
+        '''return a time equal to `self` if `cond` holds, else to `other`. (the If of Z3 for times)'''
+        pass
+
+    @abstractmethod
+    def digest(self) -> Tuple:
+        '''return the values of this time in a tuple (concrete backend), to compare rows of tables without calling __eq__ (see Table.row_digest).'''
+        pass
+
     def before_or_equal(self, other: 'Time') -> BoolRef:
         return Or(self == other, self.before(other))
 
@@ -1,6 +1,7 @@
 
-from typing import List
+from typing import List, Tuple
 from z3 import *
+from CvRDTs.Terms import And, Or, If, Max
 
 from CvRDTs.Time.Time import Time
 
@@ -22,11 +23,17 @@ class VersionVector(Time):
                     self.wellFormed()) 
 
     def __eq__(self, that: 'VersionVector') -> BoolRef:
-        return And(self.vector == that.vector)
+        # entry by entry, because == of python lists asks bool() of each pair of Int terms, which is False unless they are the same term
+        return And(len(self.vector) == len(that.vector), *[a == b for a, b in zip(self.vector, that.vector)])
 
     def __hash__(self) -> int:
         '''because we implement __eq__, we must implement __hash__ to be able to use VersionVector as a key in a dictionary.'''
-        return hash(tuple(self.vector))
+        return hash(self.digest())
+
+    def digest(self) -> Tuple:
+        '''the size and the (replica, counter) pairs with a counter > 0: the same for equal vectors of every representation
+            (VersionVector, VersionVector_NP and VersionVector_Sparse), as the rows of tables need (see Table.row_digest).'''
+        return (len(self.vector), tuple((replica, counter) for replica, counter in enumerate(self.vector) if not (isinstance(counter, int) and counter == 0)))
     
     # equals = this <= that && that <= this implemented in CvRDT class
         
@@ -36,6 +43,13 @@ class VersionVector(Time):
     def merge(self, that: 'VersionVector') -> 'VersionVector':
         return self.sync(that)
 
+    def merge_all(self, states: List['VersionVector']) -> 'VersionVector':
+        sparse = next((state for state in states if state.is_sparse()), None)
+        if sparse is not None: # merged by the sparse one, so the representation of the result depends on its fill ratio and not on the order of the merge
+            return sparse.merge_all([self, *[state for state in states if state is not sparse]])
+        # the max of each column (the entries of the same replica in all vectors), without a VersionVector for each merge
+        return VersionVector([Max(column) for column in zip(self.vector, *[state.vector for state in states])])
+
     ######################################################################
     #################       VersionVector Operations       ###############
     
@@ -44,8 +58,8 @@ class VersionVector(Time):
     
     def wellFormed(self) -> BoolRef:
         ''' it's not necessary for vectors start in 0, but it's more logical and easier to understand. 
-            Also it's important that every idx has an int value and is not None.'''
-        return And(*[And(isinstance(v, int), v >= 0) for v in self.vector])
+            Also it's important that every idx has an int value and is not None (a python int, or an Int of Z3 in the proofs).'''
+        return And(*[v >= 0 if isinstance(v, (int, ArithRef)) else False for v in self.vector])
     
     def networkSize(self) -> int:
         return len(self.vector)
@@ -57,16 +71,26 @@ class VersionVector(Time):
 
     def before(self, that: 'VersionVector') -> BoolRef:
         # we can use zip because we know each idx corresponds to the same replica, and also vectors have the same size so there will be no elements left in the longest vector)
-        vectors = zip(self.vector, that.vector)
+        vectors = list(zip(self.vector, that.vector)) # a list, because we go through it twice
         return And(
             And(*[a <= b for a, b in vectors]), # all values <= 
             Or(*[a < b for a, b in vectors]))   # && exists at least one value <
 
     def sync(self, that) -> 'VersionVector':
+        if that.is_sparse(): # see merge_all
+            return that.sync(self)
         # we can use zip because we know each idx corresponds to the same replica, and also vectors have the same size so there will be no elements left in the longest vector)
         new_vector = [If(a >= b, a, b) for a, b in zip(self.vector, that.vector)]
         return VersionVector(new_vector)
 
+    def choose(self, cond: BoolRef, that: 'VersionVector') -> 'VersionVector':
+        '''@Pre: self.compatible(that)'''
+        return VersionVector([If(cond, a, b) for a, b in zip(self.vector, that.vector)])
+
+    def is_sparse(self) -> bool:
+        '''True for VersionVector_Sparse, whose merges with dense vectors choose the representation of the result (see VersionVector_Sparse.build).'''
+        return False
+
     
 
 
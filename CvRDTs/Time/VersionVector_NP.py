@@ -0,0 +1,59 @@
+import numpy as np
+from z3 import *
+from typing import List, Tuple
+
+from CvRDTs.Time.VersionVector import VersionVector
+
+class VersionVector_NP(VersionVector):
+    '''VersionVector with the vector in a numpy array, for the concrete backend (python values) with many replicas.
+        sync is a np.maximum of the vectors, and before/compare are vectorized comparisons.
+        It is not used in the proofs: the symbolic VersionVector proves the same merge.'''
+
+    def __init__(self, vector: List[int]):
+        super().__init__(np.asarray(vector, dtype=np.int64))
+
+    ########################################################################
+    ###################         CvRDT methods         ######################
+
+    def __eq__(self, that: 'VersionVector_NP') -> bool:
+        return np.array_equal(self.vector, that.vector)
+
+    def __hash__(self) -> int:
+        return hash(self.digest())
+
+    def digest(self) -> Tuple:
+        '''the same digest as the other VersionVectors (see VersionVector.digest).'''
+        replicas = np.flatnonzero(self.vector)
+        return (len(self.vector), tuple(zip(replicas.tolist(), self.vector[replicas].tolist())))
+
+    def merge_all(self, states: List['VersionVector_NP']) -> 'VersionVector_NP':
+        sparse = next((state for state in states if state.is_sparse()), None)
+        if sparse is not None: # see VersionVector.merge_all
+            return sparse.merge_all([self, *[state for state in states if state is not sparse]])
+        return VersionVector_NP(np.maximum.reduce([self.vector, *[state.vector for state in states]]))
+
+    def compare(self, that: 'VersionVector_NP') -> bool:
+        '''self <= that in every entry (the same as before_or_equal, with one pass over the vectors).'''
+        return bool((self.vector <= that.vector).all())
+
+    ######################################################################
+    #################       VersionVector Operations       ###############
+
+    def wellFormed(self) -> bool:
+        return bool((self.vector >= 0).all())
+
+    def increment(self, replica: int) -> 'VersionVector_NP':
+        new_vector = self.vector.copy()
+        new_vector[replica] += 1
+        return VersionVector_NP(new_vector)
+
+    def before(self, that: 'VersionVector_NP') -> bool:
+        return bool((self.vector <= that.vector).all()) and bool((self.vector < that.vector).any())
+
+    def sync(self, that: 'VersionVector_NP') -> 'VersionVector_NP':
+        if that.is_sparse():
+            return that.sync(self)
+        return VersionVector_NP(np.maximum(self.vector, that.vector))
+
+    def choose(self, cond: bool, that: 'VersionVector_NP') -> 'VersionVector_NP':
+        return self if cond else that
@@ -0,0 +1,111 @@
+from z3 import *
+from typing import Dict, List, Tuple, Type
+
+from CvRDTs.Time.VersionVector import VersionVector
+
+SPARSE_FILL_RATIO = 0.25
+'''VersionVector_Sparse.build keeps a vector sparse while at most this fraction of its replicas have a counter > 0, else it becomes dense.'''
+
+class VersionVector_Sparse(VersionVector):
+    '''VersionVector that keeps only the replicas with a counter > 0, in a dict replica -> counter, for the concrete backend.
+        With many replicas and rows touched by one or two of them (ex: the time of Flags_UW),
+        it takes O(touched replicas) memory and time instead of O(replicas).
+        It has the same before/sync/concurrent as VersionVector (the missing replicas are 0), and can be compared and merged with dense ones.
+        Every merge (sync, merge_all) with a sparse vector, in any order and with dense vectors too, returns the representation
+        for the fill ratio of the result (see build), so a vector becomes dense when it fills up, and a dense result with few counters becomes sparse.
+        Merges of only dense vectors stay dense (the symbolic VersionVector of the proofs is dense): use compact to choose the representation of those.
+        A dense result is of the class of the dense operands (ex: VersionVector_NP stays VersionVector_NP), see dense_class.
+        It is not used in the proofs: the symbolic VersionVector proves the same merge.'''
+
+    def __init__(self, entries: Dict[int, int], size: int, dense_class: Type[VersionVector] = VersionVector):
+        self.entries = {replica: counter for replica, counter in entries.items() if counter != 0}
+        self.size = size
+        self.dense_class = dense_class # the class of this vector when it becomes dense (see build)
+
+    @property
+    def vector(self) -> List[int]:
+        '''the dense vector (only for the methods of VersionVector that are not overridden here).'''
+        return [self.entries.get(replica, 0) for replica in range(self.size)]
+
+    ########################################################################
+    ###################         CvRDT methods         ######################
+
+    def __eq__(self, that: VersionVector) -> bool:
+        return self.size == that.networkSize() and self.entries == VersionVector_Sparse.entries_of(that)
+
+    def __hash__(self) -> int:
+        return hash(self.digest())
+
+    def is_sparse(self) -> bool:
+        return True
+
+    def digest(self) -> Tuple:
+        '''the same digest as the other VersionVectors (see VersionVector.digest).'''
+        return (self.size, tuple(sorted(self.entries.items())))
+
+    def equals(self, that: VersionVector) -> bool:
+        '''override equals from CvRDT, which requires `that` to be of the same class, so we can compare with dense vectors.'''
+        return self.__eq__(that)
+
+    def compare(self, that: VersionVector) -> bool:
+        '''self <= that in every entry.'''
+        that_entries = VersionVector_Sparse.entries_of(that)
+        return all(counter <= that_entries.get(replica, 0) for replica, counter in self.entries.items())
+
+    def merge_all(self, states: List[VersionVector]) -> VersionVector:
+        merged = dict(self.entries)
+        dense_class = next((type(state) for state in states if not state.is_sparse()), self.dense_class)
+        for state in states:
+            for replica, counter in VersionVector_Sparse.entries_of(state).items():
+                if counter > merged.get(replica, 0):
+                    merged[replica] = counter
+        return VersionVector_Sparse.build(merged, self.size, dense_class)
+
+    ######################################################################
+    #################       VersionVector Operations       ###############
+
+    def wellFormed(self) -> bool:
+        return all(isinstance(counter, int) and counter >= 0 for counter in self.entries.values())
+
+    def networkSize(self) -> int:
+        return self.size
+
+    def increment(self, replica: int) -> VersionVector:
+        new_entries = dict(self.entries)
+        new_entries[replica] = new_entries.get(replica, 0) + 1
+        return VersionVector_Sparse.build(new_entries, self.size, self.dense_class)
+
+    def before(self, that: VersionVector) -> bool:
+        # all values <= && exists at least one value < (only the replicas of `that` can have a bigger counter, because the counters are >= 0)
+        that_entries = VersionVector_Sparse.entries_of(that)
+        return self.compare(that) and any(self.entries.get(replica, 0) < counter for replica, counter in that_entries.items())
+
+    def sync(self, that: VersionVector) -> VersionVector:
+        return self.merge_all([that])
+
+    def choose(self, cond: bool, that: VersionVector) -> VersionVector:
+        return self if cond else that
+
+    ######################################################################
+    #################       Dense/Sparse representation       ############
+
+    @staticmethod
+    def entries_of(version_vector: VersionVector) -> Dict[int, int]:
+        '''return the replicas with a counter > 0 of any VersionVector (sparse or dense), with python int counters (not np.int64 of VersionVector_NP).'''
+        if isinstance(version_vector, VersionVector_Sparse):
+            return version_vector.entries
+        return {replica: int(counter) for replica, counter in enumerate(version_vector.vector) if counter != 0}
+
+    @staticmethod
+    def build(entries: Dict[int, int], size: int, dense_class: Type[VersionVector] = VersionVector) -> VersionVector:
+        '''return a sparse VersionVector with the given entries, or a dense one of the given class (VersionVector or VersionVector_NP)
+            if more than SPARSE_FILL_RATIO of the replicas have a counter > 0.'''
+        if len(entries) <= SPARSE_FILL_RATIO * size:
+            return VersionVector_Sparse(entries, size, dense_class)
+        return dense_class([entries.get(replica, 0) for replica in range(size)])
+
+    @staticmethod
+    def compact(version_vector: VersionVector) -> VersionVector:
+        '''return the given VersionVector in the best representation for its fill ratio (see build).'''
+        dense_class = version_vector.dense_class if version_vector.is_sparse() else type(version_vector)
+        return VersionVector_Sparse.build(VersionVector_Sparse.entries_of(version_vector), version_vector.networkSize(), dense_class)
@@ -0,0 +1,93 @@
+import asyncio
+import random
+import resource
+from typing import Dict, List, Tuple
+
+from Replication.Gossip import Gossiper
+from Replication.Network import Network
+from Replication.Replica import Replica
+from Replication.Workload import ALBS_TABLE, Workload, initial_system
+
+
+class Cluster:
+    '''Simulator of a cluster of replicas of a concrete Alb_FK_System (see Workload.initial_system), all in one process:
+        each replica is a few asyncio tasks (merge its inbox, anti-entropy, and its part of the workload), connected by a simulated Network.
+        run returns the metrics of the run: merge throughput, latency of the operations until they reach each replica,
+        time to converge after the workload (and the partition) ends, and memory.
+        Without `gossip`, each replica sends each delta to all peers, and its full state to a random peer every anti_entropy_interval;
+        with `gossip` (the arguments of Gossiper, ex: {"fanout": 2}), a Gossiper of each replica sends the deltas in batches.'''
+
+    def __init__(self, number_of_replicas: int, seed: int = 0, latency: Tuple[float, float] = (0.001, 0.005), loss: float = 0.0, reorder: float = 0.0,
+                 workload: Workload = None, anti_entropy_interval: float = 0.1, gossip: Dict = None, inbox_size: int = 0):
+        self.rand = random.Random(seed)
+        self.network = Network(random.Random(seed), latency, loss, reorder)
+        self.workload = workload if workload is not None else Workload(random.Random(seed))
+        self.anti_entropy_interval = anti_entropy_interval
+        ids = list(range(number_of_replicas))
+        self.replicas = [Replica(i, initial_system(random.Random(seed), self.workload.referenced_rows), self.network,
+                                 [peer for peer in ids if peer != i], random.Random(seed + i + 1), inbox_size)
+                         for i in ids]
+        if gossip is not None:
+            for replica in self.replicas:
+                replica.gossiper = Gossiper(replica.replica_id, replica.tables, self.network, replica.peers, random.Random(seed - replica.replica_id - 1),
+                                            full_state=replica.full_state, **gossip)
+
+    def converged(self) -> bool:
+        return all(self.replicas[0].converged(replica) for replica in self.replicas[1:])
+
+    async def load(self, replica: Replica, duration: float, operations_per_second: float):
+        '''the operations of the workload in the given replica, at random times (Poisson), during `duration` seconds.'''
+        loop = asyncio.get_running_loop()
+        end = loop.time() + duration
+        next_time = loop.time() + self.rand.expovariate(operations_per_second)
+        while next_time < end:
+            await asyncio.sleep(next_time - loop.time()) # catches up if the loop is late (several operations without waiting)
+            replica.broadcast(self.workload.operation(replica))
+            next_time += self.rand.expovariate(operations_per_second)
+
+    async def split(self, partition: Tuple[float, float]):
+        '''split the replicas in 2 halves from partition[0] to partition[1] seconds after the start.'''
+        await asyncio.sleep(partition[0])
+        half = len(self.replicas) // 2
+        self.network.partition([[replica.replica_id for replica in self.replicas[:half]], [replica.replica_id for replica in self.replicas[half:]]])
+        await asyncio.sleep(partition[1] - partition[0])
+        self.network.heal()
+
+    async def run(self, duration: float, operations_per_second: float, partition: Tuple[float, float] = None, timeout: float = 30.0) -> Dict[str, float]:
+        '''run the workload (operations_per_second in the whole cluster) for `duration` seconds, and then wait for the replicas to converge.'''
+        loop = asyncio.get_running_loop()
+        background: List[asyncio.Task] = []
+        for replica in self.replicas:
+            background.append(asyncio.create_task(replica.run()))
+            if replica.gossiper is not None:
+                background.append(asyncio.create_task(replica.gossiper.run()))
+            else:
+                background.append(asyncio.create_task(replica.anti_entropy(self.anti_entropy_interval)))
+        if partition is not None:
+            background.append(asyncio.create_task(self.split(partition)))
+        await asyncio.gather(*[self.load(replica, duration, operations_per_second / len(self.replicas)) for replica in self.replicas])
+
+        start = loop.time()
+        while not self.converged() and loop.time() - start < timeout:
+            await asyncio.sleep(0.005)
+        convergence = loop.time() - start if self.converged() else float("inf")
+        for task in background:
+            task.cancel()
+
+        latencies = sorted(latency for replica in self.replicas for latency in replica.latencies)
+        merge_time = sum(replica.merge_time for replica in self.replicas)
+        merged_rows = sum(replica.merged_rows for replica in self.replicas)
+        return {
+            "operations": sum(replica.operations for replica in self.replicas),
+            "messages sent": self.network.sent,
+            "messages lost": self.network.lost,
+            "merges": sum(replica.merges for replica in self.replicas),
+            "deferred sends": sum(peer["deferred"] for replica in self.replicas if replica.gossiper is not None
+                                  for peer in replica.gossiper.metrics().values()),
+            "merged rows per second": merged_rows / merge_time if merge_time else 0.0,
+            "mean latency (ms)": 1e3 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "p99 latency (ms)": 1e3 * latencies[int(0.99 * (len(latencies) - 1))] if latencies else 0.0,
+            "convergence (ms)": 1e3 * convergence,
+            "albums": len(self.replicas[0].tables[ALBS_TABLE].elements),
+            "max memory (MB)": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
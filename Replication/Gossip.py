@@ -0,0 +1,138 @@
+import asyncio
+import random
+from typing import Callable, Dict, List, Tuple
+
+from CvRDTs.CvRDT import CvRDT
+from CvRDTs.DeltaBuffer import DeltaBuffer
+from Replication.Network import Message, Network
+
+
+class Peer:
+    '''what a Gossiper keeps for each peer: the deltas not sent yet (one DeltaBuffer per state name) and the lag metrics.'''
+
+    def __init__(self, peer_id: int):
+        self.peer_id = peer_id
+        self.buffers: Dict[str, DeltaBuffer] = {}
+        self.operations: List[Tuple[Tuple[int, int], float]] = [] # the operations in the buffers (see Message)
+        self.oldest_pending: float = None # loop time of the first delta not sent yet
+        self.last_sent: float = None
+        self.sent = 0 # messages
+        self.deferred = 0 # rounds in which this peer was chosen but was full (backpressure)
+
+    def pending(self) -> int:
+        return sum(buffer.number_of_deltas for buffer in self.buffers.values())
+
+    def take(self) -> Tuple[Dict[str, CvRDT], List[Tuple[Tuple[int, int], float]]]:
+        '''return the joined deltas and their operations, and clear them.'''
+        deltas = {name: buffer.take() for name, buffer in self.buffers.items() if not buffer.is_empty()}
+        operations, self.operations, self.oldest_pending = self.operations, [], None
+        return deltas, operations
+
+
+class Gossiper:
+    '''Gossip scheduler of the concrete CvRDTs of a replica (`states` by name, ex: the tables of a FK_System, see Snapshot.tables_of).
+        The deltas of the local operations (see add) are joined per peer (see DeltaBuffer), and every round (see run):
+            - it sends the joined deltas to `fanout` random peers with pending deltas, and to all peers whose oldest pending delta
+              is older than `max_lag` seconds (so every peer gets every delta, in at most ~max_lag seconds)
+            - every `full_state_every` rounds it also sends the full state to a random peer (anti-entropy, for lost messages)
+            - peers whose inbox is full (Network.is_full) are skipped, and their deltas keep being joined until they can receive (backpressure)
+            - the interval of the rounds follows the rate of local deltas: about `target_batch` deltas per round,
+              between min_interval (busy replica) and max_interval (idle replica)
+        metrics returns the lag of each peer.'''
+
+    def __init__(self, node_id: int, states: Dict[str, CvRDT], network: Network, peers: List[int], rand: random.Random,
+                 fanout: int = 2, min_interval: float = 0.005, max_interval: float = 0.5, target_batch: int = 16,
+                 full_state_every: int = 20, max_lag: float = 0.1, full_state: Callable[[], Dict[str, CvRDT]] = None):
+        self.node_id = node_id
+        self.states = states
+        self.network = network
+        self.peers = {peer_id: Peer(peer_id) for peer_id in peers}
+        self.rand = rand
+        self.fanout = fanout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_batch = target_batch
+        self.full_state_every = full_state_every
+        self.max_lag = max_lag
+        self.full_state = full_state if full_state is not None else lambda: dict(self.states) # what to send in the full state rounds
+
+        self.interval = max_interval
+        self.rate = 0.0 # local deltas per second (moving average)
+        self.new_deltas = 0 # since the last round
+        self.rounds = 0
+
+    def add(self, deltas: Dict[str, CvRDT], operation: Tuple[Tuple[int, int], float] = None):
+        '''join the deltas of a local operation (already applied to the states) to the pending deltas of each peer.'''
+        now = asyncio.get_running_loop().time()
+        for peer in self.peers.values():
+            for name, delta in deltas.items():
+                peer.buffers.setdefault(name, DeltaBuffer()).add(delta)
+            if operation is not None:
+                peer.operations.append(operation)
+            if peer.oldest_pending is None:
+                peer.oldest_pending = now
+        self.new_deltas += 1
+
+    @staticmethod
+    def merge_into(states: Dict[str, CvRDT], deltas: Dict[str, CvRDT]):
+        '''merge the received deltas (or full states) into the given states: in place for tables (see Table.apply_delta), else by merge.'''
+        for name, delta in deltas.items():
+            state = states[name]
+            if hasattr(state, "apply_delta"):
+                state.apply_delta(delta)
+            else:
+                states[name] = state.merge(delta)
+
+    ###############################################################
+    ########################  Rounds  #############################
+
+    async def run(self):
+        '''gossip rounds, forever.'''
+        loop = asyncio.get_running_loop()
+        last_round = loop.time()
+        while True:
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            self.adapt(self.new_deltas / max(now - last_round, 1e-9))
+            self.new_deltas, last_round = 0, now
+            self.round(now)
+
+    def adapt(self, rate: float):
+        '''set the interval for about target_batch deltas per round, with the given rate of deltas (per second).'''
+        self.rate = 0.5 * self.rate + 0.5 * rate
+        interval = self.target_batch / self.rate if self.rate > 0 else self.max_interval
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
+
+    def round(self, now: float):
+        self.rounds += 1
+        pending = [peer for peer in self.peers.values() if peer.oldest_pending is not None]
+        chosen = set(self.rand.sample(pending, min(self.fanout, len(pending))))
+        chosen.update(peer for peer in pending if now - peer.oldest_pending >= self.max_lag)
+        for peer in chosen:
+            if self.network.is_full(peer.peer_id):
+                peer.deferred += 1
+                continue
+            deltas, operations = peer.take()
+            self.send(peer, Message(self.node_id, deltas, operations), now)
+
+        if self.rounds % self.full_state_every == 0:
+            peer = self.rand.choice(list(self.peers.values()))
+            if not self.network.is_full(peer.peer_id):
+                self.send(peer, Message(self.node_id, self.full_state()), now)
+
+    def send(self, peer: Peer, message: Message, now: float):
+        self.network.send(self.node_id, peer.peer_id, message)
+        peer.sent += 1
+        peer.last_sent = now
+
+    ###############################################################
+    ########################  Metrics  ############################
+
+    def metrics(self) -> Dict[int, Dict[str, float]]:
+        '''return the lag of each peer: deltas not sent yet, age of the oldest one (seconds), messages sent and rounds deferred by backpressure.'''
+        now = asyncio.get_running_loop().time()
+        return {peer.peer_id: {"pending deltas": peer.pending(),
+                               "lag (s)": now - peer.oldest_pending if peer.oldest_pending is not None else 0.0,
+                               "sent": peer.sent,
+                               "deferred": peer.deferred}
+                for peer in self.peers.values()}
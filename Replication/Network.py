@@ -0,0 +1,80 @@
+import asyncio
+import random
+from typing import Dict, List, Tuple
+
+from CvRDTs.CvRDT import CvRDT
+
+
+class Message:
+    '''what replicas send to each other: deltas (or full states) of CvRDTs by name, ex: the tables of a FK_System (see Snapshot.tables_of).'''
+
+    def __init__(self, sender: int, deltas: Dict[str, CvRDT], operations: List[Tuple[Tuple[int, int], float]] = None):
+        self.sender = sender
+        self.deltas = deltas
+        self.operations = operations or [] # (id, loop time) of the operations in these deltas (none for full states), to measure how long they take to reach each replica
+
+
+class Network:
+    '''Simulated network between replicas in the same process (asyncio), as a stand-in for real machines.
+        Each replica has an inbox (see connect), and send delivers a message to the inbox of the receiver after a random latency, unless:
+            - the message is lost (with probability `loss`)
+            - sender and receiver are in different groups of a partition (see partition and heal), when it is sent or delivered
+        With probability `reorder` a message gets an extra delay of the max latency, so it arrives after messages sent later
+        (with a fixed latency and no reorder, messages between 2 replicas arrive in the order they were sent).'''
+
+    def __init__(self, rand: random.Random, latency: Tuple[float, float] = (0.001, 0.005), loss: float = 0.0, reorder: float = 0.0):
+        self.rand = rand
+        self.latency = latency # min and max latency, in seconds
+        self.loss = loss
+        self.reorder = reorder
+        self.inboxes: Dict[int, asyncio.Queue] = {}
+        self.in_flight: Dict[int, int] = {} # messages sent to each replica and not delivered yet
+        self.groups: Dict[int, int] = {} # replica -> group of the current partition (all replicas are in group 0 if there is no partition)
+        self.sent = 0
+        self.lost = 0
+        self.delivered = 0
+
+    def connect(self, replica_id: int, max_size: int = 0) -> asyncio.Queue:
+        '''return the inbox of the given replica (with at most max_size messages waiting, if > 0).'''
+        self.inboxes[replica_id] = asyncio.Queue(max_size)
+        self.in_flight[replica_id] = 0
+        return self.inboxes[replica_id]
+
+    def backlog(self, replica_id: int) -> int:
+        '''return the messages on the way to the given replica or waiting in its inbox.'''
+        return self.in_flight[replica_id] + self.inboxes[replica_id].qsize()
+
+    def is_full(self, replica_id: int) -> bool:
+        '''True if the inbox of the given replica has a max size and its backlog reached it (so senders should wait: backpressure).'''
+        max_size = self.inboxes[replica_id].maxsize
+        return max_size > 0 and self.backlog(replica_id) >= max_size
+
+    def reachable(self, sender: int, receiver: int) -> bool:
+        return self.groups.get(sender, 0) == self.groups.get(receiver, 0)
+
+    def send(self, sender: int, receiver: int, message: Message):
+        self.sent += 1
+        if not self.reachable(sender, receiver) or self.rand.random() < self.loss:
+            self.lost += 1
+            return
+        delay = self.rand.uniform(*self.latency)
+        if self.rand.random() < self.reorder:
+            delay += self.latency[1]
+        self.in_flight[receiver] += 1
+        asyncio.get_running_loop().call_later(delay, self.deliver, sender, receiver, message)
+
+    def deliver(self, sender: int, receiver: int, message: Message):
+        self.in_flight[receiver] -= 1
+        inbox = self.inboxes[receiver]
+        if not self.reachable(sender, receiver) or inbox.full(): # partitioned while in transit, or the receiver is overloaded
+            self.lost += 1
+            return
+        self.delivered += 1
+        inbox.put_nowait(message)
+
+    def partition(self, groups: List[List[int]]):
+        '''split the replicas in the given groups: messages between groups are lost until heal.'''
+        self.groups = {replica_id: group for group, replica_ids in enumerate(groups) for replica_id in replica_ids}
+
+    def heal(self):
+        self.groups = {}
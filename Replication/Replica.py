@@ -0,0 +1,80 @@
+import asyncio
+import random
+import time
+from typing import Dict, List
+
+from CvRDTs.Tables.FK_System import FK_System
+from CvRDTs.Tables.Snapshot import Snapshot
+from CvRDTs.Tables.Table import Table
+from CvRDTs.Time.LamportClock import LamportClock
+from Replication.Gossip import Gossiper
+from Replication.Network import Message, Network
+
+
+class Replica:
+    '''A replica of a concrete FK_System in the simulator (see Cluster).
+        Local operations (see Workload) change its tables in place and return deltas, which are sent to all peers (see broadcast),
+        or to a Gossiper, which sends them in batches.
+        The deltas received are merged into its tables (see receive), and anti_entropy sends the full state to a random peer
+        from time to time, so the replicas converge even when the network loses messages.'''
+
+    def __init__(self, replica_id: int, state: FK_System, network: Network, peers: List[int], rand: random.Random, inbox_size: int = 0):
+        self.replica_id = replica_id
+        self.state = state
+        self.tables: Dict[str, Table] = Snapshot.tables_of(state) # the tables of the state by name, as in the messages
+        self.network = network
+        self.inbox = network.connect(replica_id, inbox_size)
+        self.peers = peers
+        self.rand = rand
+        self.counter = 0 # of the Lamport clock of this replica
+        self.gossiper: Gossiper = None # see Cluster
+
+        # metrics
+        self.operations = 0
+        self.merges = 0
+        self.merged_rows = 0
+        self.merge_time = 0.0 # seconds
+        self.latencies: List[float] = [] # from the operation in a peer to its merge in this replica, in seconds
+
+    def stamp(self, after: LamportClock = None) -> LamportClock:
+        '''return a new stamp of this replica, after the given one (ex: the stamp of the register we overwrite).'''
+        self.counter = max(self.counter, after.counter if after is not None else 0) + 1
+        return LamportClock(self.replica_id, self.counter)
+
+    def broadcast(self, deltas: Dict[str, Table]):
+        '''send the deltas of a local operation to all peers (or give them to the gossiper, which sends them in batches).'''
+        self.operations += 1
+        operation = ((self.replica_id, self.operations), asyncio.get_running_loop().time())
+        if self.gossiper is not None:
+            self.gossiper.add(deltas, operation)
+            return
+        for peer in self.peers:
+            self.network.send(self.replica_id, peer, Message(self.replica_id, deltas, [operation]))
+
+    def receive(self, message: Message):
+        start = time.perf_counter()
+        for name, delta in message.deltas.items():
+            self.tables[name].apply_delta(delta)
+            self.merged_rows += len(delta.elements)
+        self.merge_time += time.perf_counter() - start
+        self.merges += 1
+        now = asyncio.get_running_loop().time()
+        self.latencies.extend(now - created for _, created in message.operations)
+
+    def full_state(self) -> Dict[str, Table]:
+        '''return a copy of all tables (the rows are not changed in place, so copying the dicts is enough).'''
+        return {name: table.copy(dict(table.elements)) for name, table in self.tables.items()}
+
+    def converged(self, other: 'Replica') -> bool:
+        return self.state.converged(other.state)
+
+    async def run(self):
+        '''merge the messages of the inbox, forever.'''
+        while True:
+            self.receive(await self.inbox.get())
+
+    async def anti_entropy(self, interval: float):
+        '''send the full state to a random peer every `interval` seconds, forever.'''
+        while True:
+            await asyncio.sleep(interval)
+            self.network.send(self.replica_id, self.rand.choice(self.peers), Message(self.replica_id, self.full_state()))
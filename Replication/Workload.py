@@ -0,0 +1,94 @@
+import random
+from typing import Dict
+
+from CvRDTs.Registers.LWWRegister import LWWRegister
+from CvRDTs.Tables.Flags import Status, Version
+from CvRDTs.Tables.Flags_DW import Flags_DW
+from CvRDTs.Tables.Flags_UW import Flags_UW
+from CvRDTs.Tables.Table import Table
+from CvRDTs.Tables.Table_DW import Table_DW
+from CvRDTs.Time.LamportClock import LamportClock
+from ConcreteTables.Alb import Alb, Alb_FK_System, AlbPK, AlbsTable
+from ConcreteTables.Art import Art, Art_FK_System, ArtPK, ArtsTable
+from ConcreteTables.Country import CountriesTable, Country, CountryPK
+from ConcreteTables.Genre import Genre, GenrePK, GenreTable
+from ConcreteTables.Song import Song, SongPK, SongsTable
+from Replication.Replica import Replica
+
+
+ARTS_TABLE = "ref_FK_Systems.0.main_table" # names of the tables in the messages (see Snapshot.tables_of)
+ALBS_TABLE = "main_table"
+
+
+def before(t1: LamportClock, t2: LamportClock) -> bool:
+    return t1.before(t2)
+
+
+def initial_system(rand: random.Random, size: int) -> Alb_FK_System:
+    '''return an Alb_FK_System without albums, and `size` rows in each referenced table (all replicas start with the same one).'''
+    stamp = LamportClock(0, 0)
+    visible_UW = Flags_UW(Status.VISIBLE, Status.TOUCHED, stamp)
+    genres = GenreTable({GenrePK(i): (visible_UW, Genre(GenrePK(i), LWWRegister(i + 1, stamp))) for i in range(size)}, before)
+    countries = CountriesTable({CountryPK(i): (Flags_DW(Version.INIT_VERSION, Status.VISIBLE, []), Country(CountryPK(i))) for i in range(size)}, before)
+    arts = ArtsTable({ArtPK(i, i): (visible_UW, Art(ArtPK(i, i), GenrePK(rand.randrange(size)), CountryPK(rand.randrange(size)), LWWRegister(rand.randint(18, 80), stamp)))
+                      for i in range(size)}, before)
+    songs = SongsTable({SongPK(i): (Flags_DW(Version.INIT_VERSION, Status.VISIBLE, []), Song(SongPK(i), LWWRegister(rand.randint(60, 600), stamp), LWWRegister(i, stamp)))
+                        for i in range(size)}, before)
+    return Alb_FK_System(AlbsTable({}, before), songs, songs, songs, Art_FK_System(arts, genres, countries)) # the 3 song FKs share the table of songs
+
+
+class Workload:
+    '''Random operations on the Alb_FK_System of a replica (see initial_system): inserts, updates and deletes of albums,
+        and updates of artists (an UW table). Each operation changes the tables of the replica and returns its deltas, by table name.
+        The albums have titles in range(key_space), so inserts of existing titles become updates or deletes (conflicts between replicas).
+        The FKs of an album depend only on its title: the merge of rows keeps the FKs of one of them (they are part of the identity of the row),
+        so replicas that insert the same PK concurrently must insert the same FKs.'''
+
+    def __init__(self, rand: random.Random, key_space: int = 1000, referenced_rows: int = 100, delete_ratio: float = 0.1, art_update_ratio: float = 0.1):
+        self.rand = rand
+        self.key_space = key_space
+        self.referenced_rows = referenced_rows # rows of each referenced table (see initial_system)
+        self.delete_ratio = delete_ratio # of the operations on albums that exist (the others are updates)
+        self.art_update_ratio = art_update_ratio
+
+    def operation(self, replica: Replica) -> Dict[str, Table]:
+        '''an artist update (with probability art_update_ratio), or an operation on a random album: insert if it does not exist, else delete or update.'''
+        r = self.rand.random()
+        if r < self.art_update_ratio:
+            return {ARTS_TABLE: self.update_art(replica)}
+        albs = replica.tables[ALBS_TABLE]
+        pk = AlbPK(self.rand.randrange(self.key_space))
+        row = albs.elements.get(pk)
+        if row is None or row[0].DI_flag == Status.DELETED:
+            return {ALBS_TABLE: self.insert_alb(replica, pk)}
+        if self.rand.random() < self.delete_ratio:
+            return {ALBS_TABLE: albs.delete(pk)}
+        return {ALBS_TABLE: self.update_alb(replica, row[1])}
+
+    def insert_alb(self, replica: Replica, pk: AlbPK) -> Table:
+        system = replica.state
+        stamp = replica.stamp()
+        fks = random.Random(pk.title)
+        art = ArtPK(*[fks.randrange(self.referenced_rows)] * 2)
+        songs = [SongPK(fks.randrange(self.referenced_rows)) for _ in range(3)]
+        fk_versions = [Version.INIT_VERSION] + [fk_version(songs_table, song) for songs_table, song in zip(system.ref_tables, songs)]
+        elem = Alb(pk, art, *songs, LWWRegister(self.rand.randint(1900, 2022), stamp), LWWRegister(self.rand.randint(0, 10000), stamp))
+        return replica.tables[ALBS_TABLE].insert(elem, fk_versions)
+
+    def update_alb(self, replica: Replica, alb: Alb) -> Table:
+        '''a new price for the given album.'''
+        stamp = replica.stamp(alb.price.stamp)
+        elem = Alb(alb.albPK, alb.artFK, alb.songA, alb.songB, alb.songC, alb.year, LWWRegister(self.rand.randint(0, 10000), stamp))
+        return replica.tables[ALBS_TABLE].update(elem)
+
+    def update_art(self, replica: Replica) -> Table:
+        '''a new age for a random artist.'''
+        arts = replica.tables[ARTS_TABLE]
+        flags, art = arts.elements[ArtPK(*[self.rand.randrange(self.referenced_rows)] * 2)]
+        stamp = replica.stamp(max(art.age.stamp, flags.time, key=lambda clock: clock.counter))
+        return arts.update(Art(art.artPK, art.genre, art.country, LWWRegister(self.rand.randint(18, 80), stamp)), stamp)
+
+
+def fk_version(table: Table, pk) -> int:
+    '''return the version of the referenced row (DW tables), or INIT_VERSION (UW tables do not have versions).'''
+    return table.getVersion(pk) if isinstance(table, Table_DW) else Version.INIT_VERSION
@@ -0,0 +1,73 @@
+'''
+Benchmark of the query "albums with year in 1990-2000" on a concrete AlbsTable: a scan of the rows vs a sorted secondary index (AttributeIndex),
+and the cost of keeping the indexes (on year and price) in repeated syncs (state = state.merge(peer)) where the peer changes a few albums between syncs.
+
+Run from the root folder of the project:     python -m benchmarks.bench_attribute_index
+'''
+
+import random
+import time
+
+from CvRDTs.Registers.LWWRegister import LWWRegister
+from CvRDTs.Tables.AttributeIndex import AttributeIndex
+from CvRDTs.Tables.Flags import Status
+from CvRDTs.Time.LamportClock import LamportClock
+from ConcreteTables.Alb import Alb, AlbPK
+from Replication.Workload import initial_system
+from benchmarks.bench_fk_index import REFERENCED_ROWS, insert_albs
+
+
+TABLE_SIZES = [10000, 100000]
+QUERIES = 20
+SYNCS = 20
+UPDATES = 10 # of albums of the peer between syncs
+
+
+def albs_table(table_size: int):
+    system = initial_system(random.Random(0), REFERENCED_ROWS)
+    insert_albs(system, table_size, random.Random(1))
+    return system.main_table
+
+def scan(albs, low: int, high: int):
+    return {pk for pk, (flags, elem) in albs.elements.items() if flags.DI_flag == Status.VISIBLE and low <= elem.year.value <= high}
+
+def time_syncs(table_size: int, indexed: bool) -> float:
+    rand = random.Random(0)
+    state, peer = albs_table(table_size), albs_table(table_size)
+    if indexed:
+        AttributeIndex.build(state, "year", ordered=True)
+        AttributeIndex.build(state, "price")
+    state = state.merge(peer)
+    total = 0.0
+    for sync in range(SYNCS):
+        for i in range(UPDATES):
+            elem = peer.elements[AlbPK(rand.randrange(table_size))][1]
+            stamp = LamportClock(1, sync * UPDATES + i + 2)
+            peer.update(Alb(elem.albPK, elem.artFK, elem.songA, elem.songB, elem.songC, LWWRegister(rand.randint(1900, 2022), stamp), elem.price))
+        start = time.perf_counter()
+        state = state.merge(peer)
+        total += time.perf_counter() - start
+    assert not indexed or state.indexes["year"].between(1990, 2000) == scan(state, 1990, 2000)
+    return total / SYNCS
+
+
+if __name__ == "__main__":
+    print(f"{UPDATES} album updates between syncs")
+    print(f"{'albums':<10}{'scan':>12}{'index':>12}{'speedup':>10}{'build index':>14}{'sync':>12}{'indexed sync':>15}")
+    for table_size in TABLE_SIZES:
+        albs = albs_table(table_size)
+        start = time.perf_counter()
+        index = AttributeIndex.build(albs, "year", ordered=True)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scanned = [scan(albs, 1990, 2000) for _ in range(QUERIES)]
+        scan_time = (time.perf_counter() - start) / QUERIES
+        start = time.perf_counter()
+        indexed = [index.between(1990, 2000) for _ in range(QUERIES)]
+        index_time = (time.perf_counter() - start) / QUERIES
+        assert scanned == indexed
+
+        sync_time, indexed_sync_time = time_syncs(table_size, indexed=False), time_syncs(table_size, indexed=True)
+        print(f"{table_size:<10}{scan_time * 1e3:>10.2f}ms{index_time * 1e3:>10.2f}ms{scan_time / index_time:>9.1f}x"
+              f"{build_time * 1e3:>12.1f}ms{sync_time * 1e3:>10.2f}ms{indexed_sync_time * 1e3:>13.2f}ms")
@@ -0,0 +1,55 @@
+'''
+Benchmark of the initial load of the albums of a concrete Alb_FK_System: one insert per row (an Element and a delta per row)
+vs one bulk load of numpy columns (Table_DW.load: the CHECK constraints of Alb checked for all rows at once, and the rows built in one pass),
+both with the reverse FK index of the albums (FK_System.fk_references) updated by the load.
+
+Run from the root folder of the project:     python -m benchmarks.bench_bulk_load
+'''
+
+import random
+import time
+
+import numpy as np
+
+from CvRDTs.Registers.LWWRegister import LWWRegister
+from CvRDTs.Time.LamportClock import LamportClock
+from ConcreteTables.Alb import Alb, AlbPK
+from ConcreteTables.Art import ArtPK
+from ConcreteTables.Song import SongPK
+from Replication.Workload import initial_system
+from benchmarks.bench_fk_index import REFERENCED_ROWS, insert_albs
+
+
+TABLE_SIZES = [10000, 100000]
+ALB_SCHEMA = [AlbPK, ArtPK, SongPK, SongPK, SongPK, LWWRegister, LWWRegister]
+
+
+def alb_columns(table_size: int, rng: np.random.Generator):
+    arts = rng.integers(0, REFERENCED_ROWS, table_size)
+    return {"0": np.arange(table_size), "1": np.stack([arts, arts], axis=1),
+            "2": rng.integers(0, REFERENCED_ROWS, table_size), "3": rng.integers(0, REFERENCED_ROWS, table_size), "4": rng.integers(0, REFERENCED_ROWS, table_size),
+            "5.value": rng.integers(1900, 2023, table_size), "6.value": rng.integers(0, 10001, table_size)}
+
+def indexed_system():
+    system = initial_system(random.Random(0), REFERENCED_ROWS)
+    system.fk_references(0, ArtPK(0, 0)) # the index of the empty table, updated by the load
+    return system
+
+
+if __name__ == "__main__":
+    print(f"{REFERENCED_ROWS} rows in each referenced table")
+    print(f"{'albums':<10}{'inserts':>12}{'bulk load':>12}{'speedup':>10}")
+    for table_size in TABLE_SIZES:
+        system = indexed_system()
+        start = time.perf_counter()
+        insert_albs(system, table_size, random.Random(1))
+        insert_time = time.perf_counter() - start
+
+        loaded = indexed_system()
+        start = time.perf_counter()
+        columns = alb_columns(table_size, np.random.default_rng(1)) # as insert_albs, with the random values of the rows
+        loaded.main_table.load(Alb, ALB_SCHEMA, columns, stamp=LamportClock(0, 1))
+        load_time = time.perf_counter() - start
+        assert len(loaded.main_table.elements) == table_size and len(loaded.fk_index.fks) == table_size
+
+        print(f"{table_size:<10}{insert_time * 1e3:>10.1f}ms{load_time * 1e3:>10.1f}ms{insert_time / load_time:>9.1f}x")
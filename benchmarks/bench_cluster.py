@@ -0,0 +1,35 @@
+'''
+Simulation of clusters of replicas of an Alb_FK_System (see Replication/Cluster.py) with different networks:
+metrics of merge throughput, latency of the operations, convergence time and memory.
+
+Run from the root folder of the project:     python -m benchmarks.bench_cluster
+'''
+
+import asyncio
+
+from Replication.Cluster import Cluster
+
+
+NUMBER_OF_REPLICAS = 5
+DURATION = 2.0 # seconds of workload
+OPERATIONS_PER_SECOND = 1000 # in the whole cluster
+
+SCENARIOS = {
+    "LAN": dict(latency=(0.0005, 0.002)),
+    "WAN": dict(latency=(0.02, 0.1)),
+    "lossy": dict(latency=(0.001, 0.005), loss=0.1, reorder=0.1),
+    "partition": dict(latency=(0.001, 0.005), partition=(0.5, 1.5)),
+}
+
+
+if __name__ == "__main__":
+    results = {}
+    for name, scenario in SCENARIOS.items():
+        partition = scenario.pop("partition", None)
+        cluster = Cluster(NUMBER_OF_REPLICAS, **scenario)
+        results[name] = asyncio.run(cluster.run(DURATION, OPERATIONS_PER_SECOND, partition))
+
+    print(f"{NUMBER_OF_REPLICAS} replicas, {OPERATIONS_PER_SECOND} operations/s for {DURATION}s")
+    print(f"{'':<26}" + "".join(f"{name:>12}" for name in results))
+    for metric in next(iter(results.values())):
+        print(f"{metric:<26}" + "".join(f"{result[metric]:>12.1f}" for result in results.values()))
@@ -0,0 +1,41 @@
+'''
+Benchmark of a concrete AlbsTable (dict of python objects) vs its Table_DW_Columnar version (numpy columns):
+memory per row and merge time.
+
+Run from the root folder of the project:     python -m benchmarks.bench_columnar
+(add 1000000 to TABLE_SIZES for million-row tables: the dict version takes a few GB and minutes to build)
+'''
+
+import random
+import time
+import tracemalloc
+
+from CvRDTs.Tables.Table_DW_Columnar import Table_DW_Columnar
+from ConcreteTables.Alb import Alb
+from benchmarks.bench_concrete import concrete_albs_table
+
+
+TABLE_SIZES = [10000, 100000]
+
+
+def timed(op):
+    start = time.perf_counter()
+    result = op()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rand = random.Random(0)
+    print(f"{'table size':<12}{'dict bytes/row':>16}{'columns bytes/row':>20}{'dict merge':>14}{'columnar merge':>16}{'speedup':>10}")
+    for table_size in TABLE_SIZES:
+        tracemalloc.start()
+        x = concrete_albs_table(table_size, rand)
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        y = concrete_albs_table(table_size, rand)
+        columnar_x, columnar_y = Table_DW_Columnar.from_table(x, Alb), Table_DW_Columnar.from_table(y, Alb)
+
+        _, dict_time = timed(lambda: x.merge(y))
+        _, columnar_time = timed(lambda: columnar_x.merge(columnar_y))
+        print(f"{table_size:<12}{dict_bytes / table_size:>16.0f}{columnar_x.nbytes() / table_size:>20.0f}"
+              f"{dict_time * 1e3:>12.1f}ms{columnar_time * 1e3:>14.1f}ms{dict_time / columnar_time:>9.1f}x")
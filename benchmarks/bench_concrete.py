@@ -0,0 +1,66 @@
+'''
+Benchmark of the concrete backend (python values) vs building the Z3 terms of the same merges (symbolic values).
+Both run the same merge code of our CvRDTs; the concrete one is what a replica runs at runtime.
+
+Run from the root folder of the project:     python -m benchmarks.bench_concrete
+'''
+
+import random
+import time
+
+from CvRDTs.Counters.GCounter import GCounter
+from CvRDTs.Registers.LWWRegister import LWWRegister
+from CvRDTs.Tables.Flags_DW import Flags_DW
+from CvRDTs.Time.LamportClock import LamportClock
+from CvRDTs.Time.VersionVector import VersionVector
+from ConcreteTables.Alb import Alb, AlbPK, AlbsTable
+from ConcreteTables.Art import ArtPK
+from ConcreteTables.Song import SongPK
+
+
+TABLE_SIZES = [50, 200, 1000]
+REPETITIONS = 1000 # for the small CvRDTs
+
+
+def before(t1: int, t2: int) -> bool:
+    return t1 < t2
+
+
+def concrete_albs_table(table_size: int, rand: random.Random) -> AlbsTable:
+    '''an AlbsTable with table_size rows of python ints, which overlaps in half of its PKs with the other tables of the same size.'''
+    elements = {}
+    for title in rand.sample(range(2 * table_size), table_size):
+        version = rand.randint(0, 3)
+        stamp = LamportClock(rand.randint(0, 2), rand.randint(0, 10))
+        elements[AlbPK(title)] = (Flags_DW(version, rand.randint(0, 1), [rand.randint(0, 3) for _ in range(Alb.number_of_FKs)]),
+                                  Alb(AlbPK(title), ArtPK(1, 2), SongPK(3), SongPK(4), SongPK(5),
+                                      LWWRegister(1900 + rand.randint(0, 122), stamp), LWWRegister(rand.randint(0, 10000), stamp)))
+    return AlbsTable(elements, before)
+
+
+def time_merges(x, y, repetitions: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        x.merge(y)
+    return (time.perf_counter() - start) / repetitions
+
+
+if __name__ == "__main__":
+    rand = random.Random(0)
+
+    print("CvRDT\t\t\tconcrete merge\tsymbolic merge (build terms)")
+    small_cvrdts = [
+        ("GCounter", GCounter, [[[rand.randint(0, 100) for _ in range(5)]] for _ in range(2)], GCounter.getArgs("")),
+        ("VersionVector", VersionVector, [[[rand.randint(0, 100) for _ in range(3)]] for _ in range(2)], VersionVector.getArgs("")),
+        ("LWWRegister", LWWRegister, [[7, LamportClock(0, 1)], [8, LamportClock(1, 1)]], LWWRegister.getArgs("")),
+    ]
+    for name, cvrdt, (concrete1, concrete2), (symbolic1, symbolic2, *_) in small_cvrdts:
+        concrete_time = time_merges(cvrdt(*concrete1), cvrdt(*concrete2), REPETITIONS)
+        symbolic_time = time_merges(cvrdt(*symbolic1), cvrdt(*symbolic2), REPETITIONS)
+        print(f"{name:<16}\t{concrete_time * 1e6:.1f}us\t\t{symbolic_time * 1e6:.1f}us")
+
+    for table_size in TABLE_SIZES:
+        concrete_time = time_merges(concrete_albs_table(table_size, rand), concrete_albs_table(table_size, rand))
+        args1, args2, _, _, _, _ = AlbsTable.getArgs("", table_size, VersionVector)
+        symbolic_time = time_merges(AlbsTable(*args1), AlbsTable(*args2))
+        print(f"AlbsTable {table_size:<6}\t{concrete_time * 1e3:.1f}ms\t\t{symbolic_time * 1e3:.1f}ms")
@@ -0,0 +1,48 @@
+'''
+Benchmark of the convergence check between 2 replicas of a table with the same rows (as different objects):
+Table.equals (compares all rows) vs Table.converged (compares the state digests), and the cost of keeping the state digest updated.
+
+Run from the root folder of the project:     python -m benchmarks.bench_convergence
+'''
+
+import copy
+import random
+import time
+
+from CvRDTs.Tables.Flags_DW import Flags_DW
+from benchmarks.bench_concrete import concrete_albs_table
+
+
+TABLE_SIZES = [1000, 10000, 50000]
+CHECKS = 1000
+UPDATES = 1000
+
+
+if __name__ == "__main__":
+    rand = random.Random(0)
+    print(f"{'table size':<12}{'equals':>12}{'converged':>12}{'speedup':>12}{'set_row':>12}{'set_row + digest':>19}")
+    for table_size in TABLE_SIZES:
+        a = concrete_albs_table(table_size, rand)
+        b = a.copy(copy.deepcopy(a.elements))
+        a.equals(b) # computes the row digests and the state digests of both tables
+
+        start = time.perf_counter()
+        a.equals(b)
+        equals_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(CHECKS):
+            a.converged(b)
+        converged_time = (time.perf_counter() - start) / CHECKS
+
+        pks = rand.choices(list(a.elements), k=UPDATES)
+        update_times = []
+        for table in (a.copy(dict(a.elements)), a): # without and with the state digest
+            start = time.perf_counter()
+            for pk in pks:
+                flags, elem = table.elements[pk]
+                table.set_row(pk, (Flags_DW(flags.version + 1, flags.DI_flag, flags.fk_versions), elem))
+            update_times.append((time.perf_counter() - start) / UPDATES)
+
+        print(f"{table_size:<12}{equals_time * 1e3:>10.2f}ms{converged_time * 1e6:>10.2f}us{equals_time / converged_time:>11.0f}x"
+              f"{update_times[0] * 1e6:>10.2f}us{update_times[1] * 1e6:>17.2f}us")
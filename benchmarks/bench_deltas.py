@@ -0,0 +1,43 @@
+'''
+Benchmark of replicating a few changes of a table: merge of the full state vs the deltas of those changes (DeltaBuffer + Table.apply_delta).
+
+Run from the root folder of the project:     python -m benchmarks.bench_deltas
+'''
+
+import copy
+import random
+import time
+
+from CvRDTs.DeltaBuffer import DeltaBuffer
+from CvRDTs.Registers.LWWRegister import LWWRegister
+from CvRDTs.Time.LamportClock import LamportClock
+from ConcreteTables.Alb import Alb, AlbPK
+from ConcreteTables.Art import ArtPK
+from ConcreteTables.Song import SongPK
+from benchmarks.bench_concrete import concrete_albs_table
+
+
+TABLE_SIZES = [200, 1000, 5000]
+NUMBER_OF_UPDATES = 10
+
+
+if __name__ == "__main__":
+    rand = random.Random(0)
+    print(f"{NUMBER_OF_UPDATES} updates")
+    print(f"{'table size':<12}{'full state':>12}{'deltas':>12}{'speedup':>11}{'rows sent':>14}")
+    for table_size in TABLE_SIZES:
+        sender = concrete_albs_table(table_size, rand)
+        receiver = copy.deepcopy(sender)
+        buffer = DeltaBuffer()
+        for counter, pk in enumerate(rand.sample(list(sender.elements), NUMBER_OF_UPDATES)):
+            stamp = LamportClock(1, 100 + counter)
+            buffer.add(sender.update(Alb(AlbPK(pk.title), ArtPK(1, 2), SongPK(3), SongPK(4), SongPK(5), LWWRegister(2000, stamp), LWWRegister(5, stamp))))
+        delta = buffer.take()
+
+        start = time.perf_counter()
+        receiver.merge(sender)
+        full_state_time = time.perf_counter() - start
+        start = time.perf_counter()
+        receiver.apply_delta(delta)
+        delta_time = time.perf_counter() - start
+        print(f"{table_size:<12}{full_state_time * 1e3:>10.2f}ms{delta_time * 1e3:>10.2f}ms{full_state_time / delta_time:>10.1f}x{len(delta.elements):>8} / {table_size}")
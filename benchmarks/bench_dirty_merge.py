@@ -0,0 +1,73 @@
+'''
+Benchmark of repeated syncs of 2 concrete Alb_FK_Systems (state = state.merge(peer)) where the peer only changes its albums between syncs:
+with the dirty tracking of the tables (Table.includes: the tables that did not change since the last sync are not merged)
+vs without it (the same merges, after forgetting what each table was merged with).
+
+Run from the root folder of the project:     python -m benchmarks.bench_dirty_merge
+'''
+
+import random
+import time
+
+from CvRDTs.Tables.Snapshot import Snapshot
+from Replication.Replica import Replica
+from Replication.Workload import Workload, initial_system
+
+
+TABLE_SIZES = [10000, 50000]
+SYNCS = 20
+OPERATIONS = 10 # on the albums of the peer between syncs
+
+
+class Peer:
+    '''what Workload needs of a Replica.'''
+
+    def __init__(self, replica_id: int, state):
+        self.replica_id = replica_id
+        self.state = state
+        self.tables = Snapshot.tables_of(state)
+        self.counter = 0
+
+    stamp = Replica.stamp
+
+
+def time_syncs(table_size: int, tracking: bool) -> float:
+    rand = random.Random(0)
+    state = initial_system(random.Random(0), table_size)
+    peer = Peer(1, initial_system(random.Random(0), table_size))
+    workload = Workload(rand, key_space=table_size, referenced_rows=table_size, art_update_ratio=0.0)
+    state = state.merge(peer.state)
+    total = 0.0
+    for _ in range(SYNCS):
+        for _ in range(OPERATIONS):
+            workload.operation(peer)
+        if not tracking:
+            for table in Snapshot.tables_of(state).values():
+                table.merged_from.clear()
+        start = time.perf_counter()
+        state = state.merge(peer.state)
+        total += time.perf_counter() - start
+    return total / SYNCS
+
+
+def check_observers(table_size: int = 1000, syncs: int = 50):
+    '''the FK_Systems replaced by their merges are not kept as observers of the tables (and dependents of the FK_Systems) they share with the new ones.'''
+    state = initial_system(random.Random(0), table_size)
+    peer = initial_system(random.Random(0), table_size)
+    for _ in range(syncs):
+        state = state.merge(peer)
+        state.ref_integrity_holds_all()
+    songs, art_system = state.ref_tables[0], state.ref_FK_Systems[0]
+    assert len(songs.live_observers()) == 1, len(songs.live_observers()) # only the last Alb_FK_System
+    assert len(art_system.live_dependents()) == 1, len(art_system.live_dependents())
+    print(f"after {syncs} syncs: {len(songs.observers)} observers of the songs, {len(art_system.dependents)} dependents of the Art_FK_System")
+
+
+if __name__ == "__main__":
+    check_observers()
+    print(f"{OPERATIONS} album operations between syncs")
+    print(f"{'rows per table':<16}{'no tracking':>14}{'tracking':>12}{'speedup':>10}")
+    for table_size in TABLE_SIZES:
+        untracked_time = time_syncs(table_size, tracking=False)
+        tracked_time = time_syncs(table_size, tracking=True)
+        print(f"{table_size:<16}{untracked_time * 1e3:>12.2f}ms{tracked_time * 1e3:>10.2f}ms{untracked_time / tracked_time:>9.1f}x")
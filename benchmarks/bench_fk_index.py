@@ -0,0 +1,66 @@
+'''
+Benchmark of the delete of artists in a concrete Alb_FK_System: find the albums that reference each deleted artist
+by a scan of the albums table vs the reverse FK index (FK_System.fk_references), and the cost of keeping the index updated.
+
+Run from the root folder of the project:     python -m benchmarks.bench_fk_index
+'''
+
+import random
+import time
+
+from CvRDTs.Registers.LWWRegister import LWWRegister
+from CvRDTs.Tables.Flags import Version
+from CvRDTs.Time.LamportClock import LamportClock
+from ConcreteTables.Alb import Alb, AlbPK
+from ConcreteTables.Art import ArtPK
+from ConcreteTables.Song import SongPK
+from Replication.Workload import initial_system
+
+
+TABLE_SIZES = [10000, 50000]
+REFERENCED_ROWS = 1000
+DELETES = 100
+
+
+def insert_albs(system, table_size: int, rand: random.Random):
+    stamp = LamportClock(0, 1)
+    for title in range(table_size):
+        art = rand.randrange(REFERENCED_ROWS)
+        elem = Alb(AlbPK(title), ArtPK(art, art), *[SongPK(rand.randrange(REFERENCED_ROWS)) for _ in range(3)],
+                   LWWRegister(rand.randint(1900, 2022), stamp), LWWRegister(rand.randint(0, 10000), stamp))
+        system.main_table.insert(elem, [Version.INIT_VERSION] * Alb.number_of_FKs)
+
+
+if __name__ == "__main__":
+    rand = random.Random(0)
+    print(f"{REFERENCED_ROWS} artists, albums of {DELETES} of them (the albums to change when they are deleted)")
+    print(f"{'albums':<10}{'scan':>12}{'index':>12}{'speedup':>10}{'build index':>14}{'inserts':>12}{'indexed inserts':>18}")
+    for table_size in TABLE_SIZES:
+        system = initial_system(random.Random(0), REFERENCED_ROWS)
+        start = time.perf_counter()
+        insert_albs(system, table_size, random.Random(1))
+        insert_time = time.perf_counter() - start
+        albs = system.main_table
+        deleted = [ArtPK(art, art) for art in rand.sample(range(REFERENCED_ROWS), DELETES)]
+
+        start = time.perf_counter()
+        scanned = [[pk for pk, (_, elem) in albs.elements.items() if elem.artFK == art] for art in deleted]
+        scan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        system.fk_references(0, deleted[0])
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        indexed = [system.fk_references(0, art) for art in deleted]
+        index_time = time.perf_counter() - start
+        assert [set(pks) for pks in scanned] == [set(pks) for pks in indexed]
+
+        indexed_system = initial_system(random.Random(0), REFERENCED_ROWS)
+        indexed_system.fk_references(0, deleted[0]) # the index of the empty table, updated by every insert
+        start = time.perf_counter()
+        insert_albs(indexed_system, table_size, random.Random(1))
+        indexed_insert_time = time.perf_counter() - start
+
+        print(f"{table_size:<10}{scan_time * 1e3:>10.1f}ms{index_time * 1e3:>10.2f}ms{scan_time / index_time:>9.0f}x"
+              f"{build_time * 1e3:>12.1f}ms{insert_time * 1e3:>10.1f}ms{indexed_insert_time * 1e3:>16.1f}ms")
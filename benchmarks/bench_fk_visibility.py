@@ -0,0 +1,63 @@
+'''
+Benchmark of the referential integrity checks of all albums of a concrete Alb_FK_System (Alb -> Art -> Genre/Country, and Alb -> Songs):
+with an empty cache (the first checks go down all FKs), in a batch (FK_System.ref_integrity_holds_all, one pass per FK_System), with the visibility cache of the FK_Systems (FK_System.fks_visible),
+and with the cache after updates of artists (which keep the cache) and after deletes of artists (which invalidate only their albums).
+
+Run from the root folder of the project:     python -m benchmarks.bench_fk_visibility
+'''
+
+import random
+import time
+
+from CvRDTs.Registers.LWWRegister import LWWRegister
+from CvRDTs.Time.LamportClock import LamportClock
+from ConcreteTables.Art import Art, ArtPK
+from Replication.Workload import initial_system
+from benchmarks.bench_fk_index import REFERENCED_ROWS, insert_albs
+
+
+TABLE_SIZES = [10000, 50000]
+CHANGES = 20
+
+
+def check_all(system) -> int:
+    return sum(system.fks_visible(pk) for pk in system.main_table.elements)
+
+def clear_caches(system):
+    system.watch()
+    system.visibility.clear()
+    for ref_FK_System in system.ref_FK_Systems:
+        clear_caches(ref_FK_System)
+
+def time_check(system, clear: bool = False, batch: bool = False) -> float:
+    if clear:
+        clear_caches(system)
+    start = time.perf_counter()
+    system.ref_integrity_holds_all() if batch else check_all(system)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rand = random.Random(0)
+    print(f"{REFERENCED_ROWS} artists, {CHANGES} artists updated or deleted")
+    print(f"{'albums':<10}{'empty cache':>13}{'batch':>12}{'cache':>12}{'speedup':>10}{'after updates':>16}{'after deletes':>16}{'visible':>10}")
+    for table_size in TABLE_SIZES:
+        system = initial_system(random.Random(0), REFERENCED_ROWS)
+        insert_albs(system, table_size, random.Random(1))
+        arts = system.ref_FK_Systems[0].main_table
+        no_cache_time = time_check(system, clear=True)
+        batch_time = time_check(system, clear=True, batch=True)
+        cache_time = time_check(system)
+
+        for i, art in enumerate(rand.sample(range(REFERENCED_ROWS), CHANGES)):
+            flags, elem = arts.elements[ArtPK(art, art)]
+            stamp = LamportClock(1, i + 1)
+            arts.update(Art(elem.artPK, elem.genre, elem.country, LWWRegister(rand.randint(18, 80), stamp)), stamp)
+        updates_time = time_check(system)
+
+        for i, art in enumerate(rand.sample(range(REFERENCED_ROWS), CHANGES)):
+            arts.delete(ArtPK(art, art), LamportClock(2, CHANGES + i + 1))
+        deletes_time = time_check(system)
+
+        print(f"{table_size:<10}{no_cache_time * 1e3:>11.1f}ms{batch_time * 1e3:>10.1f}ms{cache_time * 1e3:>10.1f}ms{no_cache_time / cache_time:>9.1f}x"
+              f"{updates_time * 1e3:>14.1f}ms{deletes_time * 1e3:>14.1f}ms{check_all(system):>10}")
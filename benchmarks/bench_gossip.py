@@ -0,0 +1,49 @@
+'''
+Simulation of a cluster of replicas of an Alb_FK_System (see Replication/Cluster.py) sending each delta to all peers
+vs the Gossiper (batches of deltas to a few peers per round), with a small inbox per replica (backpressure),
+and the lag of each peer of a replica in the middle of the run.
+
+Run from the root folder of the project:     python -m benchmarks.bench_gossip
+'''
+
+import asyncio
+
+from Replication.Cluster import Cluster
+
+
+NUMBER_OF_REPLICAS = 8
+DURATION = 2.0 # seconds of workload
+OPERATIONS_PER_SECOND = 2000 # in the whole cluster
+INBOX_SIZE = 32
+
+SCENARIOS = {
+    "broadcast": dict(),
+    "gossip fanout 2": dict(gossip={"fanout": 2}),
+    "gossip fanout 4": dict(gossip={"fanout": 4}),
+}
+
+
+async def run_with_lag(cluster: Cluster):
+    '''run the cluster, and print the lag of the peers of the replica 0 in the middle of the run.'''
+    async def print_lag():
+        await asyncio.sleep(DURATION / 2)
+        gossiper = cluster.replicas[0].gossiper
+        print(f"  interval {gossiper.interval * 1e3:.1f}ms, lag of the peers of replica 0: "
+              + ", ".join(f"{peer}: {metrics['pending deltas']} deltas / {metrics['lag (s)'] * 1e3:.0f}ms" for peer, metrics in gossiper.metrics().items()))
+    lag = asyncio.create_task(print_lag()) if cluster.replicas[0].gossiper is not None else None
+    result = await cluster.run(DURATION, OPERATIONS_PER_SECOND)
+    if lag is not None:
+        await lag
+    return result
+
+
+if __name__ == "__main__":
+    results = {}
+    for name, scenario in SCENARIOS.items():
+        print(name)
+        results[name] = asyncio.run(run_with_lag(Cluster(NUMBER_OF_REPLICAS, inbox_size=INBOX_SIZE, **scenario)))
+
+    print(f"\n{NUMBER_OF_REPLICAS} replicas, {OPERATIONS_PER_SECOND} operations/s for {DURATION}s, inboxes of {INBOX_SIZE} messages")
+    print(f"{'':<26}" + "".join(f"{name:>18}" for name in results))
+    for metric in next(iter(results.values())):
+        print(f"{metric:<26}" + "".join(f"{result[metric]:>18.1f}" for result in results.values()))
@@ -0,0 +1,105 @@
+'''
+Benchmark of the OperationLog of a concrete AlbsTable:
+    - operations per second when every operation waits for its record to be durable, with a fsync per operation (group size 1)
+      vs group commit (many threads waiting for the same fsync) and vs batches of operations
+    - recovery time (snapshot + replay of the log) by the number of records since the last compaction
+      (after checking that compactions without records in between, ex: back-to-back, lose no later records)
+
+Run from the root folder of the project:     python -m benchmarks.bench_log
+'''
+
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from CvRDTs.Tables.Flags_DW import Flags_DW
+from CvRDTs.Tables.OperationLog import OperationLog
+from benchmarks.bench_concrete import before, concrete_albs_table
+
+
+TABLE_SIZE = 10000
+OPERATIONS = 2000
+THREADS = 8
+GROUP_SIZES = [1, 16, 64]
+RECORDS_SINCE_SNAPSHOT = [0, 1000, 10000]
+
+
+def operations(table, rand: random.Random, number: int):
+    '''return the deltas of `number` updates of random rows of the given table.'''
+    deltas = []
+    for pk in rand.choices(list(table.elements), k=number):
+        flags, elem = table.elements[pk]
+        deltas.append(table.copy({pk: (Flags_DW(flags.version + 1, flags.DI_flag, flags.fk_versions), elem)}))
+    return deltas
+
+
+def durable_appends(log: OperationLog, deltas: list, threads: int) -> float:
+    '''return the operations per second of the given threads, each appending its deltas and waiting for them to be durable.'''
+    def work(part):
+        for delta in part:
+            log.append(delta, durable=True)
+    workers = [threading.Thread(target=work, args=(deltas[i::threads],)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return len(deltas) / (time.perf_counter() - start)
+
+
+def check_compactions(table, rand: random.Random):
+    '''back-to-back compactions (the current segment has no records, so it is not closed by rotate), then a durable append:
+        the log reopened after it must have its record.'''
+    directory = tempfile.mkdtemp()
+    log = OperationLog.create(directory, table)
+    for compactions in range(3):
+        for _ in range(compactions):
+            log.compact(before)
+        delta = operations(table, rand, 1)[0]
+        lsn = log.append(delta, durable=True)
+        reopened = OperationLog(directory)
+        pk = next(iter(delta.elements))
+        assert reopened.lsn == lsn and reopened.recover(before).elements[pk][0].version == delta.elements[pk][0].version
+        reopened.file.close()
+    log.close()
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    rand = random.Random(0)
+    table = concrete_albs_table(TABLE_SIZE, rand)
+    deltas = operations(table, rand, OPERATIONS)
+
+    print(f"{OPERATIONS} durable operations (ops/s)")
+    print(f"{'group size':<12}{'1 thread':>12}{f'{THREADS} threads':>12}{'batched':>12}")
+    for group_size in GROUP_SIZES:
+        results = []
+        for threads in (1, THREADS):
+            directory = tempfile.mkdtemp()
+            results.append(durable_appends(OperationLog.create(directory, table, group_size), deltas, threads))
+            shutil.rmtree(directory)
+        directory = tempfile.mkdtemp()
+        log = OperationLog.create(directory, table, group_size)
+        start = time.perf_counter()
+        for delta in deltas: # a single thread that does not wait for each record (sync when the group is full)
+            log.append(delta)
+        log.sync()
+        results.append(OPERATIONS / (time.perf_counter() - start))
+        shutil.rmtree(directory)
+        print(f"{group_size:<12}" + "".join(f"{result:>12.0f}" for result in results))
+
+    check_compactions(table, rand)
+    print(f"\nrecovery of a table of {TABLE_SIZE} rows")
+    print(f"{'records':<12}{'recovery':>12}")
+    for records in RECORDS_SINCE_SNAPSHOT:
+        directory = tempfile.mkdtemp()
+        log = OperationLog.create(directory, table)
+        for delta in operations(table, rand, records):
+            log.append(delta)
+        log.close()
+        start = time.perf_counter()
+        OperationLog(directory).recover(before)
+        print(f"{records:<12}{time.perf_counter() - start:>11.2f}s")
+        shutil.rmtree(directory)
@@ -0,0 +1,48 @@
+'''
+Benchmark of merging many states into one (fan-in of an anti-entropy round):
+merge one by one (CvRDT.merge_all) vs the merge_all of each CvRDT, with the concrete backend.
+
+Run from the root folder of the project:     python -m benchmarks.bench_merge_all
+'''
+
+import random
+import time
+
+from CvRDTs.CvRDT import CvRDT
+from CvRDTs.Counters.GCounter import GCounter
+from CvRDTs.Counters.GCounter_NP import GCounter_NP
+from CvRDTs.Time.VersionVector import VersionVector
+from CvRDTs.Time.VersionVector_NP import VersionVector_NP
+from benchmarks.bench_concrete import concrete_albs_table
+
+
+NUMBER_OF_STATES = 32
+NUMBER_OF_REPLICAS = 100
+TABLE_SIZE = 200
+REPETITIONS = 100
+
+
+def time_op(op, repetitions: int) -> float:
+    '''return the mean milliseconds of op().'''
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        op()
+    return (time.perf_counter() - start) / repetitions * 1e3
+
+
+if __name__ == "__main__":
+    rand = random.Random(0)
+    print(f"merge of {NUMBER_OF_STATES} states")
+    print(f"{'CvRDT':<24}{'one by one':>12}{'merge_all':>12}{'speedup':>11}")
+    cvrdts = [
+        ("GCounter", lambda: GCounter([rand.randint(0, 1000) for _ in range(NUMBER_OF_REPLICAS)]), REPETITIONS),
+        ("GCounter_NP", lambda: GCounter_NP([rand.randint(0, 1000) for _ in range(NUMBER_OF_REPLICAS)]), REPETITIONS),
+        ("VersionVector", lambda: VersionVector([rand.randint(0, 1000) for _ in range(NUMBER_OF_REPLICAS)]), REPETITIONS),
+        ("VersionVector_NP", lambda: VersionVector_NP([rand.randint(0, 1000) for _ in range(NUMBER_OF_REPLICAS)]), REPETITIONS),
+        (f"AlbsTable {TABLE_SIZE}", lambda: concrete_albs_table(TABLE_SIZE, rand), 3),
+    ]
+    for name, new_state, repetitions in cvrdts:
+        state, *states = [new_state() for _ in range(NUMBER_OF_STATES)]
+        one_by_one = time_op(lambda: CvRDT.merge_all(state, states), repetitions)
+        merge_all = time_op(lambda: state.merge_all(states), repetitions)
+        print(f"{name:<24}{one_by_one:>10.2f}ms{merge_all:>10.2f}ms{one_by_one / merge_all:>10.1f}x")
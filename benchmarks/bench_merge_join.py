@@ -0,0 +1,46 @@
+'''
+Benchmark of the merge of concrete tables: the general merge (canonical order + aliases, as for the symbolic tables) vs Table.merge_join,
+for different overlap ratios: both replicas have the same PKs, and this is the fraction of rows that are equal (as different objects);
+the other rows have a newer version in the second replica.
+
+Run from the root folder of the project:     python -m benchmarks.bench_merge_join
+'''
+
+import copy
+import random
+import time
+
+from CvRDTs.Tables.Flags_DW import Flags_DW
+from CvRDTs.Tables.Table import Table
+from benchmarks.bench_concrete import concrete_albs_table
+
+
+TABLE_SIZE = 5000
+OVERLAP_RATIOS = [0.0, 0.5, 0.9, 0.99, 1.0]
+
+
+def time_merge(x: Table, y: Table, concrete: bool) -> float:
+    x.is_concrete = lambda: concrete # the general merge also merges concrete tables
+    start = time.perf_counter()
+    x.merge(y)
+    del x.is_concrete
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rand = random.Random(0)
+    print(f"table size {TABLE_SIZE}")
+    print(f"{'overlap':<10}{'general merge':>16}{'merge_join':>14}{'speedup':>10}{'merge_join (digests cached)':>30}")
+    for overlap in OVERLAP_RATIOS:
+        x = concrete_albs_table(TABLE_SIZE, rand)
+        equal_pks = set(rand.sample(list(x.elements), int(overlap * TABLE_SIZE)))
+        y_elements = {}
+        for pk, row in x.elements.items():
+            flags, elem = copy.deepcopy(row)
+            y_elements[pk] = (flags, elem) if pk in equal_pks else (Flags_DW(flags.version + 1, flags.DI_flag, flags.fk_versions), elem)
+        y = x.copy(y_elements)
+
+        general_time = time_merge(x, y, False)
+        join_time = time_merge(x, y, True)
+        cached_join_time = time_merge(x, y, True) # the second merge finds the digests of the first
+        print(f"{overlap:<10}{general_time * 1e3:>14.1f}ms{join_time * 1e3:>12.1f}ms{general_time / join_time:>9.1f}x{cached_join_time * 1e3:>28.1f}ms")
@@ -0,0 +1,46 @@
+'''
+Benchmark of the anti-entropy between 2 replicas of a table that differ in a few rows:
+merge of the full tables vs MerkleIndex (diff of the trees, then exchange and apply only the rows of the different buckets).
+
+Run from the root folder of the project:     python -m benchmarks.bench_merkle
+'''
+
+import copy
+import random
+import time
+
+from CvRDTs.Tables.Flags_DW import Flags_DW
+from CvRDTs.Tables.MerkleIndex import MerkleIndex
+from benchmarks.bench_concrete import concrete_albs_table
+
+
+TABLE_SIZES = [10000, 50000]
+DIFFERENT_ROWS = 10
+
+
+if __name__ == "__main__":
+    rand = random.Random(0)
+    print(f"{DIFFERENT_ROWS} different rows")
+    print(f"{'table size':<12}{'full merge':>12}{'merkle sync':>14}{'speedup':>10}{'nodes compared':>17}{'rows sent':>12}")
+    for table_size in TABLE_SIZES:
+        a = concrete_albs_table(table_size, rand)
+        b = a.copy(copy.deepcopy(a.elements))
+        depth = MerkleIndex.depth_for(table_size)
+        index_a, index_b = MerkleIndex.build(a, depth), MerkleIndex.build(b, depth)
+        for pk in rand.sample(list(a.elements), DIFFERENT_ROWS):
+            flags, elem = a.elements[pk]
+            a.set_row(pk, (Flags_DW(flags.version + 1, flags.DI_flag, flags.fk_versions), elem))
+
+        start = time.perf_counter()
+        a.merge(b), b.merge(a)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        buckets, compared = index_a.diff(index_b)
+        delta_a, delta_b = index_a.delta(a, buckets), index_b.delta(b, buckets)
+        a.apply_delta(delta_b)
+        b.apply_delta(delta_a)
+        merkle_time = time.perf_counter() - start
+
+        assert index_a.root() == index_b.root()
+        print(f"{table_size:<12}{full_time * 1e3:>10.1f}ms{merkle_time * 1e3:>12.2f}ms{full_time / merkle_time:>9.0f}x{compared:>17}{len(delta_a.elements) + len(delta_b.elements):>12}")
@@ -0,0 +1,45 @@
+'''
+Benchmark of an Alb_FK_System with one SongsTable for its 3 song FKs (FK_System.shared_ref_tables) vs 3 copies of it:
+merge of 2 concrete replicas (with the same rows, as different objects), and size of the symbolic systems of the proofs.
+
+Run from the root folder of the project:     python -m benchmarks.bench_shared_tables
+'''
+
+import random
+import time
+
+from CvRDTs.Tables.FK_System import FK_System
+from CvRDTs.Time.RealTime import RealTime
+from ConcreteTables.Alb import Alb_FK_System, AlbsTable
+from ConcreteTables.Art import ArtsTable
+from ConcreteTables.Song import SongsTable
+from Replication.Workload import initial_system
+
+
+TABLE_SIZES = [10000, 50000]
+SYMBOLIC_TABLE_SIZE = 3
+
+
+def with_copies(system: Alb_FK_System) -> Alb_FK_System:
+    '''the same system with 3 different SongsTables (with the same rows).'''
+    songs = system.ref_tables[0]
+    return Alb_FK_System(system.main_table, *[songs.copy(dict(songs.elements)) for _ in range(3)], system.ref_FK_Systems[0])
+
+def time_merge(a: Alb_FK_System, b: Alb_FK_System) -> float:
+    start = time.perf_counter()
+    a.merge(b)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{'songs':<10}{'3 tables':>12}{'shared':>12}{'speedup':>10}")
+    for table_size in TABLE_SIZES:
+        a, b = initial_system(random.Random(0), table_size), initial_system(random.Random(0), table_size)
+        copies_time = time_merge(with_copies(a), with_copies(b))
+        shared_time = time_merge(a, b)
+        print(f"{table_size:<10}{copies_time * 1e3:>10.1f}ms{shared_time * 1e3:>10.1f}ms{copies_time / shared_time:>9.1f}x")
+
+    copies_vars = FK_System.getArgs("copies_", {"albTab_": AlbsTable, "songATab_": SongsTable, "songBTab_": SongsTable, "songCTab_": SongsTable, "artTab_": ArtsTable},
+                                    SYMBOLIC_TABLE_SIZE, RealTime)[3]
+    shared_vars = Alb_FK_System.getArgs("shared_", SYMBOLIC_TABLE_SIZE, RealTime)[3]
+    print(f"\nZ3 variables of a symbolic Alb_FK_System with {SYMBOLIC_TABLE_SIZE} rows per table: {len(copies_vars)} with 3 tables, {len(shared_vars)} shared")
@@ -0,0 +1,85 @@
+'''
+Benchmark of persisting a concrete AlbsTable: pickle of the table (dict of python objects) vs Snapshot
+(save, and load as a Table_DW_Columnar over the mapped file, or as a table of python objects).
+
+Run from the root folder of the project:     python -m benchmarks.bench_snapshot
+(add 10000000 to SNAPSHOT_SIZES for a 10M-row snapshot: about 1.2GB of disk)
+'''
+
+import os
+import pickle
+import random
+import tempfile
+import time
+import numpy as np
+
+from CvRDTs.Tables.Snapshot import Snapshot
+from CvRDTs.Tables.Table_DW_Columnar import Table_DW_Columnar
+from ConcreteTables.Alb import Alb
+from benchmarks.bench_concrete import before, concrete_albs_table
+
+
+TABLE_SIZE = 100000 # for pickle and for the tables of python objects
+SNAPSHOT_SIZES = [100000, 1000000]
+
+
+def timed(op):
+    start = time.perf_counter()
+    result = op()
+    return result, time.perf_counter() - start
+
+
+def pickle_save(path: str, table):
+    with open(path, "wb") as file:
+        pickle.dump(table, file)
+
+
+def pickle_load(path: str):
+    with open(path, "rb") as file:
+        return pickle.load(file)
+
+
+def load_table(path: str):
+    with Snapshot.open(path) as snapshot:
+        return snapshot.table("main_table", before)
+
+
+def columnar_albs_table(table_size: int, rand: random.Random) -> Table_DW_Columnar:
+    '''a Table_DW_Columnar with table_size rows, made by repeating the rows of a small table with new PKs (without python objects per row).'''
+    small = Table_DW_Columnar.from_table(concrete_albs_table(1000, rand), Alb)
+    columns = {name: np.resize(column, (table_size,) + column.shape[1:]) for name, column in small.columns.items()}
+    columns["0"] = np.arange(table_size, dtype=np.int64).reshape(table_size, 1)
+    return Table_DW_Columnar(small.table_class, small.elem_class, small.schema, columns, before)
+
+
+if __name__ == "__main__":
+    rand = random.Random(0)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "albs")
+
+    table = concrete_albs_table(TABLE_SIZE, rand)
+    _, pickle_save_time = timed(lambda: pickle_save(path + ".pickle", table))
+    _, pickle_load_time = timed(lambda: pickle_load(path + ".pickle"))
+    _, save_time = timed(lambda: Snapshot.save_table(path + ".snap", table))
+    _, load_time = timed(lambda: load_table(path + ".snap"))
+    print(f"AlbsTable {TABLE_SIZE} rows (python objects)")
+    print(f"{'':<10}{'save':>10}{'load':>10}{'bytes/row':>12}")
+    print(f"{'pickle':<10}{pickle_save_time:>9.2f}s{pickle_load_time:>9.2f}s{os.path.getsize(path + '.pickle') / TABLE_SIZE:>12.0f}")
+    print(f"{'snapshot':<10}{save_time:>9.2f}s{load_time:>9.2f}s{os.path.getsize(path + '.snap') / TABLE_SIZE:>12.0f}")
+
+    print("\nsnapshot of a Table_DW_Columnar")
+    print(f"{'rows':<12}{'save':>10}{'load (mmap)':>14}{'first merge':>14}")
+    for snapshot_size in SNAPSHOT_SIZES:
+        columnar = columnar_albs_table(snapshot_size, rand)
+        _, save_time = timed(lambda: Snapshot.save_table(path + ".snap", columnar))
+        snapshot, open_time = timed(lambda: Snapshot.open(path + ".snap"))
+        with snapshot:
+            loaded, load_time = timed(lambda: snapshot.columnar("main_table", before))
+            _, merge_time = timed(lambda: loaded.merge(loaded)) # reads all pages of the file
+            load_time += open_time
+            del loaded
+        print(f"{snapshot_size:<12}{save_time:>9.2f}s{load_time * 1e3:>12.2f}ms{merge_time:>13.2f}s")
+
+    for file_name in os.listdir(directory):
+        os.remove(os.path.join(directory, file_name))
+    os.rmdir(directory)
@@ -0,0 +1,42 @@
+
+'''
+Benchmark of the build time of Z3 terms (not solving them), with And/Or/If of z3py vs our CvRDTs/Terms.py.
+
+Run from the root folder of the project:     python -m benchmarks.bench_terms
+'''
+
+import time
+from z3 import *
+
+import CvRDTs.Terms as Terms
+from CvRDTs.Time.VersionVector import VersionVector
+from ConcreteTables.Alb import AlbsTable
+
+
+TABLE_SIZES = [50, 200, 1000]
+
+
+def build_terms(x: AlbsTable, y: AlbsTable):
+    '''the big And/Or terms of our tables, without the pairwise compatible, which is quadratic in the table size.'''
+    return And(x.reachable(), y.reachable(),
+               x.merge(y).equals(y.merge(x)),
+               x.merge(x).equals(x))
+
+
+def time_build(x: AlbsTable, y: AlbsTable, fast_terms: bool) -> float:
+    Terms.FAST_TERMS = fast_terms
+    start = time.perf_counter()
+    build_terms(x, y)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print("table size\tz3py terms\tCvRDTs.Terms\tspeedup")
+    for table_size in TABLE_SIZES:
+        args1, args2, _, _, _, _ = AlbsTable.getArgs("", table_size, VersionVector)
+        x, y = AlbsTable(*args1), AlbsTable(*args2)
+        time_build(x, y, True) # warm up
+        z3py_time = time_build(x, y, False)
+        terms_time = time_build(x, y, True)
+        print(f"{table_size}\t\t{z3py_time:.3f}s\t\t{terms_time:.3f}s\t\t{z3py_time / terms_time:.2f}x")
+    Terms.FAST_TERMS = True
@@ -0,0 +1,82 @@
+'''
+Benchmark of the concrete GCounter/VersionVector (python lists) vs GCounter_NP/VersionVector_NP (numpy arrays),
+and of dense VersionVector vs VersionVector_Sparse for vectors touched by only TOUCHED_REPLICAS replicas.
+
+Run from the root folder of the project:     python -m benchmarks.bench_vectors
+'''
+
+import random
+import sys
+import time
+
+from CvRDTs.Counters.GCounter import GCounter
+from CvRDTs.Counters.GCounter_NP import GCounter_NP
+from CvRDTs.Time.VersionVector import VersionVector
+from CvRDTs.Time.VersionVector_NP import VersionVector_NP
+from CvRDTs.Time.VersionVector_Sparse import VersionVector_Sparse
+
+
+NUMBER_OF_REPLICAS = [10, 100, 1000]
+REPETITIONS = 1000
+TOUCHED_REPLICAS = 2
+
+
+def time_op(op, repetitions: int = REPETITIONS) -> float:
+    '''return the mean microseconds of op().'''
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        op()
+    return (time.perf_counter() - start) / repetitions * 1e6
+
+
+def print_row(name: str, replicas: int, list_time: float, np_time: float, unit: str = "us"):
+    print(f"{name:<28}{replicas:<10}{list_time:>10.1f}{unit}{np_time:>10.1f}{unit}{list_time / np_time:>10.1f}x")
+
+
+def touched_vector(replicas: int, rand: random.Random) -> list:
+    vector = [0] * replicas
+    for replica in rand.sample(range(replicas), TOUCHED_REPLICAS):
+        vector[replica] = rand.randint(1, 1000)
+    return vector
+
+
+def check_sparse_np(replicas: int = 16):
+    '''merges of sparse and numpy vectors keep python int counters, and a dense result stays a VersionVector_NP.'''
+    numpy_vector, sparse = VersionVector_NP([0] * replicas).increment(3), VersionVector_Sparse({1: 1}, replicas)
+    for merged in [numpy_vector.sync(sparse), sparse.sync(numpy_vector), sparse.merge_all([numpy_vector])]:
+        assert merged.is_sparse() and merged.wellFormed(), merged.entries
+        assert all(type(counter) is int for counter in merged.entries.values())
+    full = VersionVector_NP(list(range(1, replicas + 1)))
+    for merged in [full.sync(sparse), sparse.sync(full), VersionVector_Sparse.compact(full)]:
+        assert type(merged) is VersionVector_NP and merged.wellFormed(), type(merged)
+    print("sparse x numpy merges: python int counters, dense results stay VersionVector_NP")
+
+
+if __name__ == "__main__":
+    check_sparse_np()
+    rand = random.Random(0)
+    print(f"{'operation':<28}{'replicas':<10}{'lists':>12}{'numpy':>12}{'speedup':>11}")
+    for replicas in NUMBER_OF_REPLICAS:
+        entries1 = [rand.randint(0, 1000) for _ in range(replicas)]
+        entries2 = [rand.randint(0, 1000) for _ in range(replicas)]
+        smaller = [entry - 1 for entry in entries2]
+
+        gc1, gc2 = GCounter(entries1), GCounter(entries2)
+        gc1_np, gc2_np = GCounter_NP(entries1), GCounter_NP(entries2)
+        print_row("GCounter.merge", replicas, time_op(lambda: gc1.merge(gc2)), time_op(lambda: gc1_np.merge(gc2_np)))
+        print_row("GCounter.compare", replicas, time_op(lambda: gc1.compare(gc2)), time_op(lambda: gc1_np.compare(gc2_np)))
+
+        vv1, vv2 = VersionVector(smaller), VersionVector(entries2)
+        vv1_np, vv2_np = VersionVector_NP(smaller), VersionVector_NP(entries2)
+        print_row("VersionVector.sync", replicas, time_op(lambda: vv1.sync(vv2)), time_op(lambda: vv1_np.sync(vv2_np)))
+        print_row("VersionVector.before", replicas, time_op(lambda: vv1.before(vv2)), time_op(lambda: vv1_np.before(vv2_np)))
+        print_row("VersionVector.compare", replicas, time_op(lambda: vv1.compare(vv2)), time_op(lambda: vv1_np.compare(vv2_np)))
+
+    print(f"\n{'operation':<28}{'replicas':<10}{'dense':>12}{'sparse':>12}{'speedup':>11}")
+    for replicas in NUMBER_OF_REPLICAS:
+        dense1, dense2 = VersionVector(touched_vector(replicas, rand)), VersionVector(touched_vector(replicas, rand))
+        sparse1, sparse2 = VersionVector_Sparse.compact(dense1), VersionVector_Sparse.compact(dense2)
+        print_row("VersionVector size", replicas, sys.getsizeof(dense1.vector), sys.getsizeof(sparse1.entries), "B ")
+        print_row("VersionVector.sync", replicas, time_op(lambda: dense1.sync(dense2)), time_op(lambda: sparse1.sync(sparse2)))
+        print_row("VersionVector.before", replicas, time_op(lambda: dense1.before(dense2)), time_op(lambda: sparse1.before(sparse2)))
+        print_row("VersionVector.concurrent", replicas, time_op(lambda: dense1.concurrent(dense2)), time_op(lambda: sparse1.concurrent(sparse2)))
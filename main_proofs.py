@@ -8,6 +8,8 @@ from ConcreteTables.Genre import Genre, GenreTable
 from ConcreteTables.Song import Song, SongsTable
 from CvRDTs.Proofs_CvRDTs import Proofs_CvRDT
 from CvRDTs.Proofs_Ref_Integrity import Proofs_Ref_Integrity
+from CvRDTs.Proofs_Cost import Proofs_Cost
+from CvRDTs.Proofs_Statistics import Proofs_Statistics
 
 # import CvRDTs
 from CvRDTs.Counters.GCounter import GCounter
@@ -31,8 +33,9 @@ from ConcreteTables.Alb import Alb, Alb_FK_System, AlbPK, AlbsTable
 #####################################################################
 ############   STEP 1 ->>  CHOOSE PROOF PARAMETERS        ###########
 
-TABLE_SIZE_FOR_SYMBOLIC_VARS = 200
+TABLE_SIZE_FOR_SYMBOLIC_VARS = 3
 # Size of table to fill with symbolic variables. When preparing proofs to run in Z3 we need to set up some symbolic variables for all our attributes, fields, objects, etc. With complex examples the number of symbolic variables to test rise fast. So set here the size of tables to fill with symbolic variables 
+# Rows in the same position (slot) of different instances may have the same PK (see PK.slot), so a few rows already cover the merges of rows present in both replicas, and rows present in only one of them.
 
 VECTOR_SIZE_FOR_SYMBOLIC_VARS = 50          
 # Size of vector of DWFlag (fk_versions) and MVRegister set(Tuple(v, time)), to fill with symbolic variables.
@@ -40,6 +43,14 @@ VECTOR_SIZE_FOR_SYMBOLIC_VARS = 50
 DEFAULT_TIME = VersionVector             
 # "Time" to be used by the tables and MVRegister in the before function
 
+TIME_BUDGET_SECONDS = None
+# If set (ex: 60), before running the proofs we estimate how long Z3 will take to solve them (see CvRDTs/Proofs_Cost.py), 
+# and we lower TABLE_SIZE_FOR_SYMBOLIC_VARS and VECTOR_SIZE_FOR_SYMBOLIC_VARS until the expected time fits in this budget.
+
+STATISTICS_FILE = "proofs_statistics.jsonl"
+# File where we append the Z3 statistics of each proof (conflicts, decisions, quant instantiations, memory, time...), labeled with the CvRDT, proof, sizes and clock. None to not save them.
+# To see which proofs make Z3 work harder: Proofs_Statistics.print_summary(STATISTICS_FILE, "quant instantiations")
+
 #############################################################
 ############   STEP 2 ->>  CHOOSE TABLES POLICIES    ########
 ''' in "ConcreteTables" folder we have the documents for each table (Art, Alb, etc.)
@@ -75,7 +86,12 @@ CvRDT_options = {
                                 #       - need to be implemented, maybe creating a simple Tuple class so then we can go down that level to execute the correct comparisons using Z3 If, which should have primitives as return types If (condition, primitiveA, primitiveB) 
         # Tables:
             31: Flags_DW,       # TESTS OK
-            32: Flags_UW,       # TESTS OK  BUT TODO: with RealTime clock it's not merge idempotent, need to check what's wrong
+            32: Flags_UW,       # TODO: merge_idempotent fails with every clock: a DELETED flag with touch TOUCHED (the only touch reachable allows)
+                                #       merged with itself (the same time, so not before) becomes VISIBLE (see Flags_UW.merge). Without DELETED flags it holds.
+                                #       merge_associative holds with LamportClock and RealTime, and fails with VersionVector: with concurrent times
+                                #       (neither before the other) the merged flag depends on the order of the merges. merge_commutative holds with every clock.
+                                #       The UW tables hold: their reachable rows are not DELETED.
+                                #       (before VersionVector.wellFormed accepted Int terms, reachable was always False with VersionVector, so these proofs held vacuously)
             41: Country, 42: CountriesTable,    # TESTS OK -> currently DW policy
             51: Genre, 52: GenreTable,          # TESTS OK -> currently UW policy
             61: Art, 62: ArtsTable, 63: Art_FK_System,  # TESTS OK  -> currently UW
@@ -112,26 +128,106 @@ proofs_options = {
 #############################################################
 #################       HELPER METHOD      ##################
 
-def getArgsForProof():
+def getArgsForProof(table_size: int, vector_size: int):
     ''' To run each CvRDT through the z3 proofs we need to prepare those objects 
         with different arguments and symbolic variables.So for us to ask the class to prepare those, 
         we need to pass different args for its method getArgs().'''
     if CvRDT_to_prove == Flags_DW:
-        return ["",VECTOR_SIZE_FOR_SYMBOLIC_VARS]
+        return ["",vector_size]
     if CvRDT_to_prove == Flags_UW:
         return ["", DEFAULT_TIME]
     if CvRDT_to_prove == MVRegister:
-        return ["", VECTOR_SIZE_FOR_SYMBOLIC_VARS, DEFAULT_TIME]
+        return ["", vector_size, DEFAULT_TIME]
     if issubclass(CvRDT_to_prove, Table) or issubclass(CvRDT_to_prove, FK_System):
-        return ["",TABLE_SIZE_FOR_SYMBOLIC_VARS, DEFAULT_TIME]
+        return ["",table_size, DEFAULT_TIME]
     return [""]
 
 
+def get_CvRDT_obligations(table_size: int, vector_size: int):
+    ''' return the list of (proof_name, obligation) of Proofs_CvRDT chosen to run, built for 3 new instances of the CvRDT_to_prove,
+        and also the list of all the symbolic variables of those instances.'''
+    proofs = Proofs_CvRDT
+
+    arg_for_getArgs = getArgsForProof(table_size, vector_size)    
+    instance1_args, instance2_args, instance3_args, vars_for_instance1, vars_for_instance2, vars_for_instance3 = CvRDT_to_prove.getArgs(*arg_for_getArgs)
+    vars_for_2_instances = vars_for_instance1 + vars_for_instance2
+    vars_for_3_instances = vars_for_instance1 + vars_for_instance2 + vars_for_instance3
+
+    instance1 = CvRDT_to_prove(*instance1_args)
+    instance2 = CvRDT_to_prove(*instance2_args)
+    instance3 = CvRDT_to_prove(*instance3_args)
+
+    obligations = []
+    if proof_to_run in ["compare_correct", "ALL"]:
+        obligations.append(("compare_correct", proofs.compare_correct(vars_for_2_instances,instance1, instance2)))
+    if proof_to_run in ["is_a_CvRDT"]:
+        obligations.append(("is_a_CvRDT", proofs.is_a_CvRDT(vars_for_3_instances, instance1, instance2, instance3)))
+    if proof_to_run in ["compatible_commutes", "ALL"]:
+        obligations.append(("compatible_commutes", proofs.compatible_commutes(vars_for_2_instances, instance1, instance2)))
+    if proof_to_run in ["merge_idempotent", "ALL"]:
+        obligations.append(("merge_idempotent", proofs.merge_idempotent(vars_for_instance1, instance1)))
+    if proof_to_run in ["merge_commutative", "ALL"]:
+        obligations.append(("merge_commutative", proofs.merge_commutative(vars_for_2_instances, instance1, instance2)))
+    if proof_to_run in ["merge_associative", "ALL"]:
+        obligations.append(("merge_associative", proofs.merge_associative(vars_for_3_instances, instance1, instance2, instance3)))
+    if proof_to_run in ["merge_reachable", "ALL"]:
+        obligations.append(("merge_reachable", proofs.merge_reachable(vars_for_3_instances, instance1, instance2, instance3)))
+    if proof_to_run in ["merge_compatible", "ALL"]:
+        obligations.append(("merge_compatible", proofs.merge_compatible(vars_for_3_instances, instance1, instance2, instance3)))
+    return obligations, vars_for_3_instances
+
+
+def get_Ref_Integrity_obligations(table_size: int, vector_size: int):
+    ''' return the list of (proof_name, obligation) of Proofs_Ref_Integrity chosen to run, built for 2 new instances of the FK_System to prove and 1 of its PK,
+        and also the list of all the symbolic variables of those instances.'''
+    proofs = Proofs_Ref_Integrity
+    FK1_args, FK2_args, elemPK_args, elem_pk_class, vars_for_2_inst_of_FK_Syst_and_1_inst_of_its_PKs = CvRDT_to_prove.get_RefIntProof_Args("",table_size, DEFAULT_TIME)
+
+    fk_syst_instance1 = CvRDT_to_prove(*FK1_args)
+    fk_syst_instance2 = CvRDT_to_prove(*FK2_args)
+    elem_pk_instance = elem_pk_class(*elemPK_args)
+
+    obligations = []
+    if proof_to_run in ["generic_referential_integrity", "ALL"]:
+        obligations.append(("generic_referential_integrity", proofs.generic_referential_integrity(
+                vars_for_2_inst_of_FK_Syst_and_1_inst_of_its_PKs,
+                fk_syst_instance1, fk_syst_instance2, elem_pk_instance)))
+    return obligations, vars_for_2_inst_of_FK_Syst_and_1_inst_of_its_PKs
+
+
+def fit_obligations_to_budget(get_obligations):
+    ''' build the obligations with TABLE_SIZE_FOR_SYMBOLIC_VARS and VECTOR_SIZE_FOR_SYMBOLIC_VARS, 
+        and while the expected time to solve them is bigger than TIME_BUDGET_SECONDS, build them again with half of the sizes.
+        The expected time of every obligation comes from the merge_associative curve of CvRDT_to_prove (see Proofs_Cost.CALIBRATION),
+        also for the generic_referential_integrity obligation of FK_Systems, which is not calibrated separately.
+        return the obligations, their symbolic variables, and the sizes actually used.'''
+    table_size, vector_size = TABLE_SIZE_FOR_SYMBOLIC_VARS, VECTOR_SIZE_FOR_SYMBOLIC_VARS
+    while True:
+        obligations, z3_vars = get_obligations(table_size, vector_size)
+        if TIME_BUDGET_SECONDS is None:
+            return obligations, z3_vars, table_size, vector_size
+        expected_time = sum(Proofs_Cost.predict_time(Proofs_Cost.estimate(obligation), CvRDT_to_prove.__name__) for _, obligation in obligations)
+        if expected_time <= TIME_BUDGET_SECONDS or (table_size == 1 and vector_size == 1):
+            print(f"\nExpected time {expected_time:.2f}s (budget {TIME_BUDGET_SECONDS}s) with table size {table_size} and vector size {vector_size}")
+            return obligations, z3_vars, table_size, vector_size
+        table_size, vector_size = max(1, table_size // 2), max(1, vector_size // 2)
+
+
+def print_cost(proof_name, obligation):
+    cost = Proofs_Cost.estimate(obligation)
+    Proofs_Cost.print_cost(f"{CvRDT_to_prove.__name__}: {proof_name}", cost, Proofs_Cost.predict_time(cost, CvRDT_to_prove.__name__))
 
-def print_proof(proof_name, solver):
+
+
+def print_proof(proof_name, solver, table_size, vector_size):
     # TODO: implement the automatic negation of the proof for as to run again and then show the counter example
-    res = solver.check()
+    res, seconds = Proofs_Statistics.check(solver)
     print(f"{CvRDT_to_prove.__name__}: {proof_name}\t- holds ?", (res == sat))
+    # the statistics are lost with solver.reset(), so we collect them before
+    record = Proofs_Statistics.collect(solver, res, seconds, CvRDT_to_prove.__name__, proof_name, table_size, vector_size, DEFAULT_TIME.__name__)
+    Proofs_Statistics.print_record(record)
+    if STATISTICS_FILE is not None:
+        Proofs_Statistics.save(record, STATISTICS_FILE)
     # if res == sat:
     #     print("sat model:   ", solver.model())
     # elif res == unsat:
@@ -171,50 +267,13 @@ if __name__ == "__main__":
     
     print("\n\n\n\n\n\nStarting CvRDT proofs for ", CvRDT_to_prove.__name__)
     
-    proofs = Proofs_CvRDT
-
-    arg_for_getArgs = getArgsForProof()    
-    instance1_args, instance2_args, instance3_args, vars_for_instance1, vars_for_instance2, vars_for_instance3 = CvRDT_to_prove.getArgs(*arg_for_getArgs)
-    vars_for_2_instances = vars_for_instance1 + vars_for_instance2
-    vars_for_3_instances = vars_for_instance1 + vars_for_instance2 + vars_for_instance3
+    obligations, vars_for_3_instances, table_size, vector_size = fit_obligations_to_budget(get_CvRDT_obligations)
     check_all_z3_variables_have_different_names(vars_for_3_instances)
 
-    instance1 = CvRDT_to_prove(*instance1_args)
-    instance2 = CvRDT_to_prove(*instance2_args)
-    instance3 = CvRDT_to_prove(*instance3_args)
-
-
-    if proof_to_run in ["compare_correct", "ALL"]:
-        solver.add(proofs.compare_correct(vars_for_2_instances,instance1, instance2))
-        print_proof("compare_correct", solver)
-    
-    if proof_to_run in ["is_a_CvRDT"]:
-        solver.add(proofs.is_a_CvRDT(vars_for_3_instances, instance1, instance2, instance3))
-        print_proof("is_a_CvRDT", solver)
-    
-    if proof_to_run in ["compatible_commutes", "ALL"]:
-        solver.add(proofs.compatible_commutes(vars_for_2_instances, instance1, instance2))
-        print_proof("compatible_commutes", solver)
-
-    if proof_to_run in ["merge_idempotent", "ALL"]:
-        solver.add(proofs.merge_idempotent(vars_for_instance1, instance1))
-        print_proof("merge_idempotent", solver)
-
-    if proof_to_run in ["merge_commutative", "ALL"]:
-        solver.add(proofs.merge_commutative(vars_for_2_instances, instance1, instance2))
-        print_proof("merge_commutative", solver)
-
-    if proof_to_run in ["merge_associative", "ALL"]:
-        solver.add(proofs.merge_associative(vars_for_3_instances, instance1, instance2, instance3))
-        print_proof("merge_associative", solver)
-
-    if proof_to_run in ["merge_reachable", "ALL"]:
-        solver.add(proofs.merge_reachable(vars_for_3_instances, instance1, instance2, instance3))
-        print_proof("merge_reachable", solver)
-
-    if proof_to_run in ["merge_compatible", "ALL"]:
-        solver.add(proofs.merge_compatible(vars_for_3_instances, instance1, instance2, instance3))
-        print_proof("merge_compatible", solver)
+    for proof_name, obligation in obligations:
+        print_cost(proof_name, obligation)
+        solver.add(obligation)
+        print_proof(proof_name, solver, table_size, vector_size)
     
     # Now we'll run the Ref_Integrity_Proofs, but only if the CvRDT_to_prove is a FK_System:
     
@@ -223,18 +282,12 @@ if __name__ == "__main__":
     if issubclass(CvRDT_to_prove, FK_System):
         print("\nStarting Ref_Integrity proofs for ", CvRDT_to_prove.__name__)
 
-        proofs = Proofs_Ref_Integrity
-        FK1_args, FK2_args, elemPK_args, elem_pk_class, vars_for_2_inst_of_FK_Syst_and_1_inst_of_its_PKs = CvRDT_to_prove.get_RefIntProof_Args("",TABLE_SIZE_FOR_SYMBOLIC_VARS, DEFAULT_TIME)
-
+        obligations, vars_for_2_inst_of_FK_Syst_and_1_inst_of_its_PKs, table_size, vector_size = fit_obligations_to_budget(get_Ref_Integrity_obligations)
         check_all_z3_variables_have_different_names(vars_for_2_inst_of_FK_Syst_and_1_inst_of_its_PKs)
 
-        fk_syst_instance1 = CvRDT_to_prove(*FK1_args)
-        fk_syst_instance2 = CvRDT_to_prove(*FK2_args)
-        elem_pk_instance = elem_pk_class(*elemPK_args)
-        if proof_to_run in ["generic_referential_integrity", "ALL"]:
-            solver.add(proofs.generic_referential_integrity(
-                    vars_for_2_inst_of_FK_Syst_and_1_inst_of_its_PKs,
-                    fk_syst_instance1, fk_syst_instance2, elem_pk_instance))
-            print_proof("generic_referential_integrity", solver)
+        for proof_name, obligation in obligations:
+            print_cost(proof_name, obligation)
+            solver.add(obligation)
+            print_proof(proof_name, solver, table_size, vector_size)
 
 print("\n")